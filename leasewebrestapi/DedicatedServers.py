@@ -2,12 +2,76 @@
 # RELEASE: 0.5.4
 # LICENSE: AGPL3.0
 
-from .core.utils import utils
-
-
-class DedicatedServers():
-    def __init__(self, config: dict):
-        self.config = config
+from .core.endpoints import Endpoint, Service, endpoints
+
+
+SERVERS = '/bareMetals/v2/servers/{serverId}'
+PAGE = ('limit', 'offset')
+
+ENDPOINTS = endpoints({
+    'list_servers': Endpoint('GET', '/bareMetals/v2/servers', query=PAGE + ('ip', 'macAddress', 'site', 'privateRackId', 'privateNetworkCapable', 'privateNetworkEnabled')),
+    'get_server': Endpoint('GET', SERVERS, cache='server'),
+    'update_server': Endpoint('PUT', SERVERS, body=('reference',), success=204, returns='json_or_true', invalidates=('server',)),
+    'show_hardware_information': Endpoint('GET', SERVERS + '/hardwareInfo'),
+    'list_ips': Endpoint('GET', SERVERS + '/ips', query=('networkType', 'version', 'nullRouted', 'ips') + PAGE, cache='ips'),
+    'show_ip': Endpoint('GET', SERVERS + '/ips/{ip}', cache='ips'),
+    'update_ip': Endpoint('PUT', SERVERS + '/ips/{ip}', body=('detectionProfile', 'reverseLookup'), invalidates=('ips',)),
+    'null_route_ip': Endpoint('POST', SERVERS + '/ips/{ip}/null', invalidates=('ips',)),
+    'remove_null_route_ip': Endpoint('POST', SERVERS + '/ips/{ip}/unnull', invalidates=('ips',)),
+    'show_null_route_history': Endpoint('GET', SERVERS + '/nullRouteHistory', query=PAGE),
+    'list_network_interfaces': Endpoint('GET', SERVERS + '/networkInterfaces', cache='interfaces'),
+    'close_all_network_interfaces': Endpoint('POST', SERVERS + '/networkInterfaces/close', success=204, returns='bool', invalidates=('interfaces',)),
+    'open_all_network_interfaces': Endpoint('POST', SERVERS + '/networkInterfaces/open', success=204, returns='bool', invalidates=('interfaces',)),
+    'show_network_interface_by_type': Endpoint('GET', SERVERS + '/networkInterfaces/{networkType}', cache='interfaces'),
+    'close_network_interface_by_type': Endpoint('POST', SERVERS + '/networkInterfaces/{networkType}/close', success=204, returns='bool', invalidates=('interfaces',)),
+    'open_network_interface_by_type': Endpoint('POST', SERVERS + '/networkInterfaces/{networkType}/open', success=204, returns='bool', invalidates=('interfaces',)),
+    'delete_server_from_private_network': Endpoint('DELETE', SERVERS + '/privateNetworks/{privateNetworkId}', success=204, returns='json_or_true', invalidates=('server',)),
+    'add_server_to_private_network': Endpoint('PUT', SERVERS + '/privateNetworks/{privateNetworkId}', body=('linkSpeed',), success=204, returns='json_or_true', invalidates=('server',)),
+    'delete_dhcp_reservation': Endpoint('DELETE', SERVERS + '/leases', success=204, returns='bool'),
+    'list_dhcp_reservation': Endpoint('GET', SERVERS + '/leases'),
+    'create_dhcp_reservation': Endpoint('POST', SERVERS + '/leases', body=('bootfile', 'hostname'), success=204, returns='json_or_true'),
+    'cancel_active_job': Endpoint('POST', SERVERS + '/cancelActiveJob'),
+    'expire_active_job': Endpoint('POST', SERVERS + '/expireActiveJob'),
+    'launch_hardware_scan': Endpoint('POST', SERVERS + '/hardwareScan', body=('callbackUrl', 'powerCycle'), invalidates=('power',)),
+    'launch_installation': Endpoint('POST', SERVERS + '/install', body=('operatingSystemId', 'callbackUrl', 'controlPanelId', 'device', 'hostname', 'partitions', 'password', 'postInstallScript', 'powerCycle', 'raid', 'sshKeys', 'timezone'), invalidates=('power',)),
+    'launch_ipmi_reset': Endpoint('POST', SERVERS + '/ipmiReset', body=('callbackUrl', 'powerCycle'), invalidates=('power',)),
+    'list_jobs': Endpoint('GET', SERVERS + '/jobs'),
+    'show_job': Endpoint('GET', SERVERS + '/jobs/{jobId}'),
+    'launch_resque_mode': Endpoint('POST', SERVERS + '/rescueMode', body=('rescueImageId', 'callbackUrl', 'password', 'postInstallScript', 'powerCycle', 'sshKeys'), invalidates=('power',)),
+    'list_credentials': Endpoint('GET', SERVERS + '/credentials', query=PAGE),
+    'create_credentials': Endpoint('POST', SERVERS + '/credentials', body=('password', 'type', 'username')),
+    'list_credentials_by_type': Endpoint('GET', SERVERS + '/credentials/{type}', query=PAGE),
+    'delete_user_credentials': Endpoint('DELETE', SERVERS + '/credentials/{type}/{username}', success=204, returns='bool'),
+    'show_user_credentials': Endpoint('GET', SERVERS + '/credentials/{type}/{username}'),
+    'update_user_credentials': Endpoint('PUT', SERVERS + '/credentials/{type}/{username}', body=('password',)),
+    'show_bandwidth_metrics': Endpoint('GET', SERVERS + '/metrics/bandwidth', query=('date_from', 'date_to', 'aggregation', 'granularity'), names={'date_from': 'from', 'date_to': 'to'}),
+    'show_datatraffic_metrics': Endpoint('GET', SERVERS + '/metrics/datatraffic', query=('date_from', 'date_to', 'aggregation', 'granularity'), names={'date_from': 'from', 'date_to': 'to'}),
+    'list_bandwidth_notification_settings': Endpoint('GET', SERVERS + '/notificationSettings/bandwidth', query=PAGE, cache='notifications'),
+    'create_bandwidth_notification_settings': Endpoint('POST', SERVERS + '/notificationSettings/bandwidth', body=('frequency', 'threshold', 'unit'), invalidates=('notifications',)),
+    'delete_bandwidth_notification_setting': Endpoint('DELETE', SERVERS + '/notificationSettings/bandwidth/{notificationSettingId}', success=204, returns='bool', invalidates=('notifications',)),
+    'show_bandwidth_notification_setting': Endpoint('GET', SERVERS + '/notificationSettings/bandwidth/{notificationSettingId}', cache='notifications'),
+    'update_bandwidth_notification_setting': Endpoint('PUT', SERVERS + '/notificationSettings/bandwidth/{notificationSettingId}', body=('frequency', 'threshold', 'unit'), invalidates=('notifications',)),
+    'list_datatraffic_notification_settings': Endpoint('GET', SERVERS + '/notificationSettings/datatraffic', query=PAGE, cache='notifications'),
+    'create_datatraffic_notification_settings': Endpoint('POST', SERVERS + '/notificationSettings/datatraffic', body=('frequency', 'threshold', 'unit'), invalidates=('notifications',)),
+    'delete_datatraffic_notification_setting': Endpoint('DELETE', SERVERS + '/notificationSettings/datatraffic/{notificationSettingId}', success=204, returns='bool', invalidates=('notifications',)),
+    'show_datatraffic_notification_setting': Endpoint('GET', SERVERS + '/notificationSettings/datatraffic/{notificationSettingId}', cache='notifications'),
+    'update_datatraffic_notification_setting': Endpoint('PUT', SERVERS + '/notificationSettings/datatraffic/{notificationSettingId}', body=('frequency', 'threshold', 'unit'), invalidates=('notifications',)),
+    'inspect_ddos_notification_settings': Endpoint('GET', SERVERS + '/notificationSettings/ddos', cache='notifications'),
+    'update_ddos_notification_settings': Endpoint('PUT', SERVERS + '/notificationSettings/ddos', body=('nulling', 'scrubbing'), success=204, returns='bool', invalidates=('notifications',)),
+    'power_cycle_server': Endpoint('POST', SERVERS + '/powerCycle', success=204, returns='bool', invalidates=('power',)),
+    'show_power_status': Endpoint('GET', SERVERS + '/powerInfo', cache='power'),
+    'power_off_server': Endpoint('POST', SERVERS + '/powerOff', success=204, returns='bool', invalidates=('power',)),
+    'power_on_server': Endpoint('POST', SERVERS + '/powerOn', success=204, returns='bool', invalidates=('power',)),
+    'list_operating_system': Endpoint('GET', '/bareMetals/v2/operatingSystems', query=PAGE + ('controlPanelId',)),
+    'show_operating_system': Endpoint('GET', '/bareMetals/v2/operatingSystems/{operatingSystemId}', query=('controlPanelId',)),
+    'list_control_panels_by_os': Endpoint('GET', '/bareMetals/v2/operatingSystems/{operatingSystemId}/controlPanels', query=PAGE),
+    'list_control_panels': Endpoint('GET', '/bareMetals/v2/controlPanels', query=PAGE + ('operatingSystemId',)),
+    'rescue_images': Endpoint('GET', '/bareMetals/v2/rescueImages', query=PAGE)
+})
+
+
+class DedicatedServers(Service):
+    ENDPOINTS = ENDPOINTS
 
     def list_servers(self,
                      limit: int = 20,
@@ -34,19 +98,7 @@ class DedicatedServers():
         :param privateNetworkEnabled: Filter the list for private network enabled servers. Enum: "true" or "false".
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        query_params = {
-            'limit': limit,
-            'offset': offset,
-            'ip': ip,
-            'macAddress': macAddress,
-            'site': site,
-            'privateRackId': privateRackId,
-            'privateNetworkCapable': privateNetworkCapable,
-            'privateNetworkEnabled': privateNetworkEnabled
-        }
-        out = utils.httpGet(self.config['API_URL'], '/bareMetals/v2/servers?', query=utils.query(query_params), headers=headers)
-        return out.json()
+        return ENDPOINTS['list_servers'](self.config, limit, offset, ip, macAddress, site, privateRackId, privateNetworkCapable, privateNetworkEnabled)
 
     def get_server(self,
                    serverId: str) -> dict:
@@ -56,9 +108,7 @@ class DedicatedServers():
         :param serverId: The ID of a server.
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        out = utils.httpGet(self.config['API_URL'], '/bareMetals/v2/servers/{}'.format(serverId), headers=headers)
-        return out.json()
+        return ENDPOINTS['get_server'](self.config, serverId)
 
     def update_server(self,
                       serverId: str,
@@ -70,13 +120,7 @@ class DedicatedServers():
         :param reference: The reference for this server.
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {
-            'x-lsw-auth': self.config['API_KEY'],
-            'content-type': 'application/json'
-        }
-        payload_params = {'reference': reference}
-        out = utils.httpPut(self.config['API_URL'], '/bareMetals/v2/servers/{}'.format(serverId), data=utils.payload(payload_params), headers=headers)
-        return True if out.status_code == 204 else out.json()
+        return ENDPOINTS['update_server'](self.config, serverId, reference)
 
     def show_hardware_information(self,
                                   serverId: str) -> dict:
@@ -86,9 +130,7 @@ class DedicatedServers():
         :param serverId: The ID of a server.
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        out = utils.httpGet(self.config['API_URL'], '/bareMetals/v2/servers/{}/hardwareInfo'.format(serverId), headers=headers)
-        return out.json()
+        return ENDPOINTS['show_hardware_information'](self.config, serverId)
 
     def list_ips(self,
                  serverId: str,
@@ -111,17 +153,7 @@ class DedicatedServers():
         :param offset: Return results starting from the given offset.
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        query_params = {
-            'networkType': networkType,
-            'version': version,
-            'nullRouted': nullRouted,
-            'ips': ips,
-            'limit': limit,
-            'offset': offset
-        }
-        out = utils.httpGet(self.config['API_URL'], '/bareMetals/v2/servers/{}/ips?'.format(serverId), query=utils.query(query_params), headers=headers)
-        return out.json()
+        return ENDPOINTS['list_ips'](self.config, serverId, networkType, version, nullRouted, ips, limit, offset)
 
     def show_ip(self,
                 serverId: str,
@@ -133,9 +165,7 @@ class DedicatedServers():
         :param ip: The IP Address.
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        out = utils.httpGet(self.config['API_URL'], '/bareMetals/v2/servers/{}/ips/{}'.format(serverId, ip), headers=headers)
-        return out.json()
+        return ENDPOINTS['show_ip'](self.config, serverId, ip)
 
     def update_ip(self,
                      serverId: str,
@@ -151,16 +181,7 @@ class DedicatedServers():
         :param reverseLookup: The reverse lookup value.
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {
-            'x-lsw-auth': self.config['API_KEY'],
-            'content-type': 'application/json'
-        }
-        payload_params = {
-            'detectionProfile': detectionProfile,
-            'reverseLookup': reverseLookup
-        }
-        out = utils.httpPut(self.config['API_URL'], '/bareMetals/v2/servers/{}/ips/{}'.format(serverId, ip), data=utils.payload(payload_params), headers=headers)
-        return out.json()
+        return ENDPOINTS['update_ip'](self.config, serverId, ip, detectionProfile, reverseLookup)
 
     def null_route_ip(self,
                       serverId: str,
@@ -172,9 +193,7 @@ class DedicatedServers():
         :param ip: The IP Address.
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        out = utils.httpPost(self.config['API_URL'], '/bareMetals/v2/servers/{}/ips/{}/null'.format(serverId, ip), headers=headers)
-        return out.json()
+        return ENDPOINTS['null_route_ip'](self.config, serverId, ip)
 
     def remove_null_route_ip(self,
                              serverId: str,
@@ -186,9 +205,7 @@ class DedicatedServers():
         :param ip: The IP Address.
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        out = utils.httpPost(self.config['API_URL'], '/bareMetals/v2/servers/{}/ips/{}/unnull'.format(serverId, ip), headers=headers)
-        return out.json()
+        return ENDPOINTS['remove_null_route_ip'](self.config, serverId, ip)
 
     def show_null_route_history(self,
                                 serverId: str,
@@ -202,13 +219,7 @@ class DedicatedServers():
         :param offset: Return results starting from the given offset.
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        query_params = {
-            'limit': limit,
-            'offset': offset
-        }
-        out = utils.httpGet(self.config['API_URL'], '/bareMetals/v2/servers/{}/nullRouteHistory?'.format(serverId), query=utils.query(query_params), headers=headers)
-        return out.json()
+        return ENDPOINTS['show_null_route_history'](self.config, serverId, limit, offset)
 
     def list_network_interfaces(self,
                                 serverId: str) -> dict:
@@ -218,9 +229,7 @@ class DedicatedServers():
         :param serverId: The ID of a server.
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        out = utils.httpGet(self.config['API_URL'], '/bareMetals/v2/servers/{}/networkInterfaces'.format(serverId), headers=headers)
-        return out.json()
+        return ENDPOINTS['list_network_interfaces'](self.config, serverId)
 
     def close_all_network_interfaces(self,
                                      serverId: str) -> bool:
@@ -230,9 +239,7 @@ class DedicatedServers():
         :param serverId: The ID of a server.
         :return: Bool.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        out = utils.httpPost(self.config['API_URL'], '/bareMetals/v2/servers/{}/networkInterfaces/close'.format(serverId), headers=headers)
-        return True if out.status_code == 204 else False
+        return ENDPOINTS['close_all_network_interfaces'](self.config, serverId)
 
     def open_all_network_interfaces(self,
                                     serverId: str) -> bool:
@@ -242,9 +249,7 @@ class DedicatedServers():
         :param serverId: The ID of a server.
         :return: Bool.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        out = utils.httpPost(self.config['API_URL'], '/bareMetals/v2/servers/{}/networkInterfaces/open'.format(serverId), headers=headers)
-        return True if out.status_code == 204 else False
+        return ENDPOINTS['open_all_network_interfaces'](self.config, serverId)
 
     def show_network_interface_by_type(self,
                                  serverId: str,
@@ -256,9 +261,7 @@ class DedicatedServers():
         :param networkType: The network type.  Enum: "public" "internal" "remoteManagement".
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        out = utils.httpGet(self.config['API_URL'], '/bareMetals/v2/servers/{}/networkInterfaces/{}'.format(serverId, networkType), headers=headers)
-        return out.json()
+        return ENDPOINTS['show_network_interface_by_type'](self.config, serverId, networkType)
 
     def close_network_interface_by_type(self,
                                 serverId: str,
@@ -270,9 +273,7 @@ class DedicatedServers():
         :param networkType: The network type.  Enum: "public" "internal" "remoteManagement".
         :return: Bool.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        out = utils.httpPost(self.config['API_URL'], '/bareMetals/v2/servers/{}/networkInterfaces/{}/close'.format(serverId, networkType), headers=headers)
-        return True if out.status_code == 204 else False
+        return ENDPOINTS['close_network_interface_by_type'](self.config, serverId, networkType)
 
     def open_network_interface_by_type(self,
                                        serverId: str,
@@ -284,9 +285,7 @@ class DedicatedServers():
         :param networkType: The network type.  Enum: "public" "internal" "remoteManagement".
         :return: Bool.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        out = utils.httpPost(self.config['API_URL'], '/bareMetals/v2/servers/{}/networkInterfaces/{}/open'.format(serverId, networkType), headers=headers)
-        return True if out.status_code == 204 else False
+        return ENDPOINTS['open_network_interface_by_type'](self.config, serverId, networkType)
 
     def delete_server_from_private_network(self,
                                            serverId: str,
@@ -302,9 +301,7 @@ class DedicatedServers():
         :param privateNetworkId: The ID of a Private Network.
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        out = utils.httpDelete(self.config['API_URL'], '/bareMetals/v2/servers/{}/privateNetworks/{}'.format(serverId, privateNetworkId), headers=headers)
-        return True if out.status_code == 204 else out.json()
+        return ENDPOINTS['delete_server_from_private_network'](self.config, serverId, privateNetworkId)
 
     def add_server_to_private_network(self,
                                       serverId: str,
@@ -322,15 +319,7 @@ class DedicatedServers():
         :param linkSpeed: The port speed in Mbps.  Enum: "100", "1000", "10000".
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {
-            'x-lsw-auth': self.config['API_KEY'],
-            'content-type': 'application/json'
-        }
-        payload_params = {
-            'linkSpeed': linkSpeed
-        }
-        out = utils.httpPut(self.config['API_URL'], '/bareMetals/v2/servers/{}/privateNetworks/{}'.format(serverId, privateNetworkId), data=utils.payload(payload_params), headers=headers)
-        return True if out.status_code == 204 else out.json()
+        return ENDPOINTS['add_server_to_private_network'](self.config, serverId, privateNetworkId, linkSpeed)
 
     def delete_dhcp_reservation(self,
                                 serverId: str) -> bool:
@@ -340,9 +329,7 @@ class DedicatedServers():
         :param serverId: The ID of a server.
         :return: Bool.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        out = utils.httpDelete(self.config['API_URL'], '/bareMetals/v2/servers/{}/leases'.format(serverId), headers=headers)
-        return True if out.status_code == 204 else False
+        return ENDPOINTS['delete_dhcp_reservation'](self.config, serverId)
 
     def list_dhcp_reservation(self,
                               serverId: str) -> dict:
@@ -352,9 +339,7 @@ class DedicatedServers():
         :param serverId: The ID of a server.
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        out = utils.httpGet(self.config['API_URL'], '/bareMetals/v2/servers/{}/leases'.format(serverId), headers=headers)
-        return out.json()
+        return ENDPOINTS['list_dhcp_reservation'](self.config, serverId)
 
     def create_dhcp_reservation(self,
                                 serverId: str,
@@ -370,16 +355,7 @@ class DedicatedServers():
         :param hostname: The hostname for the server.
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {
-            'x-lsw-auth': self.config['API_KEY'],
-            'content-type': 'application/json'
-        }
-        data_params = {
-            'bootfile': bootfile,
-            'hostname': hostname
-        }
-        out = utils.httpPost(self.config['API_URL'], '/bareMetals/v2/servers/{}/leases'.format(serverId), data=utils.payload(data_params), headers=headers)
-        return True if out.status_code == 204 else out.json()
+        return ENDPOINTS['create_dhcp_reservation'](self.config, serverId, bootfile, hostname)
 
     def cancel_active_job(self,
                           serverId: str) -> dict:
@@ -389,9 +365,7 @@ class DedicatedServers():
         :param serverId: The ID of a server.
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        out = utils.httpPost(self.config['API_URL'], '/bareMetals/v2/servers/{}/cancelActiveJob'.format(serverId), headers=headers)
-        return out.json()
+        return ENDPOINTS['cancel_active_job'](self.config, serverId)
 
     def expire_active_job(self,
                           serverId: str) -> dict:
@@ -403,9 +377,7 @@ class DedicatedServers():
         :param serverId: The ID of a server.
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        out = utils.httpPost(self.config['API_URL'], '/bareMetals/v2/servers/{}/expireActiveJob'.format(serverId), headers=headers)
-        return out.json()
+        return ENDPOINTS['expire_active_job'](self.config, serverId)
 
     def launch_hardware_scan(self,
                             serverId: str,
@@ -421,16 +393,7 @@ class DedicatedServers():
         :param powerCycle: If set to true, server will be power cycled in order to complete the operation.
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {
-            'x-lsw-auth': self.config['API_KEY'],
-            'content-type': 'application/json'
-        }
-        data_params = {
-            'callbackUrl': callbackUrl,
-            'powerCycle': powerCycle
-        }
-        out = utils.httpPost(self.config['API_URL'], '/bareMetals/v2/servers/{}/hardwareScan'.format(serverId), data=utils.payload(data_params), headers=headers)
-        return out.json()
+        return ENDPOINTS['launch_hardware_scan'](self.config, serverId, callbackUrl, powerCycle)
 
     def launch_installation(self,
                             serverId: str,
@@ -469,26 +432,7 @@ class DedicatedServers():
         :param timezone: Timezone represented as Geographical_Area/City.
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {
-            'x-lsw-auth': self.config['API_KEY'],
-            'content-type': 'application/json'
-        }
-        data_params = {
-            "operatingSystemId": operatingSystemId,
-            "callbackUrl": callbackUrl,
-            "controlPanelId": controlPanelId,
-            "device": device,
-            "hostname": hostname,
-            "partitions": partitions,
-            "password": password,
-            "postInstallScript": postInstallScript,
-            "powerCycle": powerCycle,
-            "raid": raid,
-            "sshKeys": sshKeys,
-            "timezone": timezone
-        }
-        out = utils.httpPost(self.config['API_URL'], '/bareMetals/v2/servers/{}/install'.format(serverId), data=utils.payload(data_params), headers=headers)
-        return out.json()
+        return ENDPOINTS['launch_installation'](self.config, serverId, operatingSystemId, callbackUrl, controlPanelId, device, hostname, partitions, password, postInstallScript, powerCycle, raid, sshKeys, timezone)
 
     def launch_ipmi_reset(self,
                           serverId: str,
@@ -504,16 +448,7 @@ class DedicatedServers():
         :param powerCycle: If set to true, server will be power cycled in order to complete the operation.
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {
-            'x-lsw-auth': self.config['API_KEY'],
-            'content-type': 'application/json'
-        }
-        data_params = {
-            "callbackUrl": callbackUrl,
-            "powerCycle": powerCycle
-        }
-        out = utils.httpPost(self.config['API_URL'], '/bareMetals/v2/servers/{}/ipmiReset'.format(serverId), data=utils.payload(data_params), headers=headers)
-        return out.json()
+        return ENDPOINTS['launch_ipmi_reset'](self.config, serverId, callbackUrl, powerCycle)
 
     def list_jobs(self,
                   serverId: str) -> dict:
@@ -523,9 +458,7 @@ class DedicatedServers():
         :param serverId: The ID of a server.
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        out = utils.httpGet(self.config['API_URL'], '/bareMetals/v2/servers/{}/jobs'.format(serverId), headers=headers)
-        return out.json()
+        return ENDPOINTS['list_jobs'](self.config, serverId)
 
     def show_job(self,
                  serverId: str,
@@ -537,9 +470,7 @@ class DedicatedServers():
         :param jobId: The ID of a Job.
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        out = utils.httpGet(self.config['API_URL'], '/bareMetals/v2/servers/{}/jobs/{}'.format(serverId, jobId), headers=headers)
-        return out.json()
+        return ENDPOINTS['show_job'](self.config, serverId, jobId)
 
     def launch_resque_mode(self,
                            serverId: str,
@@ -565,20 +496,7 @@ class DedicatedServers():
         :param sshKeys: User ssh keys.
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {
-            'x-lsw-auth': self.config['API_KEY'],
-            'content-type': 'application/json'
-        }
-        data_params = {
-            "rescueImageId": rescueImageId,
-            "callbackUrl": callbackUrl,
-            "password": password,
-            "postInstallScript": postInstallScript,
-            "powerCycle": powerCycle,
-            "sshKeys": sshKeys
-        }
-        out = utils.httpPost(self.config['API_URL'], '/bareMetals/v2/servers/12345/rescueMode'.format(serverId), data=utils.payload(data_params), headers=headers)
-        return out.json()
+        return ENDPOINTS['launch_resque_mode'](self.config, serverId, rescueImageId, callbackUrl, password, postInstallScript, powerCycle, sshKeys)
 
     def list_credentials(self,
                          serverId: str,
@@ -594,13 +512,7 @@ class DedicatedServers():
         :param offset: Return results starting from the given offset.
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        query_params = {
-            'limit': limit,
-            'offset': offset
-        }
-        out = utils.httpGet(self.config['API_URL'], '/bareMetals/v2/servers/{}/credentials?'.format(serverId), query=utils.query(query_params), headers=headers)
-        return out.json()
+        return ENDPOINTS['list_credentials'](self.config, serverId, limit, offset)
 
     def create_credentials(self,
                            serverId: str,
@@ -616,17 +528,7 @@ class DedicatedServers():
         :param username: The username for the credentials.
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {
-            'x-lsw-auth': self.config['API_KEY'],
-            'content-type': 'application/json'
-        }
-        data_params = {
-            "password": password,
-            "type": type,
-            "username": username
-        }
-        out = utils.httpPost(self.config['API_URL'], '/bareMetals/v2/servers/{}/credentials'.format(serverId), data=utils.payload(data_params), headers=headers)
-        return out.json()
+        return ENDPOINTS['create_credentials'](self.config, serverId, password, type, username)
 
     def list_credentials_by_type(self,
                                  serverId: str,
@@ -642,13 +544,7 @@ class DedicatedServers():
         :param offset: Return results starting from the given offset.
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        query_params = {
-            'limit': limit,
-            'offset': offset
-        }
-        out = utils.httpGet(self.config['API_URL'], '/bareMetals/v2/servers/{}/credentials/{}?'.format(serverId, type), query=utils.query(query_params), headers=headers)
-        return out.json()
+        return ENDPOINTS['list_credentials_by_type'](self.config, serverId, type, limit, offset)
 
     def delete_user_credentials(self,
                                 serverId: str,
@@ -662,9 +558,7 @@ class DedicatedServers():
         :param username: Username.
         :return: Bool.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        out = utils.httpDelete(self.config['API_URL'], '/bareMetals/v2/servers/{}/credentials/{}/{}'.format(serverId, type, username), headers=headers)
-        return True if out.status_code == 204 else False
+        return ENDPOINTS['delete_user_credentials'](self.config, serverId, type, username)
 
     def show_user_credentials(self,
                               serverId: str,
@@ -678,9 +572,7 @@ class DedicatedServers():
         :param username: Username.
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        out = utils.httpGet(self.config['API_URL'], '/bareMetals/v2/servers/{}/credentials/{}/{}'.format(serverId, type, username), headers=headers)
-        return out.json()
+        return ENDPOINTS['show_user_credentials'](self.config, serverId, type, username)
 
     def update_user_credentials(self,
                                 serverId: str,
@@ -698,15 +590,7 @@ class DedicatedServers():
         :param password: The password for the credentials.
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {
-            'x-lsw-auth': self.config['API_KEY'],
-            'content-type': 'application/json'
-        }
-        data_params = {
-            "password": password
-        }
-        out = utils.httpPut(self.config['API_URL'], '/bareMetals/v2/servers/{}/credentials/{}/{}'.format(serverId, type, username), query=utils.query(data_params), headers=headers)
-        return out.json()
+        return ENDPOINTS['update_user_credentials'](self.config, serverId, type, username, password)
 
     def show_bandwidth_metrics(self,
                                serverId: str,
@@ -724,13 +608,7 @@ class DedicatedServers():
         :param granularity: Specify the preferred interval for each metric. If granularity is omitted from the request, only one metric is returned.  Enum: "5MIN" "HOUR" "DAY" "WEEK" "MONTH" "YEAR"
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        query_params = {
-            'granularity': granularity,
-            'aggregation': aggregation
-        }
-        out = utils.httpGet(self.config['API_URL'], '/bareMetals/v2/servers/{}/metrics/bandwidth?from={}&to={}'.format(serverId, date_from, date_to), query=utils.query(query_params), headers=headers)
-        return out.json()
+        return ENDPOINTS['show_bandwidth_metrics'](self.config, serverId, date_from, date_to, aggregation, granularity)
 
     def show_datatraffic_metrics(self,
                                  serverId: str,
@@ -748,13 +626,7 @@ class DedicatedServers():
         :param granularity: Specify the preferred interval for each metric. If granularity is omitted from the request, only one metric is returned.  Enum: "5MIN" "HOUR" "DAY" "WEEK" "MONTH" "YEAR"
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        query_params = {
-            'granularity': granularity,
-            'aggregation': aggregation
-        }
-        out = utils.httpGet(self.config['API_URL'], '/bareMetals/v2/servers/{}/metrics/datatraffic?from={}&to={}'.format(serverId, date_from, date_to), query=utils.query(query_params), headers=headers)
-        return out.json()
+        return ENDPOINTS['show_datatraffic_metrics'](self.config, serverId, date_from, date_to, aggregation, granularity)
 
     def list_bandwidth_notification_settings(self,
                                              serverId: str,
@@ -768,13 +640,7 @@ class DedicatedServers():
         :param offset: Return results starting from the given offset.
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        query_params = {
-            'limit': limit,
-            'offset': offset
-        }
-        out = utils.httpGet(self.config['API_URL'], '/bareMetals/v2/servers/{}/notificationSettings/bandwidth?'.format(serverId), query=utils.query(query_params), headers=headers)
-        return out.json()
+        return ENDPOINTS['list_bandwidth_notification_settings'](self.config, serverId, limit, offset)
 
     def create_bandwidth_notification_settings(self,
                                                serverId: str,
@@ -790,17 +656,7 @@ class DedicatedServers():
         :param unit: Unit for the Bandwidth Notification.  Enum: "Gbps" "Mbps"
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {
-            'x-lsw-auth': self.config['API_KEY'],
-            'content-type': 'application/json'
-        }
-        data_params = {
-            'frequency': frequency,
-            'threshold': threshold,
-            'unit': unit
-        }
-        out = utils.httpGet(self.config['API_URL'], '/bareMetals/v2/servers/{}/notificationSettings/bandwidth'.format(serverId), data=utils.query(data_params), headers=headers)
-        return out.json()
+        return ENDPOINTS['create_bandwidth_notification_settings'](self.config, serverId, frequency, threshold, unit)
 
     def delete_bandwidth_notification_setting(self,
                                               serverId: str,
@@ -812,9 +668,7 @@ class DedicatedServers():
         :param notificationSettingId: The ID of a notification setting.
         :return: Bool.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        out = utils.httpDelete(self.config['API_URL'], '/bareMetals/v2/servers/{}/notificationSettings/bandwidth/{}'.format(serverId, notificationSettingId), headers=headers)
-        return True if out.status_code == 204 else False
+        return ENDPOINTS['delete_bandwidth_notification_setting'](self.config, serverId, notificationSettingId)
 
     def show_bandwidth_notification_setting(self,
                                             serverId: str,
@@ -826,9 +680,7 @@ class DedicatedServers():
         :param notificationSettingId: The ID of a notification setting.
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        out = utils.httpGet(self.config['API_URL'], '/bareMetals/v2/servers/{}/notificationSettings/bandwidth/{}'.format(serverId, notificationSettingId), headers=headers)
-        return out.json()
+        return ENDPOINTS['show_bandwidth_notification_setting'](self.config, serverId, notificationSettingId)
 
     def update_bandwidth_notification_setting(self,
                                               serverId: str,
@@ -846,17 +698,7 @@ class DedicatedServers():
         :param unit: Unit for the Bandwidth Notification.  Enum: "Gbps" "Mbps"
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {
-            'x-lsw-auth': self.config['API_KEY'],
-            'content-type': 'application/json'
-        }
-        data_params = {
-            'frequency': frequency,
-            'threshold': threshold,
-            'unit': unit
-        }
-        out = utils.httpPut(self.config['API_URL'], '/bareMetals/v2/servers/{}/notificationSettings/bandwidth/{}'.format(serverId, notificationSettingId), query=utils.query(data_params), headers=headers)
-        return out.json()
+        return ENDPOINTS['update_bandwidth_notification_setting'](self.config, serverId, notificationSettingId, frequency, threshold, unit)
 
     def list_datatraffic_notification_settings(self,
                                                serverId: str,
@@ -870,13 +712,7 @@ class DedicatedServers():
         :param offset: Return results starting from the given offset.
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        query_params = {
-            'limit': limit,
-            'offset': offset
-        }
-        out = utils.httpGet(self.config['API_URL'], '/bareMetals/v2/servers/{}/notificationSettings/datatraffic?'.format(serverId), query=utils.query(query_params), headers=headers)
-        return out.json()
+        return ENDPOINTS['list_datatraffic_notification_settings'](self.config, serverId, limit, offset)
 
     def create_datatraffic_notification_settings(self,
                                                  serverId: str,
@@ -892,17 +728,7 @@ class DedicatedServers():
         :param unit: Unit for the Datatraffic Notification. Enum: "MB" "GB" "TB"
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {
-            'x-lsw-auth': self.config['API_KEY'],
-            'content-type': 'application/json'
-        }
-        data_params = {
-            'frequency': frequency,
-            'threshold': threshold,
-            'unit': unit
-        }
-        out = utils.httpPost(self.config['API_URL'], '/bareMetals/v2/servers/{}/notificationSettings/datatraffic'.format(serverId), data=utils.payload(data_params), headers=headers)
-        return out.json()
+        return ENDPOINTS['create_datatraffic_notification_settings'](self.config, serverId, frequency, threshold, unit)
 
     def delete_datatraffic_notification_setting(self,
                                                 serverId: str,
@@ -914,9 +740,7 @@ class DedicatedServers():
         :param notificationSettingId: The ID of a notification setting.
         :return: Bool.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        out = utils.httpDelete(self.config['API_URL'], '/bareMetals/v2/servers/{}/notificationSettings/datatraffic/{}'.format(serverId, notificationSettingId), headers=headers)
-        return True if out.status_code == 204 else False
+        return ENDPOINTS['delete_datatraffic_notification_setting'](self.config, serverId, notificationSettingId)
 
     def show_datatraffic_notification_setting(self,
                                               serverId: str,
@@ -928,9 +752,7 @@ class DedicatedServers():
         :param notificationSettingId: The ID of a notification setting.
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        out = utils.httpGet(self.config['API_URL'], '/bareMetals/v2/servers/{}/notificationSettings/datatraffic/{}'.format(serverId, notificationSettingId), headers=headers)
-        return out.json()
+        return ENDPOINTS['show_datatraffic_notification_setting'](self.config, serverId, notificationSettingId)
 
     def update_datatraffic_notification_setting(self,
                                                 serverId: str,
@@ -948,17 +770,7 @@ class DedicatedServers():
         :param unit: Unit for the Datatraffic Notification.  Enum: "MB" "GB" "TB"
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {
-            'x-lsw-auth': self.config['API_KEY'],
-            'content-type': 'application/json'
-        }
-        data_params = {
-            'frequency': frequency,
-            'threshold': threshold,
-            'unit': unit
-        }
-        out = utils.httpPut(self.config['API_URL'], '/bareMetals/v2/servers/{}/notificationSettings/datatraffic/{}'.format(serverId, notificationSettingId), data=utils.payload(data_params), headers=headers)
-        return out.json()
+        return ENDPOINTS['update_datatraffic_notification_setting'](self.config, serverId, notificationSettingId, frequency, threshold, unit)
 
     def inspect_ddos_notification_settings(self,
                                            serverId: str) -> dict:
@@ -968,9 +780,7 @@ class DedicatedServers():
         :param serverId: The ID of a server.
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        out = utils.httpGet(self.config['API_URL'], '/bareMetals/v2/servers/{}/notificationSettings/ddos'.format(serverId), headers=headers)
-        return out.json()
+        return ENDPOINTS['inspect_ddos_notification_settings'](self.config, serverId)
 
     def update_ddos_notification_settings(self,
                                           serverId: str,
@@ -984,16 +794,7 @@ class DedicatedServers():
         :param scrubbing: Enable or disable email notifications for nulling events. Enum: "ENABLED" "DISABLED"
         :return: Bool.
         """
-        headers = {
-            'x-lsw-auth': self.config['API_KEY'],
-            'content-type': 'application/json'
-        }
-        data_params = {
-            'nulling': nulling,
-            'scrubbing': scrubbing
-        }
-        out = utils.httpPut(self.config['API_URL'], '/bareMetals/v2/servers/{}/notificationSettings/ddos'.format(serverId), data=utils.payload(data_params), headers=headers)
-        return True if out.status_code == 204 else False
+        return ENDPOINTS['update_ddos_notification_settings'](self.config, serverId, nulling, scrubbing)
 
     def power_cycle_server(self,
                            serverId: str) -> bool:
@@ -1003,9 +804,7 @@ class DedicatedServers():
         :param serverId: The ID of a server.
         :return: Bool.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        out = utils.httpPost(self.config['API_URL'], '/bareMetals/v2/servers/{}/powerCycle'.format(serverId), headers=headers)
-        return True if out.status_code == 204 else False
+        return ENDPOINTS['power_cycle_server'](self.config, serverId)
 
     def show_power_status(self,
                           serverId: str) -> dict:
@@ -1019,9 +818,7 @@ class DedicatedServers():
         :param serverId: The ID of a server.
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        out = utils.httpGet(self.config['API_URL'], '/bareMetals/v2/servers/{}/powerInfo'.format(serverId), headers=headers)
-        return out.json()
+        return ENDPOINTS['show_power_status'](self.config, serverId)
 
     def power_off_server(self,
                          serverId: str) -> bool:
@@ -1031,9 +828,7 @@ class DedicatedServers():
         :param serverId: The ID of a server.
         :return: Bool.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        out = utils.httpPost(self.config['API_URL'], '/bareMetals/v2/servers/{}/powerOff'.format(serverId), headers=headers)
-        return True if out.status_code == 204 else False
+        return ENDPOINTS['power_off_server'](self.config, serverId)
 
     def power_on_server(self,
                         serverId: str) -> bool:
@@ -1043,9 +838,7 @@ class DedicatedServers():
         :param serverId: The ID of a server.
         :return: Bool.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        out = utils.httpPost(self.config['API_URL'], '/bareMetals/v2/servers/{}/powerOn'.format(serverId), headers=headers)
-        return True if out.status_code == 204 else False
+        return ENDPOINTS['power_on_server'](self.config, serverId)
 
     def list_operating_system(self,
                               limit: int = 20,
@@ -1059,14 +852,7 @@ class DedicatedServers():
         :param controlPanelId: Filter operating systems by control panel id.
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        query_params = {
-            'limit': limit,
-            'offset': offset,
-            'controlPanelId': controlPanelId
-        }
-        out = utils.httpGet(self.config['API_URL'], '/bareMetals/v2/operatingSystems?', query=utils.query(query_params), headers=headers)
-        return out.json()
+        return ENDPOINTS['list_operating_system'](self.config, limit, offset, controlPanelId)
 
     def show_operating_system(self,
                               operatingSystemId: str,
@@ -1080,9 +866,7 @@ class DedicatedServers():
         :param controlPanelId: The Control Panel ID
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        out = utils.httpGet(self.config['API_URL'], '/bareMetals/v2/operatingSystems/{}?operatingSystemId={}'.format(operatingSystemId, controlPanelId), headers=headers)
-        return out.json()
+        return ENDPOINTS['show_operating_system'](self.config, operatingSystemId, controlPanelId)
 
     def list_control_panels_by_os(self,
                                   operatingSystemId: str,
@@ -1096,13 +880,7 @@ class DedicatedServers():
         :param offset: Return results starting from the given offset.
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        query_params = {
-            'limit': limit,
-            'offset': offset
-        }
-        out = utils.httpGet(self.config['API_URL'], '/bareMetals/v2/operatingSystems/{}/controlPanels?'.format(operatingSystemId), query=utils.query(query_params), headers=headers)
-        return out.json()
+        return ENDPOINTS['list_control_panels_by_os'](self.config, operatingSystemId, limit, offset)
 
     def list_control_panels(self,
                             limit: int = 20,
@@ -1118,14 +896,7 @@ class DedicatedServers():
         :param operatingSystemId: Filter control panels by operating system id.
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        query_params = {
-            'limit': limit,
-            'offset': offset,
-            'operatingSystemId': operatingSystemId
-        }
-        out = utils.httpGet(self.config['API_URL'], '/bareMetals/v2/controlPanels?'.format(operatingSystemId), query=utils.query(query_params), headers=headers)
-        return out.json()
+        return ENDPOINTS['list_control_panels'](self.config, limit, offset, operatingSystemId)
 
     def rescue_images(self,
                       limit: int = 20,
@@ -1137,10 +908,4 @@ class DedicatedServers():
         :param offset: Return results starting from the given offset.
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        query_params = {
-            'limit': limit,
-            'offset': offset
-        }
-        out = utils.httpGet(self.config['API_URL'], '/bareMetals/v2/rescueImages?', query=utils.query(query_params), headers=headers)
-        return out.json()
+        return ENDPOINTS['rescue_images'](self.config, limit, offset)
@@ -2,12 +2,20 @@
 # RELEASE: 0.3.1
 # LICENSE: AGPL3.0
 
-from .core.utils import utils
+from .core.endpoints import Endpoint, Service, endpoints
 
 
-class Invoice():
-    def __init__(self, config: dict):
-        self.config = config
+PAGE = ('limit', 'offset')
+
+ENDPOINTS = endpoints({
+    'list_invoices': Endpoint('GET', '/invoices/v1/invoices', query=PAGE),
+    'pro_forma': Endpoint('GET', '/invoices/v1/invoices/proforma', query=PAGE),
+    'inspect_invoice': Endpoint('GET', '/invoices/v1/invoices/{invoiceId}')
+})
+
+
+class Invoice(Service):
+    ENDPOINTS = ENDPOINTS
 
     def list_invoices(self,
                       limit: int = 20,
@@ -19,13 +27,7 @@ class Invoice():
         :param offset: Return results starting from the given offset.
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        query_params = {
-            'limit': limit,
-            'offset': offset
-        }
-        out = utils.httpGet(self.config['API_URL'], '/invoices/v1/invoices?', query=utils.query(query_params), headers=headers)
-        return out.json()
+        return ENDPOINTS['list_invoices'](self.config, limit, offset)
 
     def pro_forma(self,
                   limit: int = 20,
@@ -37,13 +39,7 @@ class Invoice():
         :param offset: Return results starting from the given offset.
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        query_params = {
-            'limit': limit,
-            'offset': offset
-        }
-        out = utils.httpGet(self.config['API_URL'], '/invoices/v1/invoices/proforma?', query=utils.query(query_params), headers=headers)
-        return out.json()
+        return ENDPOINTS['pro_forma'](self.config, limit, offset)
 
     def inspect_invoice(self,
                         invoiceId: str) -> dict:
@@ -53,6 +49,4 @@ class Invoice():
         :param invoiceId: Invoice Id.
         :return: Standard HTTP status codes will be JSON.
         """
-        headers = {'x-lsw-auth': self.config['API_KEY']}
-        out = utils.httpGet(self.config['API_URL'], '/invoices/v1/invoices/{}'.format(invoiceId), headers=headers)
-        return out.json()
+        return ENDPOINTS['inspect_invoice'](self.config, invoiceId)
@@ -5,13 +5,32 @@
 
 from .Invoice import Invoice
 from .DedicatedServers import DedicatedServers
+from .core.cache import ResponseCache
+from .core.ratelimit import PRIORITIES, ClientLimiter
 
 
 class API():
-    def __init__(self, API_KEY=None):
+    def __init__(self, API_KEY=None, transport=None, rate=None, concurrency=None, tracer=None, adaptive=False, cache=None):
         self.config = {
             'API_URL': 'https://api.leaseweb.com',
-            'API_KEY': API_KEY
+            'API_KEY': API_KEY,
+            'TRANSPORT': transport,
+            'LIMITER': ClientLimiter(rate, concurrency, adaptive) if rate or concurrency or adaptive else None,
+            'TRACER': tracer,
+            'CACHE': ResponseCache() if cache is True else (cache or None)
         }
         self.DedicatedServers = DedicatedServers(self.config)
         self.Invoice = Invoice(self.config)
+
+    def with_priority(self, priority):
+        """
+        Client sharing the transport, request budget, tracer and cache of this one, whose requests wait for the budget with the given priority.
+
+        :param priority: 'interactive', 'normal' or 'background'.
+        :return: API instance.
+        """
+        client = API.__new__(API)
+        client.config = dict(self.config, PRIORITY=PRIORITIES.get(priority, priority))
+        client.DedicatedServers = DedicatedServers(client.config)
+        client.Invoice = Invoice(client.config)
+        return client
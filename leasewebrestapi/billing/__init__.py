@@ -0,0 +1,2 @@
+from .export import InvoiceExporter
+from .proforma import ProFormaReport
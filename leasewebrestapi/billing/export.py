@@ -0,0 +1,185 @@
+#  AUTHOR: Roman Bergman <roman.bergman@protonmail.com>
+# RELEASE: 0.0.1
+# LICENSE: AGPL3.0
+
+import csv
+import json
+import os
+
+from ..core.bulk import run_concurrent
+from ..core.ratelimit import RateLimiter
+
+
+FORMATS = ('csv', 'jsonl', 'parquet')
+
+
+def _pinned(kind) -> str:
+    """
+    Parquet type alias of a column inferred from the page it first appears on, widened so that later pages fit: all-null columns become strings and whole numbers become doubles.
+    """
+    import pyarrow.types
+
+    if pyarrow.types.is_null(kind):
+        return 'string'
+    if pyarrow.types.is_integer(kind):
+        return 'double'
+    return str(kind)
+
+
+class InvoiceExporter():
+    """
+    Stream all invoices into a CSV, JSON Lines or Parquet output.
+
+    Invoices are processed one page at a time, so memory use does not grow with the history size.
+    After every page the output is flushed and a checkpoint is written next to it; running the exporter again resumes after the last finished page.
+    CSV and JSON Lines write a single file. Parquet writes one part file per page into the `path` directory and needs the pyarrow package.
+
+    :param api: leasewebrestapi.API instance.
+    :param path: Output file, or output directory for parquet.
+    :param format: Output format.  Enum: "csv" "jsonl" "parquet"
+    :param details: Fetch every invoice with inspect_invoice() instead of exporting the list entries only.
+    :param page_size: Number of invoices per page.
+    :param max_workers: Maximum number of inspect_invoice() calls in flight.
+    :param rate: Maximum API calls per second.
+    :param fields: CSV columns. Defaults to the keys of the first exported invoice.
+    """
+    def __init__(self,
+                 api,
+                 path: str,
+                 format: str = 'jsonl',
+                 details: bool = True,
+                 page_size: int = 50,
+                 max_workers: int = 8,
+                 rate: float = 10,
+                 fields: list = None):
+        if format not in FORMATS:
+            raise ValueError('Unknown format {}. Use one of: {}'.format(format, ', '.join(FORMATS)))
+        if format == 'parquet':
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                raise ImportError('Parquet export needs pyarrow: pip3 install pyarrow')
+        self.invoices = api.Invoice
+        self.path = path
+        self.format = format
+        self.details = details
+        self.page_size = page_size
+        self.max_workers = max_workers
+        self.limiter = RateLimiter(rate)
+        self.fields = fields
+        self.checkpoint_path = path.rstrip(os.sep) + '.checkpoint'
+
+    def run(self) -> dict:
+        """
+        Export all invoices, resuming from the checkpoint if there is one.
+
+        :return: Final checkpoint: offset, exported rows, output bytes and columns.
+        """
+        state = self.load_checkpoint()
+        while True:
+            self.limiter.acquire()
+            page = self.invoices.list_invoices(limit=self.page_size, offset=state['offset'])
+            if 'errorCode' in page:
+                raise RuntimeError(page.get('errorMessage') or page['errorCode'])
+            items = page.get('invoices') or []
+            if not items:
+                break
+            rows = self._inspect(items) if self.details else items
+            state['bytes'] = self._write(rows, state)
+            state['offset'] += len(items)
+            state['rows'] += len(rows)
+            self._save_checkpoint(state)
+            total = page.get('_metadata', {}).get('totalCount')
+            if total is not None and state['offset'] >= total:
+                break
+        state['done'] = True
+        self._save_checkpoint(state)
+        return state
+
+    def load_checkpoint(self) -> dict:
+        """
+        Read the checkpoint of a previous run.
+
+        :return: Checkpoint dict, or a fresh one when there is none.
+        """
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path) as fp:
+                state = json.load(fp)
+            if state.get('format') != self.format:
+                raise ValueError('Checkpoint {} was written for format {}.'.format(self.checkpoint_path, state.get('format')))
+            if state.get('fields'):
+                self.fields = state['fields']
+            state.setdefault('schema', None)
+            return state
+        return {'format': self.format, 'offset': 0, 'rows': 0, 'bytes': 0, 'fields': self.fields, 'schema': None, 'done': False}
+
+    def _inspect(self, items):
+        def inspect(item):
+            out = self.invoices.inspect_invoice(item['id'])
+            if 'errorCode' in out:
+                raise RuntimeError(out.get('errorMessage') or out['errorCode'])
+            return out
+
+        rows = []
+        for result, err in run_concurrent(inspect, items, self.max_workers, self.limiter):
+            if err is not None:
+                raise err
+            rows.append(result)
+        return rows
+
+    def _write(self, rows, state):
+        if self.format == 'parquet':
+            return self._write_parquet(rows, state)
+        # drop whatever a crashed run wrote after its last checkpoint
+        mode = 'r+' if os.path.exists(self.path) else 'w'
+        with open(self.path, mode, newline='', encoding='utf-8') as fp:
+            fp.seek(state['bytes'])
+            fp.truncate()
+            if self.format == 'jsonl':
+                for row in rows:
+                    fp.write(json.dumps(row, separators=(',', ':')))
+                    fp.write('\n')
+            else:
+                if self.fields is None:
+                    self.fields = list(rows[0])
+                    state['fields'] = self.fields
+                writer = csv.DictWriter(fp, fieldnames=self.fields, extrasaction='ignore')
+                if state['bytes'] == 0:
+                    writer.writeheader()
+                for row in rows:
+                    writer.writerow({key: json.dumps(value) if isinstance(value, (dict, list)) else value for key, value in row.items()})
+            fp.flush()
+            os.fsync(fp.fileno())
+            return fp.tell()
+
+    def _write_parquet(self, rows, state):
+        import pyarrow
+        import pyarrow.parquet
+
+        os.makedirs(self.path, exist_ok=True)
+        part = os.path.join(self.path, 'part-{:08d}.parquet'.format(state['offset']))
+        # nested line items are kept as JSON strings, so every value fits a flat column
+        schema = state['schema'] or []
+        known = {name for name, _ in schema}
+        names = [name for name, _ in schema] + [key for key in dict.fromkeys(key for row in rows for key in row) if key not in known]
+        columns = {name: [json.dumps(row.get(name)) if isinstance(row.get(name), (dict, list)) else row.get(name) for row in rows] for name in names}
+        if len(names) > len(schema):
+            # columns keep the type of the page they first appear on; parts written before miss them, which readers take as null
+            added = pyarrow.table({name: columns[name] for name in names[len(schema):]}).schema
+            state['schema'] = schema + [[field.name, _pinned(field.type)] for field in added]
+        schema = pyarrow.schema([(name, pyarrow.type_for_alias(alias)) for name, alias in state['schema']])
+        try:
+            table = pyarrow.Table.from_pydict(columns, schema=schema)
+        except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError) as err:
+            raise ValueError('Invoices at offset {} do not fit the parquet schema of the export: {}'.format(state['offset'], err))
+        pyarrow.parquet.write_table(table, part + '.tmp')
+        os.replace(part + '.tmp', part)
+        # the schema of all parts, for readers: pyarrow.dataset.dataset(path, schema=pyarrow.parquet.read_schema(path + '/_common_metadata'))
+        pyarrow.parquet.write_metadata(schema, os.path.join(self.path, '_common_metadata'))
+        return state['bytes'] + os.path.getsize(part)
+
+    def _save_checkpoint(self, state):
+        tmp = self.checkpoint_path + '.tmp'
+        with open(tmp, 'w') as fp:
+            json.dump(state, fp)
+        os.replace(tmp, self.checkpoint_path)
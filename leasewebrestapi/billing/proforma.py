@@ -0,0 +1,103 @@
+#  AUTHOR: Roman Bergman <roman.bergman@protonmail.com>
+# RELEASE: 0.0.1
+# LICENSE: AGPL3.0
+
+import datetime
+import threading
+
+from ..core.columnar import Table
+from ..core.paging import fetch_all
+from ..core.ratelimit import RateLimiter
+
+
+class ProFormaReport():
+    """
+    Aggregated costs of the upcoming invoice.
+
+    All pro-forma pages are fetched concurrently and loaded into a columnar Table. The table is cached until the billing period (the calendar month) changes, so repeated reports do not call the API again.
+
+    :param api: leasewebrestapi.API instance.
+    :param page_size: Number of items per page.
+    :param max_workers: Maximum number of pages fetched at once.
+    :param rate: Maximum API calls per second.
+    :param item_key: Key of the contract item list in the pro_forma() response.
+    """
+    # report names of the group columns
+    GROUPS = {
+        'server': 'equipmentId',
+        'site': 'location',
+        'product': 'product',
+        'currency': 'currency'
+    }
+
+    def __init__(self,
+                 api,
+                 page_size: int = 50,
+                 max_workers: int = 8,
+                 rate: float = 10,
+                 item_key: str = 'lineItems'):
+        self.invoices = api.Invoice
+        self.page_size = page_size
+        self.max_workers = max_workers
+        self.limiter = RateLimiter(rate)
+        self.item_key = item_key
+        self._cache = None
+        self._period = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def period() -> str:
+        """
+        Current billing period.
+
+        :return: Month as YYYY-MM.
+        """
+        return datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m')
+
+    def table(self,
+              refresh: bool = False) -> Table:
+        """
+        Contract items of the upcoming invoice as a Table, cached per billing period.
+
+        :param refresh: Fetch again even if the period did not change.
+        :return: Table with one row per contract item.
+        """
+        period = self.period()
+        with self._lock:
+            if refresh or self._cache is None or self._period != period:
+                self._cache = Table.from_rows(self._fetch())
+                self._period = period
+            return self._cache
+
+    def totals(self,
+               by: list = ('server',),
+               amount: str = 'totalAmount',
+               refresh: bool = False) -> list:
+        """
+        Sum contract items per group. Amounts are always kept apart per currency.
+
+        :param by: Groups.  Enum: "server" "site" "product" "currency"
+        :param amount: Amount field to sum.
+        :param refresh: Fetch again even if the period did not change.
+        :return: List of dicts with the group values, the total and the item count.
+        """
+        if isinstance(by, str):
+            by = [by]
+        keys = [self.GROUPS.get(group, group) for group in by]
+        if 'currency' not in keys:
+            keys.append('currency')
+        table = self.table(refresh)
+        if not len(table):
+            return []
+        return table.group_by(keys, {'total': (amount, 'sum'), 'items': (amount, 'count')}).to_rows()
+
+    def _fetch(self):
+        def page(limit, offset):
+            out = self.invoices.pro_forma(limit=limit, offset=offset)
+            if self.item_key not in out and 'products' in out:
+                out[self.item_key] = out['products']
+            for item in out.get(self.item_key) or []:
+                item.setdefault('currency', out.get('currency'))
+            return out
+
+        return fetch_all(page, self.item_key, self.page_size, self.max_workers, self.limiter)
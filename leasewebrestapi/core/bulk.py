@@ -0,0 +1,58 @@
+#  AUTHOR: Roman Bergman <roman.bergman@protonmail.com>
+# RELEASE: 0.0.1
+# LICENSE: AGPL3.0
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def run_concurrent(func, items, max_workers: int = 10, limiter=None) -> list:
+    """
+    Call func(item) for every item concurrently.
+
+    Errors do not stop the other calls: every item gets its own (result, error) pair.
+
+    :param func: Callable taking one item.
+    :param items: Iterable of items.
+    :param max_workers: Maximum number of calls in flight.
+    :param limiter: Optional RateLimiter shared by all calls.
+    :return: List of (result, error) tuples in the order of items.
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    def call(item):
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            return func(item), None
+        except Exception as err:
+            return None, err
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+        return list(pool.map(call, items))
+
+
+def poll_until(check, items, deadline: float, interval: float, max_workers: int = 10, limiter=None) -> list:
+    """
+    Call check(item) for all items in concurrent rounds until it returns true for every item or the next round would start after the deadline.
+
+    An item is checked again in every round until its check returns true; a check that raises counts as not done yet.
+
+    :param check: Callable taking one item.
+    :param items: Iterable of items.
+    :param deadline: time.monotonic() value after which no round is started. The first round always runs.
+    :param interval: Seconds between rounds.
+    :param max_workers: Maximum number of checks in flight.
+    :param limiter: Optional RateLimiter shared by all checks.
+    :return: List of the items that are not done, in order.
+    """
+    pending = list(items)
+    while pending:
+        results = run_concurrent(check, pending, max_workers, limiter)
+        pending = [item for item, (done, _) in zip(pending, results) if not done]
+        if not pending or time.monotonic() + interval > deadline:
+            break
+        time.sleep(interval)
+    return pending
@@ -0,0 +1,115 @@
+#  AUTHOR: Roman Bergman <roman.bergman@protonmail.com>
+# RELEASE: 0.0.1
+# LICENSE: AGPL3.0
+
+
+import collections
+import copy
+import threading
+import time
+
+from .forksafe import ForkSafe
+
+
+# Seconds a cached answer is used, per resource. Endpoints name their resource with Endpoint(cache=...).
+TTLS = {
+    'server': 300,
+    'ips': 300,
+    'interfaces': 60,
+    'power': 15,
+    'notifications': 600
+}
+
+
+class ResponseCache(ForkSafe):
+    """
+    Read-through cache of per-server GETs, kept per client in API.config['CACHE'].
+
+    An endpoint declares the resource it reads (Endpoint(cache='ips')) or the resources it changes (Endpoint(invalidates=('ips',))).
+    Reads are answered from the cache until the TTL of their resource runs out. A call that changes a resource of a server drops the cached answers of that resource for that server, for every API key, before it is sent and again when it returns; an answer to a read that was in flight meanwhile is not kept.
+    Error answers are never cached. Cached answers are returned as copies.
+
+    The cache lives in the process: worker processes and other clients keep their own.
+
+    :param ttls: Seconds per resource, merged over TTLS. 0 disables caching of a resource.
+    :param max_entries: Number of answers kept; the least recently used are dropped first.
+    """
+    def __init__(self, ttls: dict = None, max_entries: int = 10000):
+        self.ttls = dict(TTLS, **(ttls or {}))
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries = collections.OrderedDict()
+        self._generations = {}
+        self._track()
+
+    _volatile = ('_lock',)
+
+    def _reset(self):
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _scope(endpoint, config, values):
+        serverId = values[endpoint.placeholders.index('serverId')] if 'serverId' in endpoint.placeholders else None
+        return config['API_URL'], str(serverId)
+
+    def lookup(self, endpoint, config, values) -> tuple:
+        """
+        Cached answer of a read.
+
+        :return: (hit, value, token). Pass the token to store() with the answer of the API on a miss.
+        """
+        scope = self._scope(endpoint, config, values)
+        key = (scope, endpoint.cache, config['API_KEY'], endpoint.uri(values) + endpoint.querystring(values))
+        now = time.monotonic()
+        with self._lock:
+            generation = self._generations.get((scope, endpoint.cache), 0)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now and entry[1] == generation:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, copy.deepcopy(entry[2]), None
+            self.misses += 1
+        return False, None, (key, generation)
+
+    def store(self, token, value):
+        """
+        Keep the answer of a read, unless its resource was changed while it was in flight or it is an error.
+        """
+        key, generation = token
+        ttl = self.ttls.get(key[1], 0)
+        if not ttl or (isinstance(value, dict) and 'errorCode' in value):
+            return
+        with self._lock:
+            if self._generations.get(key[:2], 0) != generation:
+                return
+            self._entries[key] = (time.monotonic() + ttl, generation, copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, endpoint, config, values):
+        """
+        Drop the cached answers of the resources a call changes, for its server.
+        """
+        scope = self._scope(endpoint, config, values)
+        with self._lock:
+            for resource in endpoint.invalidates:
+                # entries of an older generation are never returned and age out of the LRU
+                self._generations[(scope, resource)] = self._generations.get((scope, resource), 0) + 1
+            self.invalidations += 1
+
+    def clear(self):
+        """
+        Drop every cached answer.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def metrics(self) -> dict:
+        """
+        :return: Dict of entries, hits, misses and invalidations.
+        """
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses, 'invalidations': self.invalidations}
@@ -0,0 +1,135 @@
+#  AUTHOR: Roman Bergman <roman.bergman@protonmail.com>
+# RELEASE: 0.0.1
+# LICENSE: AGPL3.0
+
+
+import base64
+import json as jsonlib
+import threading
+import time
+from urllib.parse import urlsplit
+
+from .transport import Response, Transport, RequestsTransport
+
+
+REDACTED = '<REDACTED>'
+SECRET_HEADERS = ('x-lsw-auth', 'authorization', 'cookie', 'set-cookie')
+SECRET_FIELDS = ('password',)
+# the recorded body is already decoded, so its transfer headers no longer apply
+DROP_HEADERS = ('content-encoding', 'content-length', 'transfer-encoding')
+
+
+class CassetteMiss(LookupError):
+    """No recorded exchange matches the request."""
+
+
+def _redact(value):
+    if isinstance(value, dict):
+        return {key: REDACTED if key in SECRET_FIELDS else _redact(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_redact(item) for item in value]
+    return value
+
+
+def _redact_headers(headers):
+    return {key: REDACTED if key.lower() in SECRET_HEADERS else value for key, value in (headers or {}).items() if key.lower() not in DROP_HEADERS}
+
+
+def _redact_body(content):
+    try:
+        return {'json': _redact(jsonlib.loads(content))} if content else {'text': ''}
+    except ValueError:
+        try:
+            return {'text': content.decode('utf-8')}
+        except UnicodeDecodeError:
+            return {'base64': base64.b64encode(content).decode('ascii')}
+
+
+def _body(record):
+    if 'json' in record:
+        return jsonlib.dumps(record['json']).encode('utf-8')
+    if 'base64' in record:
+        return base64.b64decode(record['base64'])
+    return record.get('text', '').encode('utf-8')
+
+
+def _key(method, url, json, match_host):
+    parts = urlsplit(url)
+    target = url if match_host else parts.path + ('?' + parts.query if parts.query else '')
+    return method.upper(), target, jsonlib.dumps(_redact(json), sort_keys=True) if json else None
+
+
+class RecordingTransport(Transport):
+    """
+    Send requests through another transport and append every exchange to a cassette file (JSON Lines).
+
+    API keys, cookies and password fields are redacted before they are written.
+
+    :param path: Cassette file.
+    :param transport: Transport that sends the requests. Defaults to RequestsTransport.
+    """
+    def __init__(self, path: str, transport: Transport = None):
+        self.path = path
+        self.transport = transport or RequestsTransport()
+        self._track()
+
+    _volatile = ('_lock',)
+
+    def _reset(self):
+        self._lock = threading.Lock()
+
+    def request(self, method, url, json=None, headers=None):
+        started = time.monotonic()
+        response = self.transport.request(method, url, json=json, headers=headers)
+        elapsed = time.monotonic() - started
+        record = {
+            'method': method.upper(),
+            'url': url,
+            'request': {'headers': _redact_headers(headers), 'json': _redact(json)},
+            'response': dict(_redact_body(response.content), status=response.status_code, headers=_redact_headers(dict(response.headers))),
+            'elapsed': elapsed
+        }
+        line = jsonlib.dumps(record, separators=(',', ':')) + '\n'
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as fp:
+                fp.write(line)
+        return response
+
+
+class ReplayTransport(Transport):
+    """
+    Answer requests from a cassette file without touching the network.
+
+    Requests match on method, path, query and JSON body. Repeated requests replay the recorded answers in order; the last answer repeats once they run out.
+
+    :param path: Cassette file.
+    :param latency: Multiplier for the recorded latency: 1 replays it as recorded, 0.1 ten times faster, 0 without delay.
+    :param match_host: Also match the scheme and host, not only the path.
+    """
+    def __init__(self, path: str, latency: float = 0.0, match_host: bool = False):
+        self.latency = latency
+        self.match_host = match_host
+        self._exchanges = {}
+        self._track()
+        with open(path, encoding='utf-8') as fp:
+            for line in fp:
+                if line.strip():
+                    record = jsonlib.loads(line)
+                    key = _key(record['method'], record['url'], record['request'].get('json'), match_host)
+                    self._exchanges.setdefault(key, []).append(record)
+
+    _volatile = ('_lock',)
+
+    def _reset(self):
+        self._lock = threading.Lock()
+
+    def request(self, method, url, json=None, headers=None):
+        key = _key(method, url, json, self.match_host)
+        with self._lock:
+            records = self._exchanges.get(key)
+            if not records:
+                raise CassetteMiss('No recorded exchange for {} {}'.format(method.upper(), url))
+            record = records.pop(0) if len(records) > 1 else records[0]
+        if self.latency:
+            time.sleep(record['elapsed'] * self.latency)
+        return Response(record['response']['status'], record['response']['headers'], _body(record['response']), record['elapsed'])
@@ -0,0 +1,167 @@
+#  AUTHOR: Roman Bergman <roman.bergman@protonmail.com>
+# RELEASE: 0.0.1
+# LICENSE: AGPL3.0
+
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+AGGREGATIONS = ('sum', 'count', 'mean', 'min', 'max')
+
+
+def _column(values):
+    if numpy is None:
+        return list(values)
+    if all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in values) and len(values):
+        return numpy.asarray(values, dtype=float)
+    column = numpy.empty(len(values), dtype=object)
+    column[:] = values
+    return column
+
+
+def _factorize(column):
+    """
+    Code every value of a column by its distinct value, vectorized with numpy.unique(). None and NaN are a value of their own.
+
+    :return: (codes, number of distinct values).
+    """
+    if column.dtype == object:
+        missing = numpy.equal(column, None)
+    elif column.dtype.kind == 'f':
+        missing = numpy.isnan(column)
+    else:
+        missing = numpy.zeros(len(column), dtype=bool)
+    present = column[~missing]
+    try:
+        uniques, inverse = numpy.unique(present, return_inverse=True)
+        distinct = len(uniques)
+    except TypeError:
+        # values that do not sort together, e.g. str and int in one object column
+        groups = {}
+        inverse = numpy.fromiter((groups.setdefault(value, len(groups)) for value in present), dtype=numpy.intp, count=len(present))
+        distinct = len(groups)
+    codes = numpy.full(len(column), distinct, dtype=numpy.intp)
+    codes[~missing] = inverse.reshape(-1)
+    return codes, distinct + int(missing.any())
+
+
+def _numbers(column):
+    if column.dtype == object:
+        return numpy.array([0.0 if value is None else float(value) for value in column], dtype=float)
+    return numpy.asarray(column, dtype=float)
+
+
+class Table():
+    """
+    Small column store.
+
+    Columns are numpy arrays when numpy is installed, so filters and group-bys run vectorized; otherwise they are plain lists and the same operations run in Python.
+    """
+    def __init__(self, columns: dict):
+        self.columns = {name: _column(values) if isinstance(values, list) else values for name, values in columns.items()}
+        self.size = len(next(iter(self.columns.values()))) if self.columns else 0
+
+    @classmethod
+    def from_rows(cls, rows: list, fields: list = None) -> 'Table':
+        """
+        Build a table from a list of dicts.
+
+        :param rows: List of flat dicts.
+        :param fields: Columns to keep. Defaults to every key seen in rows.
+        :return: Table.
+        """
+        if fields is None:
+            fields = list(dict.fromkeys(key for row in rows for key in row))
+        return cls({field: [row.get(field) for row in rows] for field in fields})
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def select(self, names: list) -> 'Table':
+        """
+        Keep only the given columns.
+        """
+        return Table({name: self.columns[name] for name in names})
+
+    def filter(self, mask) -> 'Table':
+        """
+        Keep the rows where mask is true.
+
+        :param mask: Boolean array or list, one value per row.
+        :return: Table.
+        """
+        if numpy is not None:
+            mask = numpy.asarray(mask, dtype=bool)
+            return Table({name: column[mask] for name, column in self.columns.items()})
+        return Table({name: [value for value, keep in zip(column, mask) if keep] for name, column in self.columns.items()})
+
+    def group_by(self, keys: list, aggregations: dict) -> 'Table':
+        """
+        Group rows by key columns and aggregate other columns.
+
+        :param keys: Key column names.
+        :param aggregations: Dict of output name: (column, function). Function Enum: "sum" "count" "mean" "min" "max"
+        :return: Table with the key columns and one column per aggregation, one row per group.
+        """
+        for _, function in aggregations.values():
+            if function not in AGGREGATIONS:
+                raise ValueError('Unknown aggregation {}. Use one of: {}'.format(function, ', '.join(AGGREGATIONS)))
+        if numpy is not None:
+            codes = numpy.zeros(self.size, dtype=numpy.intp)
+            first = numpy.zeros(min(self.size, 1), dtype=numpy.intp)
+            for key in keys:
+                key_codes, distinct = _factorize(self.columns[key])
+                # combine with the codes of the previous keys and renumber, so codes stay below the number of rows
+                _, first, codes = numpy.unique(codes * distinct + key_codes, return_index=True, return_inverse=True)
+                codes = codes.reshape(-1)
+            # number the groups in order of their first row
+            order = numpy.argsort(first, kind='stable')
+            rank = numpy.empty(len(order), dtype=numpy.intp)
+            rank[order] = numpy.arange(len(order))
+            codes = rank[codes]
+            groups = len(order)
+            out = {key: self.columns[key][first[order]] for key in keys}
+            counts = numpy.bincount(codes, minlength=groups)
+            for name, (column, function) in aggregations.items():
+                values = _numbers(self.columns[column]) if function != 'count' else None
+                if function == 'count':
+                    out[name] = counts
+                elif function in ('sum', 'mean'):
+                    sums = numpy.bincount(codes, weights=values, minlength=groups)
+                    out[name] = sums if function == 'sum' else sums / numpy.maximum(counts, 1)
+                else:
+                    result = numpy.full(groups, numpy.inf if function == 'min' else -numpy.inf)
+                    (numpy.minimum if function == 'min' else numpy.maximum).at(result, codes, values)
+                    out[name] = result
+            return Table(out)
+        groups = {}
+        codes = []
+        for row in zip(*(self.columns[key] for key in keys)):
+            codes.append(groups.setdefault(row, len(groups)))
+        out = {key: [group[i] for group in groups] for i, key in enumerate(keys)}
+        for name, (column, function) in aggregations.items():
+            buckets = [[] for _ in groups]
+            for code, value in zip(codes, self.columns[column]):
+                buckets[code].append(value)
+            if function == 'count':
+                out[name] = [len(bucket) for bucket in buckets]
+            elif function == 'sum':
+                out[name] = [sum(float(value or 0) for value in bucket) for bucket in buckets]
+            elif function == 'mean':
+                out[name] = [sum(float(value or 0) for value in bucket) / max(len(bucket), 1) for bucket in buckets]
+            else:
+                out[name] = [(min if function == 'min' else max)(float(value or 0) for value in bucket) for bucket in buckets]
+        return Table(out)
+
+    def to_rows(self) -> list:
+        """
+        Convert back to a list of dicts.
+        """
+        names = list(self.columns)
+        return [dict(zip(names, (value.item() if hasattr(value, 'item') else value for value in row))) for row in zip(*(self.columns[name] for name in names))]
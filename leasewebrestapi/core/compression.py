@@ -0,0 +1,88 @@
+#  AUTHOR: Roman Bergman <roman.bergman@protonmail.com>
+# RELEASE: 0.0.1
+# LICENSE: AGPL3.0
+
+
+import threading
+
+from .forksafe import ForkSafe
+
+try:
+    import brotli  # noqa: F401
+    BROTLI = True
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        BROTLI = True
+    except ImportError:
+        BROTLI = False
+
+
+def accept_encoding() -> str:
+    """
+    Accept-Encoding header value for the codings this installation can decode.
+
+    Responses are decoded chunk by chunk while they are read (urllib3 / httpx streaming decoders), so the compressed body is never held next to the decoded one. Brotli needs the brotli package: pip3 install leasewebrestapi[brotli]
+    """
+    return 'br, gzip, deflate' if BROTLI else 'gzip, deflate'
+
+
+def wire_size(response) -> int:
+    """
+    Number of body bytes received on the wire, before decompression.
+    """
+    size = getattr(response, 'wire_bytes', None)
+    if size is not None:
+        return size
+    # requests: urllib3 counts the raw bytes it pulled from the socket
+    raw = getattr(response, 'raw', None)
+    if raw is not None and hasattr(raw, 'tell'):
+        return raw.tell()
+    # httpx
+    size = getattr(response, 'num_bytes_downloaded', None)
+    if size is not None:
+        return size
+    return len(response.content)
+
+
+class WireStats(ForkSafe):
+    """
+    Thread-safe per-endpoint accounting of compressed (wire) versus decompressed bytes.
+    """
+    _volatile = ('_lock',)
+
+    def __init__(self):
+        self._stats = {}
+        self._track()
+
+    def _reset(self):
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, wire: int, decoded: int):
+        with self._lock:
+            stats = self._stats.get(endpoint)
+            if stats is None:
+                stats = self._stats[endpoint] = [0, 0, 0]
+            stats[0] += 1
+            stats[1] += wire
+            stats[2] += decoded
+
+    def snapshot(self) -> dict:
+        """
+        :return: Dict of endpoint: requests, wire_bytes, decoded_bytes and ratio (decoded / wire).
+        """
+        with self._lock:
+            return {endpoint: {
+                'requests': requests,
+                'wire_bytes': wire,
+                'decoded_bytes': decoded,
+                'ratio': decoded / wire if wire else None
+            } for endpoint, (requests, wire, decoded) in self._stats.items()}
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+# INIT
+wirestats = WireStats()
@@ -0,0 +1,271 @@
+#  AUTHOR: Roman Bergman <roman.bergman@protonmail.com>
+# RELEASE: 0.0.1
+# LICENSE: AGPL3.0
+
+
+import inspect
+import re
+import time
+from urllib.parse import quote
+
+from .bulk import run_concurrent
+from .compression import accept_encoding
+from .tracing import start_span
+from .utils import utils
+
+
+_PLACEHOLDER = re.compile(r'\{(\w+)\}')
+_HEADERS = {}
+
+
+def _headers(api_key, json):
+    # one shared headers dict per API key, built once
+    key = (api_key, json)
+    headers = _HEADERS.get(key)
+    if headers is None:
+        headers = {'x-lsw-auth': api_key, 'accept-encoding': accept_encoding()}
+        if json:
+            headers['content-type'] = 'application/json'
+        _HEADERS[key] = headers
+    return headers
+
+
+def _text(value):
+    if value is True:
+        return 'true'
+    if value is False:
+        return 'false'
+    return str(value)
+
+
+class Endpoint():
+    """
+    Declarative description of one API call.
+
+    Positional values of a call are the path placeholders in template order, then the query parameters, then the body parameters. This is also the parameter order of the matching service method.
+
+    :param method: HTTP method.
+    :param path: Path template, e.g. '/bareMetals/v2/servers/{serverId}'.
+    :param query: Query parameter names.
+    :param body: JSON body parameter names.
+    :param success: Status code of a successful call without JSON answer, e.g. 204.
+    :param returns: Enum: "json" (response JSON), "bool" (True on success status), "json_or_true" (True on success status, else response JSON).
+    :param names: Wire names for parameters whose Python name differs, e.g. {'date_from': 'from'}.
+    :param cache: Resource read by this GET, cached by the ResponseCache of the client, e.g. 'ips'.
+    :param invalidates: Resources of the server changed by this call, dropped from the ResponseCache.
+    """
+    def __init__(self,
+                 method: str,
+                 path: str,
+                 query: tuple = (),
+                 body: tuple = (),
+                 success: int = None,
+                 returns: str = 'json',
+                 names: dict = None,
+                 cache: str = None,
+                 invalidates: tuple = ()):
+        self.method = method
+        self.path = path
+        self.query = tuple(query)
+        self.body = tuple(body)
+        self.success = success
+        self.returns = returns
+        self.names = names or {}
+        self.cache = cache
+        self.invalidates = tuple(invalidates)
+        self.placeholders = tuple(_PLACEHOLDER.findall(path))
+        self.params = self.placeholders + self.query + self.body
+        self.name = None
+        self._compile()
+
+    def _compile(self):
+        pieces = _PLACEHOLDER.split(self.path)
+        # even pieces are literal text, odd pieces are placeholder names
+        self._literals = pieces[0::2]
+        count = len(self.placeholders)
+        self._query = [(count + i, quote(self.names.get(name, name), safe='') + '=') for i, name in enumerate(self.query)]
+        self._body = [(count + len(self.query) + i, self.names.get(name, name)) for i, name in enumerate(self.body)]
+        self._has_body = self.method in ('POST', 'PUT')
+
+    def uri(self, values) -> str:
+        literals = self._literals
+        uri = literals[0]
+        for i in range(len(self.placeholders)):
+            uri += quote(_text(values[i]), safe=':@') + literals[i + 1]
+        return uri
+
+    def querystring(self, values) -> str:
+        parts = [name + quote(_text(values[i]), safe='') for i, name in self._query if values[i] is not None and values[i] != '']
+        return '?' + '&'.join(parts) if parts else ''
+
+    def payload(self, values) -> dict:
+        return {name: values[i] for i, name in self._body if values[i] is not None}
+
+    def send(self, config, values, span=None, flight=None):
+        return utils.httpRequest(self.method, config['API_URL'], self.uri(values), self.querystring(values),
+                                 self.payload(values) if self._has_body else None,
+                                 _headers(config['API_KEY'], self._has_body), config.get('TRANSPORT'), self.path, config.get('LIMITER'), span, config.get('PRIORITY'), flight)
+
+    async def send_async(self, config, values, span=None, flight=None):
+        return await utils.httpRequestAsync(self.method, config['API_URL'], self.uri(values), self.querystring(values),
+                                            self.payload(values) if self._has_body else None,
+                                            _headers(config['API_KEY'], self._has_body), config.get('TRANSPORT'), self.path, config.get('LIMITER'), span, config.get('PRIORITY'), flight)
+
+    def parse(self, out, span=None):
+        if isinstance(out, Exception):
+            raise out
+        if self.returns == 'bool':
+            return out.status_code == self.success
+        if self.returns == 'json_or_true' and out.status_code == self.success:
+            return True
+        if span is None:
+            return out.json()
+        started = time.perf_counter()
+        value = out.json()
+        span.set_attribute('leaseweb.json_decode', time.perf_counter() - started)
+        return value
+
+    def __call__(self, config, *values):
+        cache = config.get('CACHE')
+        if cache is None or not (self.cache or self.invalidates):
+            return self._call(config, values)
+        if self.invalidates:
+            cache.invalidate(self, config, values)
+            try:
+                return self._call(config, values)
+            finally:
+                # a read sent while this call was in flight may have cached the old state
+                cache.invalidate(self, config, values)
+        hit, value, token = cache.lookup(self, config, values)
+        if hit:
+            return value
+        value = self._call(config, values, token[1])
+        cache.store(token, value)
+        return value
+
+    def _call(self, config, values, flight=None):
+        tracer = config.get('TRACER')
+        if tracer is None:
+            return self.parse(self.send(config, values, flight=flight))
+        span = start_span(tracer, self, config, values)
+        try:
+            return self.parse(self.send(config, values, span, flight), span)
+        except Exception as err:
+            span.record_exception(err)
+            raise
+        finally:
+            span.end()
+
+    async def call_async(self, config, *values):
+        cache = config.get('CACHE')
+        if cache is None or not (self.cache or self.invalidates):
+            return await self._call_async(config, values)
+        if self.invalidates:
+            cache.invalidate(self, config, values)
+            try:
+                return await self._call_async(config, values)
+            finally:
+                cache.invalidate(self, config, values)
+        hit, value, token = cache.lookup(self, config, values)
+        if hit:
+            return value
+        value = await self._call_async(config, values, token[1])
+        cache.store(token, value)
+        return value
+
+    async def _call_async(self, config, values, flight=None):
+        tracer = config.get('TRACER')
+        if tracer is None:
+            return self.parse(await self.send_async(config, values, flight=flight))
+        span = start_span(tracer, self, config, values)
+        try:
+            return self.parse(await self.send_async(config, values, span, flight), span)
+        except Exception as err:
+            span.record_exception(err)
+            raise
+        finally:
+            span.end()
+
+
+def endpoints(table: dict) -> dict:
+    """
+    Name the endpoints of a service table.
+    """
+    for name, endpoint in table.items():
+        endpoint.name = name
+    return table
+
+
+class _Variant():
+    def __init__(self, service, kind):
+        self._service = service
+        self._kind = kind
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        endpoint = self._service.ENDPOINTS.get(name)
+        if endpoint is None:
+            raise AttributeError(name)
+        bind = _binder(type(self._service), name)
+        config = self._service.config
+        if self._kind == 'aio':
+            async def call(*args, **kwargs):
+                return await endpoint.call_async(config, *bind(args, kwargs))
+        else:
+            def call(items, max_workers: int = 10, limiter=None):
+                def one(item):
+                    if isinstance(item, dict):
+                        return endpoint(config, *bind((), item))
+                    if not isinstance(item, tuple):
+                        item = (item,)
+                    return endpoint(config, *bind(item, {}))
+                return run_concurrent(one, items, max_workers, limiter)
+        call.__name__ = name
+        call.__doc__ = getattr(type(self._service), name).__doc__
+        return call
+
+
+_BINDERS = {}
+
+
+def _binder(cls, name):
+    binder = _BINDERS.get((cls, name))
+    if binder is None:
+        signature = inspect.signature(getattr(cls, name))
+        signature = signature.replace(parameters=list(signature.parameters.values())[1:])
+
+        def binder(args, kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return bound.args
+
+        _BINDERS[(cls, name)] = binder
+    return binder
+
+
+class Service():
+    """
+    Base class of the API services.
+
+    Every method of a service is backed by an Endpoint in its ENDPOINTS table. Besides the plain methods, the same table serves:
+
+    - `service.aio.<method>(...)` - awaitable variant.
+    - `service.bulk.<method>(items, max_workers=10)` - concurrent variant over many calls. Items are argument tuples, keyword dicts or single first arguments; returns (result, error) pairs in order.
+    """
+    ENDPOINTS = {}
+
+    def __init__(self, config: dict):
+        self.config = config
+        self.aio = _Variant(self, 'aio')
+        self.bulk = _Variant(self, 'bulk')
+
+    def uncached(self) -> 'Service':
+        """
+        The same service with reads that bypass the ResponseCache of the client, for polls waiting for a change to show up.
+
+        :return: Service instance sharing the transport, request budget and tracer.
+        """
+        if self.config.get('CACHE') is None:
+            return self
+        return type(self)(dict(self.config, CACHE=None))
@@ -0,0 +1,47 @@
+#  AUTHOR: Roman Bergman <roman.bergman@protonmail.com>
+# RELEASE: 0.0.1
+# LICENSE: AGPL3.0
+
+
+import os
+import weakref
+
+
+_objects = weakref.WeakSet()
+
+
+class ForkSafe():
+    """
+    Mixin for objects holding locks, sockets or connection pools.
+
+    Subclasses create that state in _reset() and list its attributes in _volatile. The state is then:
+    - rebuilt in the child process after os.fork(), so a child never shares sockets with its parent or inherits a lock held by another thread;
+    - left out when pickling and rebuilt when unpickling.
+    """
+    _volatile = ()
+
+    def _reset(self):
+        pass
+
+    def _track(self):
+        self._reset()
+        _objects.add(self)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for name in self._volatile:
+            state.pop(name, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._track()
+
+
+def _after_fork_in_child():
+    for obj in list(_objects):
+        obj._reset()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -0,0 +1,73 @@
+#  AUTHOR: Roman Bergman <roman.bergman@protonmail.com>
+# RELEASE: 0.0.1
+# LICENSE: AGPL3.0
+
+
+from .bulk import run_concurrent
+
+
+def _check(page):
+    if isinstance(page, dict) and 'errorCode' in page:
+        raise RuntimeError(page.get('errorMessage') or page['errorCode'])
+    return page
+
+
+def iter_pages(fetch, key: str, limit: int = 50, limiter=None, **kwargs):
+    """
+    Yield the items of a paginated list call page by page.
+
+    :param fetch: List function taking limit and offset, e.g. api.DedicatedServers.list_servers.
+    :param key: Key of the item list in the response, e.g. 'servers'.
+    :param limit: Page size.
+    :param limiter: Optional RateLimiter acquired before every page.
+    :return: Generator of items.
+    """
+    offset = 0
+    while True:
+        if limiter is not None:
+            limiter.acquire()
+        page = _check(fetch(limit=limit, offset=offset, **kwargs))
+        items = page.get(key) or []
+        yield from items
+        offset += len(items)
+        total = page.get('_metadata', {}).get('totalCount')
+        if not items or (total is not None and offset >= total):
+            return
+
+
+def fetch_all(fetch, key: str, limit: int = 50, max_workers: int = 10, limiter=None, **kwargs) -> list:
+    """
+    Fetch every item of a paginated list call.
+
+    The first page tells the total count; the remaining pages are fetched concurrently.
+
+    :param fetch: List function taking limit and offset, e.g. api.DedicatedServers.list_servers.
+    :param key: Key of the item list in the response, e.g. 'servers'.
+    :param limit: Page size.
+    :param max_workers: Maximum number of pages fetched at once.
+    :param limiter: Optional RateLimiter shared by all calls.
+    :return: List of items.
+    """
+    if limiter is not None:
+        limiter.acquire()
+    first = _check(fetch(limit=limit, offset=0, **kwargs))
+    items = list(first.get(key) or [])
+    total = first.get('_metadata', {}).get('totalCount')
+    if total is None:
+        # no total count: fall back to walking the pages one by one
+        last = items
+        while len(last) >= limit:
+            if limiter is not None:
+                limiter.acquire()
+            last = _check(fetch(limit=limit, offset=len(items), **kwargs)).get(key) or []
+            items.extend(last)
+        return items
+
+    def page(offset):
+        return _check(fetch(limit=limit, offset=offset, **kwargs)).get(key) or []
+
+    for result, err in run_concurrent(page, range(limit, total, limit), max_workers, limiter):
+        if err is not None:
+            raise err
+        items.extend(result)
+    return items
@@ -0,0 +1,264 @@
+#  AUTHOR: Roman Bergman <roman.bergman@protonmail.com>
+# RELEASE: 0.0.1
+# LICENSE: AGPL3.0
+
+
+import threading
+import time
+
+from .forksafe import ForkSafe
+
+
+class RateLimiter(ForkSafe):
+    """
+    Thread-safe token bucket.
+
+    :param rate: Requests per second allowed on average.
+    :param burst: Maximum number of requests allowed at once. Defaults to rate.
+    """
+    def __init__(self, rate: float, burst: int = None):
+        self.rate = float(rate)
+        self.burst = float(burst or max(1, rate))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._track()
+
+    _volatile = ('_lock',)
+
+    def _reset(self):
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Block until a request may be sent.
+
+        :return: Seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            delay = self.try_acquire()
+            if not delay:
+                return waited
+            time.sleep(delay)
+            waited += delay
+
+    def try_acquire(self) -> float:
+        """
+        Take a token if one is available, without blocking.
+
+        :return: 0.0 when a token was taken, else seconds until the next one.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+
+class AIMDLimit(ForkSafe):
+    """
+    Adaptive concurrency limit (additive increase, multiplicative decrease).
+
+    Every healthy response raises the limit by 1/limit, so about one more request in flight per round of `limit` requests.
+    A 429, a 5xx, a transport error or a latency above `latency_factor` times the usual latency cuts the limit by `backoff`, at most once per round trip: responses to requests sent before the last cut do not cut again.
+
+    :param initial: Starting limit.
+    :param minimum: Lowest limit.
+    :param maximum: Highest limit.
+    :param backoff: Factor applied to the limit on overload.
+    :param latency_factor: Latency spike threshold, relative to the smoothed latency.
+    :param smoothing: Weight of a new latency sample in the smoothed latency.
+    """
+    def __init__(self,
+                 initial: int = 4,
+                 minimum: int = 1,
+                 maximum: int = 64,
+                 backoff: float = 0.5,
+                 latency_factor: float = 3.0,
+                 smoothing: float = 0.05):
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.latency_factor = latency_factor
+        self.smoothing = smoothing
+        self.latency = None
+        self.increases = 0
+        self.decreases = 0
+        self._last_cut = 0.0
+        self._track()
+
+    _volatile = ('_cond', 'in_flight')
+
+    def _reset(self):
+        self._cond = threading.Condition()
+        self.in_flight = 0
+
+    def acquire(self) -> float:
+        """
+        Block until fewer than `limit` requests are in flight.
+
+        :return: Seconds spent waiting.
+        """
+        started = time.monotonic()
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+        return time.monotonic() - started
+
+    def try_acquire(self) -> bool:
+        """
+        Count a request in flight if the limit allows it, without blocking.
+        """
+        with self._cond:
+            if self.in_flight >= int(self.limit):
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self, latency: float = None, overloaded: bool = False):
+        """
+        Report the end of a request and adapt the limit.
+
+        :param latency: Seconds the request took. None releases without adapting.
+        :param overloaded: The API answered 429 or 5xx, or the request failed.
+        """
+        with self._cond:
+            self.in_flight -= 1
+            if latency is not None:
+                now = time.monotonic()
+                spike = self.latency is not None and latency > self.latency * self.latency_factor
+                if overloaded or spike:
+                    if now - latency >= self._last_cut:
+                        self.limit = max(float(self.minimum), self.limit * self.backoff)
+                        self._last_cut = now
+                        self.decreases += 1
+                else:
+                    self.limit = min(float(self.maximum), self.limit + 1.0 / self.limit)
+                    self.increases += 1
+                # a lasting slowdown becomes the new normal instead of pinning the limit at its minimum
+                self.latency = latency if self.latency is None else self.latency + self.smoothing * (latency - self.latency)
+            self._cond.notify_all()
+
+    def metrics(self) -> dict:
+        """
+        :return: Dict of limit, in_flight, latency (smoothed seconds), increases and decreases.
+        """
+        with self._cond:
+            return {'limit': int(self.limit), 'in_flight': self.in_flight, 'latency': self.latency, 'increases': self.increases, 'decreases': self.decreases}
+
+
+INTERACTIVE = 0
+NORMAL = 1
+BACKGROUND = 2
+PRIORITIES = {'interactive': INTERACTIVE, 'normal': NORMAL, 'background': BACKGROUND}
+
+
+class ClientLimiter(ForkSafe):
+    """
+    Request budget of one API client: a rate limit and a maximum number of requests in flight.
+
+    Used as a context manager around every request of the client.
+    With adaptive, the number of requests in flight is an AIMDLimit between 1 and `concurrency` (default 64) that follows what the API sustains; bulk and paginated operations of the client then share it.
+
+    Requests waiting for the budget are served by priority (INTERACTIVE, NORMAL, BACKGROUND), first come first served within a priority, so an operator action skips ahead of a queued sync.
+    A waiting request moves up one priority every `aging` seconds: background work slows down under interactive load but never starves.
+
+    :param rate: Requests per second. None for no rate limit.
+    :param concurrency: Maximum requests in flight. None for no limit.
+    :param adaptive: Adapt the concurrency to 429s, 5xx and latency spikes.
+    :param aging: Seconds of waiting that count as one priority level.
+    """
+    def __init__(self, rate: float = None, concurrency: int = None, adaptive: bool = False, aging: float = 5.0):
+        self.rate = rate
+        self.concurrency = concurrency
+        self.adaptive = adaptive
+        self.aging = aging
+        self._bucket = RateLimiter(rate) if rate else None
+        self._aimd = AIMDLimit(maximum=concurrency or 64) if adaptive else None
+        self._track()
+
+    _volatile = ('_cond', '_waiting', '_in_flight', '_seq')
+
+    def _reset(self):
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._in_flight = 0
+        self._seq = 0
+
+    def acquire(self, priority: int = NORMAL) -> float:
+        """
+        Block until a request may be sent.
+
+        :param priority: INTERACTIVE, NORMAL or BACKGROUND.
+        :return: Seconds spent waiting.
+        """
+        started = time.monotonic()
+        with self._cond:
+            self._seq += 1
+            me = (priority, started, self._seq)
+            self._waiting.append(me)
+            try:
+                while True:
+                    delay = None
+                    if self._next() is me and self._slot_free():
+                        delay = self._bucket.try_acquire() if self._bucket is not None else 0.0
+                        if not delay:
+                            self._take_slot()
+                            break
+                    self._cond.wait(delay)
+            finally:
+                self._waiting.remove(me)
+                # the next request in line may fit as well
+                self._cond.notify_all()
+        return time.monotonic() - started
+
+    def release(self, latency: float = None, overloaded: bool = False):
+        """
+        :param latency: Seconds the request took, for the adaptive limit.
+        :param overloaded: The API answered 429 or 5xx, or the request failed.
+        """
+        with self._cond:
+            if self._aimd is not None:
+                self._aimd.release(latency, overloaded)
+            else:
+                self._in_flight -= 1
+            self._cond.notify_all()
+
+    def metrics(self) -> dict:
+        """
+        Current concurrency limit of the client.
+
+        :return: Dict of limit, in_flight and waiting, plus the AIMDLimit metrics when adaptive.
+        """
+        with self._cond:
+            metrics = self._aimd.metrics() if self._aimd is not None else {'limit': self.concurrency, 'in_flight': self._in_flight}
+            metrics['waiting'] = len(self._waiting)
+        return metrics
+
+    def _next(self):
+        now = time.monotonic()
+        # lower is served first; waiting time lowers the effective priority
+        return min(self._waiting, key=lambda waiter: (waiter[0] - (now - waiter[1]) / self.aging, waiter[2]))
+
+    def _slot_free(self):
+        if self._aimd is not None:
+            return self._aimd.in_flight < int(self._aimd.limit)
+        return self.concurrency is None or self._in_flight < self.concurrency
+
+    def _take_slot(self):
+        if self._aimd is not None:
+            self._aimd.try_acquire()
+        else:
+            self._in_flight += 1
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
@@ -0,0 +1,86 @@
+#  AUTHOR: Roman Bergman <roman.bergman@protonmail.com>
+# RELEASE: 0.0.1
+# LICENSE: AGPL3.0
+
+
+import asyncio
+import functools
+import threading
+import weakref
+
+from .forksafe import ForkSafe
+
+
+class _Call():
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(ForkSafe):
+    """
+    Coalesce identical in-flight calls.
+
+    While a call for a key is running, every other caller with the same key waits for it and receives the same result (or exception) instead of starting its own call.
+    """
+    _volatile = ('_lock', '_calls', '_async_calls')
+
+    def __init__(self):
+        self._track()
+
+    def _reset(self):
+        # calls in flight belong to the parent process, a child must not wait for them
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._async_calls = weakref.WeakKeyDictionary()
+
+    def do(self, key, func, *args, **kwargs):
+        """
+        Run func(*args, **kwargs) once per key for all concurrent threads.
+
+        :param key: Hashable key identifying the call.
+        :param func: Callable to run.
+        :return: Result of the call shared by every waiter.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = func(*args, **kwargs)
+        except Exception as err:
+            call.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result
+
+    async def do_async(self, key, func, *args, **kwargs):
+        """
+        Async counterpart of do().
+
+        The call runs in the loop default executor and goes through do(), so it is also shared with concurrent sync callers.
+
+        :param key: Hashable key identifying the call.
+        :param func: Blocking callable to run.
+        :return: Result of the call shared by every waiter.
+        """
+        loop = asyncio.get_running_loop()
+        calls = self._async_calls.setdefault(loop, {})
+        future = calls.get(key)
+        if future is None:
+            future = loop.run_in_executor(None, functools.partial(self.do, key, func, *args, **kwargs))
+            calls[key] = future
+            future.add_done_callback(lambda _: calls.pop(key, None))
+        # shield: a cancelled waiter must not cancel the call the others are waiting on
+        return await asyncio.shield(future)
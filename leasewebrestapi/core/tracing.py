@@ -0,0 +1,127 @@
+#  AUTHOR: Roman Bergman <roman.bergman@protonmail.com>
+# RELEASE: 0.0.1
+# LICENSE: AGPL3.0
+
+
+import collections
+import threading
+import time
+from urllib.parse import urlsplit
+
+from .forksafe import ForkSafe
+
+
+# Span attributes with the seconds spent in each phase of a call.
+PHASES = ('queue_wait', 'dns', 'connect', 'tls', 'ttfb', 'download', 'json_decode')
+
+
+def start_span(tracer, endpoint, config: dict, values):
+    """
+    Start the span of one endpoint call.
+
+    A tracer is anything with start_span(name, attributes=None) returning a span with set_attribute(key, value), record_exception(error) and end().
+    An opentelemetry.trace.Tracer fits as is; SpanRecorder is a small in-memory one.
+
+    :param tracer: Tracer of the client, API.config['TRACER'].
+    :param endpoint: The Endpoint being called.
+    :param config: Client config.
+    :param values: Positional values of the call.
+    :return: Span.
+    """
+    attributes = {
+        'http.request.method': endpoint.method,
+        'url.template': endpoint.path,
+        'server.address': urlsplit(config['API_URL']).hostname,
+        'leaseweb.endpoint': endpoint.name or endpoint.path
+    }
+    if 'serverId' in endpoint.placeholders:
+        attributes['leaseweb.server_id'] = str(values[endpoint.placeholders.index('serverId')])
+    if config.get('PRIORITY') is not None:
+        attributes['leaseweb.priority'] = config['PRIORITY']
+    return tracer.start_span('{} {}'.format(endpoint.method, endpoint.path), attributes=attributes)
+
+
+def record_response(span, response, queue_wait: float):
+    """
+    Add the status code, the client limiter wait and the transport timings of a response to a span.
+
+    Transports put the phases they can measure in response.timings: requests and urllib3 measure time to first byte and body download, httpx also connect and TLS.
+    """
+    span.set_attribute('leaseweb.queue_wait', queue_wait)
+    span.set_attribute('http.response.status_code', response.status_code)
+    for phase, seconds in (getattr(response, 'timings', None) or {}).items():
+        span.set_attribute('leaseweb.' + phase, seconds)
+
+
+class RecordedSpan():
+    def __init__(self, recorder, name, attributes):
+        self.recorder = recorder
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.errors = []
+        self.start = time.monotonic()
+        self.duration = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def record_exception(self, error, **kwargs):
+        self.errors.append(error)
+
+    def end(self, **kwargs):
+        self.duration = time.monotonic() - self.start
+        self.recorder._finish(self)
+
+
+class SpanRecorder(ForkSafe):
+    """
+    In-memory tracer keeping the last finished spans, for finding where the time of a slow sweep goes without an OpenTelemetry setup.
+
+    :param max_spans: Number of finished spans kept.
+    """
+    _volatile = ('_lock',)
+
+    def __init__(self, max_spans: int = 10000):
+        self.spans = collections.deque(maxlen=max_spans)
+        self._track()
+
+    def _reset(self):
+        self._lock = threading.Lock()
+
+    def start_span(self, name, attributes=None, **kwargs):
+        return RecordedSpan(self, name, attributes)
+
+    def _finish(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+    def summary(self, by: str = 'leaseweb.endpoint') -> dict:
+        """
+        Mean duration and mean seconds per phase of the kept spans.
+
+        :param by: Span attribute to group by.
+        :return: Dict of group: calls, errors, coalesced, duration and one key per phase (None when not measured).
+        """
+        with self._lock:
+            spans = list(self.spans)
+        groups = {}
+        for span in spans:
+            group = groups.setdefault(span.attributes.get(by), {'calls': 0, 'errors': 0, 'coalesced': 0, 'duration': 0.0, 'phases': {}})
+            group['calls'] += 1
+            group['errors'] += bool(span.errors)
+            group['coalesced'] += bool(span.attributes.get('leaseweb.coalesced'))
+            group['duration'] += span.duration
+            for phase in PHASES:
+                seconds = span.attributes.get('leaseweb.' + phase)
+                if seconds is not None:
+                    total = group['phases'].setdefault(phase, [0.0, 0])
+                    total[0] += seconds
+                    total[1] += 1
+        out = {}
+        for key, group in groups.items():
+            row = {'calls': group['calls'], 'errors': group['errors'], 'coalesced': group['coalesced'], 'duration': group['duration'] / group['calls']}
+            for phase in PHASES:
+                total = group['phases'].get(phase)
+                row[phase] = total[0] / total[1] if total else None
+            out[key] = row
+        return out
@@ -0,0 +1,216 @@
+#  AUTHOR: Roman Bergman <roman.bergman@protonmail.com>
+# RELEASE: 0.0.1
+# LICENSE: AGPL3.0
+
+
+import json as jsonlib
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+
+from .forksafe import ForkSafe
+
+
+class Response():
+    """
+    Minimal response object for transports that do not return requests.Response.
+    """
+    def __init__(self, status_code: int, headers: dict = None, content: bytes = b'', elapsed: float = 0.0):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = content
+        self.elapsed = elapsed
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8')
+
+    def json(self):
+        return jsonlib.loads(self.content)
+
+
+class Transport(ForkSafe):
+    """
+    Sends the HTTP requests of Utils.
+
+    A transport has a single method, request(), returning an object with status_code, headers, content and json().
+    It may also set response.timings, a dict of the seconds spent in the phases it can measure (dns, connect, tls, ttfb, download), for tracing.
+    Every service call goes through the transport in API.config['TRANSPORT'], or utils.transport when it is not set.
+    Connection pools are created in _reset(): transports can be pickled and get fresh pools after a fork.
+    """
+    def request(self, method: str, url: str, json=None, headers: dict = None):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class RequestsTransport(Transport):
+    """
+    Default transport using a pooled requests.Session.
+
+    :param pool_size: Maximum number of kept-alive connections per host.
+    :param timeout: Request timeout in seconds.
+    """
+    def __init__(self, pool_size: int = 10, timeout: float = None):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._track()
+
+    _volatile = ('session',)
+
+    def _reset(self):
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def request(self, method, url, json=None, headers=None):
+        started = time.perf_counter()
+        response = self.session.request(method, url, json=json, headers=headers, timeout=self.timeout, stream=True)
+        first_byte = time.perf_counter()
+        # reading the body also hands the connection back to the pool
+        response.content
+        # requests has no connection hooks: ttfb includes connecting when no pooled connection was free
+        response.timings = {'ttfb': first_byte - started, 'download': time.perf_counter() - first_byte}
+        return response
+
+    def close(self):
+        self.session.close()
+
+
+class Urllib3Transport(Transport):
+    """
+    Transport using a urllib3.PoolManager directly, without the requests layer.
+
+    :param pool_size: Maximum number of kept-alive connections per host.
+    :param timeout: Request timeout in seconds.
+    """
+    def __init__(self, pool_size: int = 10, timeout: float = None):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._track()
+
+    _volatile = ('pool',)
+
+    def _reset(self):
+        import urllib3
+
+        self.pool = urllib3.PoolManager(maxsize=self.pool_size, timeout=self.timeout)
+
+    def request(self, method, url, json=None, headers=None):
+        headers = dict(headers or {})
+        body = None
+        if json is not None:
+            body = jsonlib.dumps(json).encode('utf-8')
+            headers.setdefault('content-type', 'application/json')
+        started = time.perf_counter()
+        out = self.pool.request(method, url, body=body, headers=headers, preload_content=False)
+        first_byte = time.perf_counter()
+        content = out.read()
+        out.release_conn()
+        response = Response(out.status, dict(out.headers), content)
+        response.wire_bytes = out.tell()
+        response.timings = {'ttfb': first_byte - started, 'download': time.perf_counter() - first_byte}
+        return response
+
+    def close(self):
+        self.pool.clear()
+
+
+class HTTP2Transport(Transport):
+    """
+    Transport multiplexing concurrent requests over one HTTP/2 connection per host.
+
+    Needs httpx with HTTP/2 support: pip3 install leasewebrestapi[http2]
+
+    :param max_connections: Maximum number of connections per host.
+    :param timeout: Request timeout in seconds.
+    """
+    def __init__(self, max_connections: int = 1, timeout: float = None):
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._track()
+
+    _volatile = ('client',)
+
+    def _reset(self):
+        try:
+            import httpx
+        except ImportError:
+            raise ImportError('HTTP2Transport needs httpx: pip3 install leasewebrestapi[http2]')
+        self.client = httpx.Client(http2=True, timeout=self.timeout, limits=httpx.Limits(max_connections=self.max_connections))
+
+    def request(self, method, url, json=None, headers=None):
+        marks = {}
+
+        def trace(event, info):
+            # "http11." and "http2." events have the same phases
+            marks[event.split('.', 1)[1] if event.startswith('http') else event] = time.perf_counter()
+
+        started = time.perf_counter()
+        response = self.client.request(method, url, json=json, headers=headers, extensions={'trace': trace})
+        timings = {}
+        for phase, event in (('connect', 'connection.connect_tcp'), ('tls', 'connection.start_tls'), ('download', 'receive_response_body')):
+            if event + '.complete' in marks:
+                timings[phase] = marks[event + '.complete'] - marks[event + '.started']
+        if 'receive_response_headers.complete' in marks:
+            timings['ttfb'] = marks['receive_response_headers.complete'] - marks.get('send_request_headers.started', started)
+        response.timings = timings
+        return response
+
+    def close(self):
+        self.client.close()
+
+
+class FakeTransport(Transport):
+    """
+    In-process transport answering from registered routes, for tests and offline development.
+
+    Paths are templates like '/bareMetals/v2/servers/{serverId}'. A route answers with a fixed status and JSON body, or with a handler called as handler(method, url, json, params) where params are the template values.
+    Every request is appended to `calls`. Unknown requests get a 404 in the API error format.
+    """
+    def __init__(self):
+        self.routes = []
+        self.calls = []
+        self._track()
+
+    _volatile = ('_lock',)
+
+    def _reset(self):
+        self._lock = threading.Lock()
+
+    def add(self, method: str, path: str, json=None, status: int = 200, handler=None):
+        """
+        Register a route.
+
+        :param method: HTTP method.
+        :param path: Path template.
+        :param json: JSON body of the answer.
+        :param status: HTTP status code of the answer.
+        :param handler: Callable returning a Response, or a (status, json) tuple.
+        """
+        pattern = re.compile('^' + re.sub(r'\\{(\w+)\\}', r'(?P<\1>[^/]+)', re.escape(path)) + '$')
+        self.routes.append((method.upper(), pattern, json, status, handler))
+
+    def request(self, method, url, json=None, headers=None):
+        method = method.upper()
+        path = urlsplit(url).path
+        with self._lock:
+            self.calls.append((method, url, json))
+        for route_method, pattern, body, status, handler in self.routes:
+            match = pattern.match(path)
+            if route_method == method and match:
+                if handler is not None:
+                    out = handler(method, url, json, match.groupdict())
+                    if isinstance(out, tuple):
+                        status, body = out
+                    else:
+                        return out
+                content = jsonlib.dumps(body).encode('utf-8') if body is not None else b''
+                return Response(status, {'content-type': 'application/json'}, content)
+        content = jsonlib.dumps({'errorCode': '404', 'errorMessage': 'Resource not found: {} {}'.format(method, path)}).encode('utf-8')
+        return Response(404, {'content-type': 'application/json'}, content)
@@ -3,37 +3,97 @@
 # LICENSE: AGPL3.0
 
 
-import requests
+import asyncio
+import functools
+import time
+
+from .compression import wire_size, wirestats
+from .singleflight import SingleFlight
+from .tracing import record_response
+from .transport import RequestsTransport
 
 
 class Utils():
-    def httpGet(self, url, uri, query='', headers={}):
-        try:
-            req = requests.get('{}{}{}'.format(url, uri, query), headers=headers)
-            return req
-        except Exception as err:
-            return err
+    def __init__(self, transport=None):
+        self.transport = transport or RequestsTransport()
+        self.singleflight = SingleFlight()
+        self.wirestats = wirestats
 
-    def httpPut(self, url, uri, query='', data={}, headers={}):
+    def httpRequest(self, method, url, uri, query='', data=None, headers={}, transport=None, endpoint=None, limiter=None, span=None, priority=None, flight=None):
+        target = '{}{}{}'.format(url, uri, query)
+        transport = transport or self.transport
         try:
-            req = requests.put('{}{}{}'.format(url, uri, query), json=data, headers=headers)
+            if method == 'GET':
+                req = self.singleflight.do(self.flightKey(target, headers, priority, flight), *self.lead(span, transport, target, headers, endpoint, limiter, priority))
+            else:
+                req = self.send(transport, method, target, data, headers, endpoint, limiter, span, priority)
             return req
         except Exception as err:
             return err
 
-    def httpPost(self, url, uri, data={}, headers={}):
+    async def httpRequestAsync(self, method, url, uri, query='', data=None, headers={}, transport=None, endpoint=None, limiter=None, span=None, priority=None, flight=None):
+        target = '{}{}{}'.format(url, uri, query)
+        transport = transport or self.transport
         try:
-            req = requests.post('{}{}'.format(url, uri), json=data, headers=headers)
+            if method == 'GET':
+                req = await self.singleflight.do_async(self.flightKey(target, headers, priority, flight), *self.lead(span, transport, target, headers, endpoint, limiter, priority))
+            else:
+                loop = asyncio.get_running_loop()
+                req = await loop.run_in_executor(None, functools.partial(self.send, transport, method, target, data, headers, endpoint, limiter, span, priority))
             return req
         except Exception as err:
             return err
 
-    def httpDelete(self, url, uri, headers={}):
-        try:
-            req = requests.delete('{}{}'.format(url, uri), headers=headers)
-            return req
-        except Exception as err:
-            return err
+    def lead(self, span, transport, target, headers, endpoint, limiter, priority):
+        if span is None:
+            return self.send, transport, 'GET', target, None, headers, endpoint, limiter, None, priority
+        # only the caller whose request goes out gets the network phases; the others are marked as coalesced
+        span.set_attribute('leaseweb.coalesced', True)
+
+        def send():
+            span.set_attribute('leaseweb.coalesced', False)
+            return self.send(transport, 'GET', target, None, headers, endpoint, limiter, span, priority)
+        return (send,)
+
+    def send(self, transport, method, target, data, headers, endpoint=None, limiter=None, span=None, priority=None):
+        wait = 0.0
+        if limiter is None:
+            req = transport.request(method, target, json=data, headers=headers)
+        else:
+            wait = limiter.acquire() if priority is None else limiter.acquire(priority)
+            started = time.monotonic()
+            overloaded = True
+            try:
+                req = transport.request(method, target, json=data, headers=headers)
+                overloaded = req.status_code == 429 or req.status_code >= 500
+            finally:
+                limiter.release(time.monotonic() - started, overloaded)
+        # counted once per network request, not once per coalesced caller
+        self.wirestats.record(endpoint or method, wire_size(req), len(req.content))
+        if span is not None:
+            record_response(span, req, wait)
+        return req
+
+    def httpGet(self, url, uri, query='', headers={}, transport=None):
+        return self.httpRequest('GET', url, uri, query, headers=headers, transport=transport)
+
+    async def httpGetAsync(self, url, uri, query='', headers={}, transport=None):
+        return await self.httpRequestAsync('GET', url, uri, query, headers=headers, transport=transport)
+
+    def httpPut(self, url, uri, query='', data={}, headers={}, transport=None):
+        return self.httpRequest('PUT', url, uri, query, data, headers, transport)
+
+    def httpPost(self, url, uri, data={}, headers={}, transport=None):
+        return self.httpRequest('POST', url, uri, data=data, headers=headers, transport=transport)
+
+    def httpDelete(self, url, uri, headers={}, transport=None):
+        return self.httpRequest('DELETE', url, uri, headers=headers, transport=transport)
+
+    def flightKey(self, target, headers, priority=None, flight=None):
+        # identical GETs share one request only when they are made with the same API key,
+        # an urgent GET never waits for a queued background one,
+        # and a cached read never joins one sent before a change to its resource (flight is the cache generation)
+        return target, headers.get('x-lsw-auth'), priority, flight
 
     def query(self, query_params):
         if query_params:
@@ -0,0 +1,13 @@
+from .nullroute import NullRouter
+from .ipindex import IPIndex
+from .accounts import AccountPool
+from .processes import map_servers
+from .watcher import FleetWatcher
+from .hardware import HardwareInventory
+from .install import InstallOrchestrator
+from .notifications import NotificationReconciler
+from .isolate import NetworkIsolator
+from .privatenet import PrivateNetworkReconciler
+from .snapshot import FleetSnapshot, capture_snapshot, open_snapshot, write_snapshot
+from .query import FleetQuery
+from .metrics import MetricStore
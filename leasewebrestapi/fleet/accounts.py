@@ -0,0 +1,157 @@
+#  AUTHOR: Roman Bergman <roman.bergman@protonmail.com>
+# RELEASE: 0.0.1
+# LICENSE: AGPL3.0
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from ..api import API
+from ..core.bulk import run_concurrent
+from ..core.paging import fetch_all
+from ..core.transport import RequestsTransport
+
+
+class AccountPool():
+    """
+    Clients for several Leaseweb customer accounts.
+
+    Every account gets its own API client with its own transport (connection pool), rate limit and concurrency budget.
+    Calls by serverId are routed to the account owning the server; fleet-wide work runs on all accounts in parallel.
+
+    :param keys: Dict of account name: API key.
+    :param rate: Requests per second per account.
+    :param concurrency: Maximum requests in flight per account.
+    :param transport: Callable creating a new transport for each account.
+    """
+    def __init__(self,
+                 keys: dict,
+                 rate: float = 10,
+                 concurrency: int = 10,
+                 transport=RequestsTransport):
+        self.concurrency = concurrency
+        self.clients = {name: API(API_KEY=key, transport=transport(), rate=rate, concurrency=concurrency) for name, key in keys.items()}
+        self.owners = {}
+        self._lock = threading.Lock()
+
+    def discover(self) -> dict:
+        """
+        Map every server of every account to its account, listing all accounts in parallel.
+
+        :return: Dict of serverId: account name.
+        """
+        owners = {}
+        for name, servers in self._each(lambda client: fetch_all(client.DedicatedServers.list_servers, 'servers', max_workers=self.concurrency)).items():
+            if isinstance(servers, Exception):
+                raise servers
+            for server in servers:
+                owners[server['id']] = name
+        with self._lock:
+            self.owners.update(owners)
+        return owners
+
+    def account_of(self,
+                   serverId: str) -> str:
+        """
+        Account owning a server. Unknown servers are looked up with get_server() on all accounts.
+
+        :param serverId: The ID of a server.
+        :return: Account name, or None.
+        """
+        name = self.owners.get(serverId)
+        if name is None:
+            for name, out in self._each(lambda client: client.DedicatedServers.get_server(serverId)).items():
+                if isinstance(out, dict) and 'errorCode' not in out:
+                    with self._lock:
+                        self.owners[serverId] = name
+                    return name
+            return None
+        return name
+
+    def client_for(self,
+                   serverId: str) -> API:
+        """
+        API client of the account owning a server.
+
+        :param serverId: The ID of a server.
+        :return: leasewebrestapi.API instance.
+        """
+        name = self.account_of(serverId)
+        if name is None:
+            raise KeyError('Server {} does not belong to any account in the pool.'.format(serverId))
+        return self.clients[name]
+
+    def call(self,
+             function: str,
+             serverId: str,
+             *args,
+             **kwargs):
+        """
+        Call a DedicatedServers function on the account owning the server.
+
+        :param function: Function name, e.g. 'get_server'.
+        :param serverId: The ID of a server.
+        :return: Result of the call.
+        """
+        return getattr(self.client_for(serverId).DedicatedServers, function)(serverId, *args, **kwargs)
+
+    def map(self,
+            function: str,
+            serverIds: list,
+            *args,
+            **kwargs) -> dict:
+        """
+        Call a DedicatedServers function for many servers. Each account works through its own servers within its own concurrency budget, and all accounts run in parallel.
+
+        :param function: Function name, e.g. 'show_power_status'.
+        :param serverIds: Server IDs.
+        :return: Dict of serverId: (result, error).
+        """
+        groups = {}
+        out = {}
+        for serverId in dict.fromkeys(serverIds):
+            name = self.account_of(serverId)
+            if name is None:
+                out[serverId] = (None, KeyError('Server {} does not belong to any account in the pool.'.format(serverId)))
+            else:
+                groups.setdefault(name, []).append(serverId)
+
+        def work(name):
+            method = getattr(self.clients[name].DedicatedServers, function)
+            return run_concurrent(lambda serverId: method(serverId, *args, **kwargs), groups[name], self.concurrency)
+
+        if groups:
+            with ThreadPoolExecutor(max_workers=len(groups)) as pool:
+                for name, results in zip(groups, pool.map(work, groups)):
+                    out.update(zip(groups[name], results))
+        return out
+
+    def list_servers(self, **filters) -> list:
+        """
+        All servers of all accounts. Every server gets an `account` key.
+
+        :param filters: list_servers() filters, e.g. site='AMS-01'.
+        :return: List of server objects.
+        """
+        servers = []
+        for name, items in self._each(lambda client: fetch_all(client.DedicatedServers.list_servers, 'servers', max_workers=self.concurrency, **filters)).items():
+            if isinstance(items, Exception):
+                raise items
+            for server in items:
+                server['account'] = name
+                servers.append(server)
+        with self._lock:
+            self.owners.update((server['id'], server['account']) for server in servers)
+        return servers
+
+    def _each(self, func):
+        names = list(self.clients)
+        with ThreadPoolExecutor(max_workers=len(names) or 1) as pool:
+            results = list(pool.map(lambda name: self._safe(func, self.clients[name]), names))
+        return dict(zip(names, results))
+
+    @staticmethod
+    def _safe(func, client):
+        try:
+            return func(client)
+        except Exception as err:
+            return err
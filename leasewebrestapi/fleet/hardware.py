@@ -0,0 +1,188 @@
+#  AUTHOR: Roman Bergman <roman.bergman@protonmail.com>
+# RELEASE: 0.0.1
+# LICENSE: AGPL3.0
+
+import json
+import os
+import re
+import threading
+
+from ..core.bulk import run_concurrent
+from ..core.columnar import Table
+from ..core.paging import _check
+from ..core.ratelimit import RateLimiter
+
+
+UNITS = {'': 1, 'K': 10 ** 3, 'M': 10 ** 6, 'G': 10 ** 9, 'T': 10 ** 12, 'P': 10 ** 15}
+SERVER_FIELDS = ('serverId', 'scanId', 'scannedAt', 'cpu_model', 'cpu_count', 'cpu_cores', 'cpu_threads',
+                 'memory_bytes', 'memory_modules', 'disk_count', 'disk_bytes', 'nic_count', 'nic_speed_mbit')
+COMPONENT_FIELDS = ('serverId', 'kind', 'slot', 'vendor', 'product', 'serial', 'size_bytes', 'speed_mbit', 'cores', 'threads')
+
+
+def _number(value):
+    """
+    Parse "250GB", "1Gbit/s", "8589934592" or 4 into a number. Unknown values give None.
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    match = re.match(r'\s*([\d.]+)\s*([KMGTP]?)', str(value or ''), re.IGNORECASE)
+    if not match:
+        return None
+    return float(match.group(1)) * UNITS[match.group(2).upper()]
+
+
+def _components(serverId, result):
+    rows = []
+    for kind, key in (('cpu', 'cpu'), ('memory', 'memory'), ('disk', 'disks'), ('nic', 'network')):
+        for item in result.get(key) or []:
+            settings = item.get('settings') or {}
+            size = item.get('size_bytes') if kind == 'memory' else item.get('size')
+            speed = _number(settings.get('speed')) if kind == 'nic' else None
+            rows.append({
+                'serverId': serverId,
+                'kind': kind,
+                'slot': item.get('slot') or item.get('id') or item.get('logical_name'),
+                'vendor': item.get('vendor'),
+                'product': item.get('product') or item.get('description'),
+                'serial': item.get('serial_number'),
+                'size_bytes': _number(size) if size is not None else None,
+                'speed_mbit': speed / 10 ** 6 if speed else None,
+                'cores': _number(settings.get('cores')) if kind == 'cpu' else None,
+                'threads': _number(settings.get('threads')) if kind == 'cpu' else None
+            })
+    return rows
+
+
+def _summary(serverId, scanId, scannedAt, components):
+    def of(kind):
+        return [row for row in components if row['kind'] == kind]
+
+    cpus, memory, disks, nics = of('cpu'), of('memory'), of('disk'), of('nic')
+    return {
+        'serverId': serverId,
+        'scanId': scanId,
+        'scannedAt': scannedAt,
+        'cpu_model': cpus[0]['product'] if cpus else None,
+        'cpu_count': len(cpus),
+        'cpu_cores': sum(row['cores'] or 0 for row in cpus),
+        'cpu_threads': sum(row['threads'] or 0 for row in cpus),
+        'memory_bytes': sum(row['size_bytes'] or 0 for row in memory),
+        'memory_modules': len(memory),
+        'disk_count': len(disks),
+        'disk_bytes': sum(row['size_bytes'] or 0 for row in disks),
+        'nic_count': len(nics),
+        'nic_speed_mbit': max([row['speed_mbit'] for row in nics if row['speed_mbit']] or [None], key=lambda speed: speed or 0)
+    }
+
+
+class HardwareInventory():
+    """
+    Fleet-wide hardware information as a flat columnar table.
+
+    show_hardware_information() is fetched once per server and normalized into one summary row per server and one row per CPU, memory module, disk and NIC.
+    The cache remembers the hardware scan job it came from; refresh() only looks at list_jobs() and downloads hardware information again for servers with a newer finished hardwareScan job.
+
+    :param api: leasewebrestapi.API instance.
+    :param path: Optional JSON file keeping the cache between runs.
+    :param max_workers: Maximum number of API calls in flight.
+    :param rate: Maximum API calls per second.
+    """
+    def __init__(self,
+                 api,
+                 path: str = None,
+                 max_workers: int = 10,
+                 rate: float = 10):
+        self.servers = api.DedicatedServers
+        self.path = path
+        self.max_workers = max_workers
+        self.limiter = RateLimiter(rate)
+        self.cache = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path) as fp:
+                self.cache = json.load(fp)
+
+    def refresh(self,
+                serverIds: list) -> dict:
+        """
+        Bring the cache up to date for the given servers.
+
+        :param serverIds: Server IDs.
+        :return: Dict of fetched, cached and failed server counts, and errors (serverId: error).
+        """
+        serverIds = list(dict.fromkeys(serverIds))
+        scans = run_concurrent(self._latest_scan, serverIds, self.max_workers, self.limiter)
+        stale = []
+        errors = {}
+        for serverId, (scanId, err) in zip(serverIds, scans):
+            cached = self.cache.get(serverId)
+            if err is not None:
+                # without a job list the cached entry is still the best we have
+                if cached is None:
+                    errors[serverId] = err
+            elif cached is None or (scanId is not None and scanId != cached['summary']['scanId']):
+                stale.append((serverId, scanId))
+
+        fetched = 0
+        results = run_concurrent(self._fetch, stale, self.max_workers, self.limiter)
+        for (serverId, _), (entry, err) in zip(stale, results):
+            if err is not None:
+                errors[serverId] = err
+            else:
+                fetched += 1
+                with self._lock:
+                    self.cache[serverId] = entry
+        if self.path:
+            self.save()
+        return {'fetched': fetched, 'cached': len(serverIds) - fetched - len(errors), 'failed': len(errors), 'errors': errors}
+
+    def table(self,
+              serverIds: list = None) -> Table:
+        """
+        One row per server: CPU model, count, cores and threads, memory, disks and NICs.
+
+        :param serverIds: Limit the table to these servers. Defaults to every cached server.
+        :return: Table.
+        """
+        return Table.from_rows([entry['summary'] for entry in self._entries(serverIds)], list(SERVER_FIELDS))
+
+    def components(self,
+                   kind: str = None,
+                   serverIds: list = None) -> Table:
+        """
+        One row per hardware component.
+
+        :param kind: Optional 'cpu', 'memory', 'disk' or 'nic'.
+        :param serverIds: Limit the table to these servers. Defaults to every cached server.
+        :return: Table.
+        """
+        rows = [row for entry in self._entries(serverIds) for row in entry['components'] if kind is None or row['kind'] == kind]
+        return Table.from_rows(rows, list(COMPONENT_FIELDS))
+
+    def save(self):
+        """
+        Write the cache to `path`.
+        """
+        tmp = self.path + '.tmp'
+        with self._lock, open(tmp, 'w') as fp:
+            json.dump(self.cache, fp, separators=(',', ':'))
+        os.replace(tmp, self.path)
+
+    def _entries(self, serverIds):
+        if serverIds is None:
+            return list(self.cache.values())
+        return [self.cache[serverId] for serverId in serverIds if serverId in self.cache]
+
+    def _latest_scan(self, serverId):
+        jobs = _check(self.servers.list_jobs(serverId)).get('jobs') or []
+        scans = [job for job in jobs if job.get('type') == 'hardwareScan' and job.get('status') == 'FINISHED']
+        if not scans:
+            return None
+        latest = max(scans, key=lambda job: job.get('updatedAt') or job.get('createdAt') or '')
+        return latest.get('uuid') or latest.get('id')
+
+    def _fetch(self, target):
+        serverId, scanId = target
+        out = _check(self.servers.show_hardware_information(serverId))
+        components = _components(serverId, out.get('result') or {})
+        return {'summary': _summary(serverId, scanId, out.get('scannedAt'), components), 'components': components}
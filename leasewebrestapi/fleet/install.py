@@ -0,0 +1,218 @@
+#  AUTHOR: Roman Bergman <roman.bergman@protonmail.com>
+# RELEASE: 0.0.1
+# LICENSE: AGPL3.0
+
+import json
+import os
+import threading
+import time
+
+from ..core.bulk import run_concurrent
+from ..core.paging import _check
+from ..core.ratelimit import RateLimiter
+
+
+FINAL_JOB_STATUSES = ('FINISHED', 'FAILED', 'CANCELED', 'EXPIRED')
+
+
+class InstallOrchestrator():
+    """
+    Reinstall many servers in waves, with a crash-safe journal.
+
+    Servers are installed wave by wave. Within a wave at most `max_workers` installs run at once and at most `per_site` per site.
+    Once `min_samples` installs of a run have ended and more than `max_failure_rate` of them failed, no new installs are started and run() returns with aborted set.
+    Only installs ended by the current run count, not earlier runs recorded in the journal.
+
+    Every state change is appended to the journal file. Running again with the same journal skips finished servers and follows jobs already launched instead of installing again.
+    A job that is not done after `job_timeout` seconds gets one power_cycle_server() and another `job_timeout` seconds.
+
+    :param api: leasewebrestapi.API instance.
+    :param journal: Path of the JSON Lines journal.
+    :param operatingSystemId: Default operating system ID for every server.
+    :param wave_size: Servers per wave.
+    :param max_workers: Maximum number of installs in flight.
+    :param per_site: Maximum number of installs in flight per site.
+    :param max_failure_rate: Failure rate (0-1) that stops the run.
+    :param min_samples: Ended installs needed before the failure rate is checked.
+    :param job_timeout: Seconds to wait for an installation job.
+    :param poll_interval: Seconds between show_job() calls.
+    :param rate: Maximum API calls per second.
+    :param options: Other launch_installation() arguments for every server, e.g. sshKeys.
+    """
+    def __init__(self,
+                 api,
+                 journal: str,
+                 operatingSystemId: str = None,
+                 wave_size: int = 50,
+                 max_workers: int = 10,
+                 per_site: int = 5,
+                 max_failure_rate: float = 0.1,
+                 min_samples: int = 5,
+                 job_timeout: float = 7200,
+                 poll_interval: float = 30,
+                 rate: float = 10,
+                 **options):
+        self.servers = api.DedicatedServers
+        self.journal = journal
+        self.operatingSystemId = operatingSystemId
+        self.wave_size = wave_size
+        self.max_workers = max_workers
+        self.per_site = per_site
+        self.max_failure_rate = max_failure_rate
+        self.min_samples = min_samples
+        self.job_timeout = job_timeout
+        self.poll_interval = poll_interval
+        self.limiter = RateLimiter(rate)
+        self.options = options
+        self.state = {}
+        self._ended = {}
+        self._sites = {}
+        self._lock = threading.Lock()
+        self._abort = threading.Event()
+        self._load()
+
+    def run(self,
+            targets) -> dict:
+        """
+        Install the given servers, resuming from the journal.
+
+        :param targets: Server IDs, or dicts with serverId and optional site and launch_installation() arguments (operatingSystemId, hostname, ...).
+        :return: Dict of finished, failed, skipped and pending counts, aborted, and servers (serverId: last journal entry).
+        """
+        targets = [dict(target) if isinstance(target, dict) else {'serverId': target} for target in targets]
+        todo = [target for target in targets if self.state.get(target['serverId'], {}).get('status') != 'FINISHED']
+        skipped = len(targets) - len(todo)
+        with self._lock:
+            self._ended = {}
+        self._abort.clear()
+
+        for start in range(0, len(todo), self.wave_size):
+            if self._abort.is_set():
+                break
+            wave = todo[start:start + self.wave_size]
+            sites = run_concurrent(self._site, wave, self.max_workers, self.limiter)
+            ready = []
+            for target, (site, err) in zip(wave, sites):
+                if err is not None:
+                    # without its site the server cannot be given a per-site slot
+                    entry = self.state.get(target['serverId']) or {}
+                    self._record(target['serverId'], 'FAILED', jobId=entry.get('jobId'), error='Looking up the site failed: {}'.format(err))
+                    continue
+                target['site'] = site
+                ready.append(target)
+            self._check_failures()
+            run_concurrent(self._install, ready, self.max_workers)
+
+        counts = {'FINISHED': 0, 'FAILED': 0}
+        for target in targets:
+            status = self.state.get(target['serverId'], {}).get('status')
+            if status in counts:
+                counts[status] += 1
+        return {
+            'finished': counts['FINISHED'] - skipped,
+            'failed': counts['FAILED'],
+            'skipped': skipped,
+            'pending': len(targets) - counts['FINISHED'] - counts['FAILED'],
+            'aborted': self._abort.is_set(),
+            'servers': {target['serverId']: self.state.get(target['serverId']) for target in targets}
+        }
+
+    def failure_rate(self) -> float:
+        """
+        Share of the installs ended by the current or last run() that failed.
+        """
+        with self._lock:
+            ended = list(self._ended.values())
+        return ended.count('FAILED') / len(ended) if ended else 0.0
+
+    def _site(self, target):
+        if target.get('site'):
+            return target['site']
+        server = _check(self.servers.get_server(target['serverId']))
+        return (server.get('location') or {}).get('site')
+
+    def _slot(self, site):
+        with self._lock:
+            slot = self._sites.get(site)
+            if slot is None:
+                slot = self._sites[site] = threading.BoundedSemaphore(self.per_site)
+        return slot
+
+    def _install(self, target):
+        serverId = target['serverId']
+        with self._slot(target.get('site')):
+            if self._abort.is_set():
+                return
+            entry = self.state.get(serverId) or {}
+            try:
+                jobId = entry.get('jobId') if entry.get('status') == 'LAUNCHED' else None
+                if jobId is None:
+                    jobId = self._launch(target)
+                    self._record(serverId, 'LAUNCHED', jobId=jobId)
+                status = self._wait(serverId, jobId)
+                if status == 'FINISHED':
+                    self._record(serverId, 'FINISHED', jobId=jobId)
+                else:
+                    self._record(serverId, 'FAILED', jobId=jobId, error='Job ended with status {}.'.format(status))
+            except Exception as err:
+                self._record(serverId, 'FAILED', jobId=self.state.get(serverId, {}).get('jobId'), error=str(err))
+        self._check_failures()
+
+    def _launch(self, target):
+        options = dict(self.options)
+        options.update((key, value) for key, value in target.items() if key not in ('serverId', 'site'))
+        options.setdefault('operatingSystemId', self.operatingSystemId)
+        self.limiter.acquire()
+        job = _check(self.servers.launch_installation(target['serverId'], **options))
+        return job.get('uuid') or job.get('id')
+
+    def _wait(self, serverId, jobId):
+        power_cycled = False
+        deadline = time.monotonic() + self.job_timeout
+        while True:
+            self.limiter.acquire()
+            status = _check(self.servers.show_job(serverId, jobId)).get('status')
+            if status in FINAL_JOB_STATUSES:
+                return status
+            if time.monotonic() >= deadline:
+                if power_cycled:
+                    return 'TIMEOUT'
+                # a server hanging in PXE or POST usually continues after a power cycle
+                self.limiter.acquire()
+                if _check(self.servers.power_cycle_server(serverId)) is False:
+                    raise RuntimeError('Power cycle after {} seconds without a final job status failed.'.format(self.job_timeout))
+                self._record(serverId, 'LAUNCHED', jobId=jobId, powerCycled=True)
+                power_cycled = True
+                deadline = time.monotonic() + self.job_timeout
+            time.sleep(self.poll_interval)
+
+    def _check_failures(self):
+        with self._lock:
+            ended = len(self._ended)
+        if ended >= self.min_samples and self.failure_rate() > self.max_failure_rate:
+            self._abort.set()
+
+    def _record(self, serverId, status, **fields):
+        entry = {'serverId': serverId, 'status': status, 'time': time.time()}
+        entry.update(fields)
+        with self._lock:
+            self.state[serverId] = entry
+            if status in ('FINISHED', 'FAILED'):
+                self._ended[serverId] = status
+            with open(self.journal, 'a') as fp:
+                fp.write(json.dumps(entry, separators=(',', ':')) + '\n')
+                fp.flush()
+                os.fsync(fp.fileno())
+
+    def _load(self):
+        if not os.path.exists(self.journal):
+            return
+        with open(self.journal, 'rb+') as fp:
+            data = fp.read()
+            # a crash can leave half a line at the end, drop it before appending again
+            end = data.rfind(b'\n') + 1
+            if end < len(data):
+                fp.truncate(end)
+        for line in data[:end].splitlines():
+            entry = json.loads(line)
+            self.state[entry['serverId']] = entry
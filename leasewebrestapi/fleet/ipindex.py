@@ -0,0 +1,229 @@
+#  AUTHOR: Roman Bergman <roman.bergman@protonmail.com>
+# RELEASE: 0.0.1
+# LICENSE: AGPL3.0
+
+import ipaddress
+
+from ..core.bulk import run_concurrent
+from ..core.paging import fetch_all
+from ..core.ratelimit import RateLimiter
+
+
+class _Trie():
+    """Binary prefix tree over the bits of one IP version. A node is [zero, one, entry]."""
+    def __init__(self, bits):
+        self.bits = bits
+        self.root = [None, None, None]
+
+    def insert(self, value, prefixlen, entry):
+        node = self.root
+        for shift in range(self.bits - 1, self.bits - 1 - prefixlen, -1):
+            bit = (value >> shift) & 1
+            if node[bit] is None:
+                node[bit] = [None, None, None]
+            node = node[bit]
+        node[2] = entry
+
+    def longest(self, value):
+        node = self.root
+        found = node[2]
+        for shift in range(self.bits - 1, -1, -1):
+            node = node[(value >> shift) & 1]
+            if node is None:
+                break
+            if node[2] is not None:
+                found = node[2]
+        return found
+
+    def longest_many(self, values):
+        """Longest matches of sorted values. Every walk resumes where it leaves the path of the previous value."""
+        path = [self.root]
+        best = [self.root[2]]
+        previous = None
+        out = []
+        for value in values:
+            if previous is not None:
+                depth = min(self.bits - (value ^ previous).bit_length(), len(path) - 1)
+                del path[depth + 1:], best[depth + 1:]
+            node, found = path[-1], best[-1]
+            for shift in range(self.bits - len(path), -1, -1):
+                node = node[(value >> shift) & 1]
+                if node is None:
+                    break
+                if node[2] is not None:
+                    found = node[2]
+                path.append(node)
+                best.append(found)
+            out.append(found)
+            previous = value
+        return out
+
+    def subtree(self, value, prefixlen):
+        node = self.root
+        for shift in range(self.bits - 1, self.bits - 1 - prefixlen, -1):
+            node = node[(value >> shift) & 1]
+            if node is None:
+                return []
+        found = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node[2] is not None:
+                found.append(node[2])
+            # push one before zero so entries come out in address order
+            if node[1] is not None:
+                stack.append(node[1])
+            if node[0] is not None:
+                stack.append(node[0])
+        return found
+
+
+class IPIndex():
+    """
+    Local reverse-lookup index of the IP addresses of your dedicated servers.
+
+    Single addresses are indexed as host routes; routed subnets (an IP equal to its network address, e.g. an IPv6 /64) are indexed as blocks, so lookups return the owner of the longest matching prefix.
+    """
+    def __init__(self):
+        self._tries = {4: _Trie(32), 6: _Trie(128)}
+        self._hosts = {}
+        self.size = 0
+
+    @classmethod
+    def build(cls,
+              api,
+              max_workers: int = 20,
+              rate: float = 10,
+              **filters) -> 'IPIndex':
+        """
+        Build the index from list_ips() of every server in the fleet.
+
+        :param api: leasewebrestapi.API instance.
+        :param max_workers: Maximum number of API calls in flight.
+        :param rate: Maximum API calls per second.
+        :param filters: Extra list_servers() filters, e.g. site='AMS-01'.
+        :return: IPIndex.
+        """
+        servers = api.DedicatedServers
+        limiter = RateLimiter(rate)
+        serverIds = [server['id'] for server in fetch_all(servers.list_servers, 'servers', max_workers=max_workers, limiter=limiter, **filters)]
+
+        def ips(serverId):
+            return fetch_all(servers.list_ips, 'ips', max_workers=1, limiter=limiter, serverId=serverId)
+
+        index = cls()
+        for serverId, (result, err) in zip(serverIds, run_concurrent(ips, serverIds, max_workers)):
+            if err is not None:
+                raise err
+            index.add(serverId, result)
+        return index
+
+    def add(self,
+            serverId: str,
+            ips: list):
+        """
+        Add the IP addresses of a server.
+
+        :param serverId: The ID of a server.
+        :param ips: IP objects as returned by list_ips(), or plain IP / CIDR strings.
+        """
+        for item in ips:
+            if isinstance(item, str):
+                item = {'ip': item}
+            interface = ipaddress.ip_interface(item['ip'])
+            address = interface.ip
+            entry = dict(item, serverId=serverId)
+            if address == interface.network.network_address and interface.network.prefixlen < address.max_prefixlen:
+                self._tries[address.version].insert(int(address), interface.network.prefixlen, entry)
+            else:
+                self._tries[address.version].insert(int(address), address.max_prefixlen, entry)
+                self._hosts[address] = entry
+            self.size += 1
+
+    def lookup(self,
+               ip: str) -> dict:
+        """
+        Find the IP object owning the given address.
+
+        :param ip: The IP Address.
+        :return: IP object with its serverId, or None.
+        """
+        address = ipaddress.ip_address(ip)
+        entry = self._hosts.get(address)
+        if entry is None:
+            entry = self._tries[address.version].longest(int(address))
+        return entry
+
+    def lookup_many(self,
+                    ips) -> dict:
+        """
+        Batch version of lookup().
+
+        Addresses that are not indexed as hosts are sorted and looked up in one walk per IP version, which shares the common prefixes of neighbouring addresses.
+
+        :param ips: IP addresses.
+        :return: Dict of ip: IP object or None.
+        """
+        out = {}
+        misses = {4: [], 6: []}
+        for ip in ips:
+            if ip in out:
+                continue
+            address = ipaddress.ip_address(ip)
+            out[ip] = self._hosts.get(address)
+            if out[ip] is None:
+                misses[address.version].append((int(address), ip))
+        for version, items in misses.items():
+            items.sort()
+            for (_, ip), entry in zip(items, self._tries[version].longest_many([value for value, _ in items])):
+                out[ip] = entry
+        return out
+
+    def owners(self,
+               ips) -> dict:
+        """
+        Find the owning server of every address.
+
+        :param ips: IP addresses.
+        :return: Dict of ip: serverId or None.
+        """
+        return {ip: entry and entry['serverId'] for ip, entry in self.lookup_many(ips).items()}
+
+    def within(self,
+               network: str) -> list:
+        """
+        List all indexed addresses and blocks inside a network, e.g. '203.0.113.0/24'.
+
+        :param network: Network in CIDR notation.
+        :return: List of IP objects in address order.
+        """
+        network = ipaddress.ip_network(network, strict=False)
+        return self._tries[network.version].subtree(int(network.network_address), network.prefixlen)
+
+    def range(self,
+              first: str,
+              last: str) -> list:
+        """
+        List all indexed addresses and blocks between two addresses, both included.
+
+        :param first: First IP address of the range.
+        :param last: Last IP address of the range.
+        :return: List of IP objects in address order.
+        """
+        found = []
+        for network in ipaddress.summarize_address_range(ipaddress.ip_address(first), ipaddress.ip_address(last)):
+            found.extend(self._tries[network.version].subtree(int(network.network_address), network.prefixlen))
+        return found
+
+    def servers_within(self,
+                       network: str) -> set:
+        """
+        Set of serverIds with an address or block inside a network.
+
+        :param network: Network in CIDR notation.
+        :return: Set of serverIds.
+        """
+        return {entry['serverId'] for entry in self.within(network)}
+
+    def __len__(self):
+        return self.size
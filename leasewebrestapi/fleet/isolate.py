@@ -0,0 +1,133 @@
+#  AUTHOR: Roman Bergman <roman.bergman@protonmail.com>
+# RELEASE: 0.0.1
+# LICENSE: AGPL3.0
+
+import time
+
+from ..core.bulk import poll_until, run_concurrent
+from ..core.paging import _check, fetch_all
+from ..core.ratelimit import RateLimiter
+
+
+def _type(name):
+    # the path uses "remoteManagement", the interface list "REMOTE_MANAGEMENT"
+    return (name or '').replace('_', '').lower()
+
+
+class NetworkIsolator():
+    """
+    Close (isolate) or open (restore) the network interfaces of a group of servers at once, and confirm through list_network_interfaces().
+
+    Servers are given by ID or selected with list_servers() filters (site, privateRackId, ip, ...) plus an optional `where` predicate on the server objects, e.g. for a contract reference used as tag.
+
+    :param api: leasewebrestapi.API instance.
+    :param max_workers: Maximum number of API calls in flight.
+    :param rate: Maximum API calls per second.
+    :param verify_timeout: Seconds to wait for the interfaces to show the new status. 0 checks once.
+    :param verify_interval: Seconds between verification rounds.
+    """
+    def __init__(self,
+                 api,
+                 max_workers: int = 50,
+                 rate: float = 20,
+                 verify_timeout: float = 120,
+                 verify_interval: float = 5):
+        self.servers = api.DedicatedServers
+        self.fresh = self.servers.uncached()
+        self.max_workers = max_workers
+        self.limiter = RateLimiter(rate)
+        self.verify_timeout = verify_timeout
+        self.verify_interval = verify_interval
+
+    def select(self,
+               where=None,
+               **filters) -> list:
+        """
+        Server IDs matching list_servers() filters.
+
+        :param where: Optional callable taking a server object and returning True to keep it.
+        :param filters: list_servers() filters, e.g. site='AMS-01' or privateRackId='<rack id>'.
+        :return: List of server IDs.
+        """
+        servers = fetch_all(self.servers.list_servers, 'servers', max_workers=self.max_workers, limiter=self.limiter, **filters)
+        return [server['id'] for server in servers if where is None or where(server)]
+
+    def isolate(self,
+                serverIds: list = None,
+                networkType: str = None,
+                where=None,
+                **filters) -> dict:
+        """
+        Close the network interfaces of the given or selected servers.
+
+        :param serverIds: Server IDs. When None, servers are selected with `where` and `filters` like select().
+        :param networkType: Close only this interface: "public", "internal" or "remoteManagement". Defaults to all interfaces.
+        :return: Isolation report.
+        """
+        return self._run(serverIds, networkType, where, filters, 'CLOSED')
+
+    def restore(self,
+                serverIds: list = None,
+                networkType: str = None,
+                where=None,
+                **filters) -> dict:
+        """
+        Open the network interfaces of the given or selected servers.
+
+        :param serverIds: Server IDs. When None, servers are selected with `where` and `filters` like select().
+        :param networkType: Open only this interface: "public", "internal" or "remoteManagement". Defaults to all interfaces.
+        :return: Report like isolate().
+        """
+        return self._run(serverIds, networkType, where, filters, 'OPEN')
+
+    def _run(self, serverIds, networkType, where, filters, status):
+        started = time.monotonic()
+        if serverIds is None:
+            if not filters and where is None:
+                raise ValueError('Give server IDs or list_servers() filters; refusing to select the whole fleet implicitly.')
+            serverIds = self.select(where, **filters)
+        selected = time.monotonic()
+        outcomes = [{'serverId': serverId, 'networkType': networkType, 'status': None, 'error': None, 'called': None, 'elapsed': None}
+                    for serverId in dict.fromkeys(serverIds)]
+
+        verb = 'close' if status == 'CLOSED' else 'open'
+
+        def call(outcome):
+            try:
+                if networkType is None:
+                    out = getattr(self.servers, verb + '_all_network_interfaces')(outcome['serverId'])
+                else:
+                    out = getattr(self.servers, verb + '_network_interface_by_type')(outcome['serverId'], networkType)
+            finally:
+                outcome['called'] = time.monotonic() - selected
+            if out is False:
+                raise RuntimeError('Could not {} network interfaces.'.format(verb))
+            return _check(out)
+
+        for outcome, (_, err) in zip(outcomes, run_concurrent(call, outcomes, self.max_workers, self.limiter)):
+            if err is not None:
+                outcome['status'] = 'FAILED'
+                outcome['error'] = str(err)
+                outcome['elapsed'] = outcome['called']
+        self._verify([outcome for outcome in outcomes if outcome['status'] is None], networkType, status, selected)
+
+        report = {'status': status, 'servers': len(outcomes), 'select_seconds': selected - started, 'elapsed': time.monotonic() - started}
+        for key in ('OK', 'FAILED', 'UNVERIFIED'):
+            report[key.lower()] = sum(1 for outcome in outcomes if outcome['status'] == key)
+        report['outcomes'] = outcomes
+        return report
+
+    def _verify(self, pending, networkType, status, started):
+        def check(outcome):
+            interfaces = _check(self.fresh.list_network_interfaces(outcome['serverId'])).get('networkInterfaces') or []
+            if networkType is not None:
+                interfaces = [item for item in interfaces if _type(item.get('type')) == _type(networkType)]
+            if not interfaces or any(item.get('status') != status for item in interfaces):
+                return False
+            outcome['status'] = 'OK'
+            outcome['elapsed'] = time.monotonic() - started
+            return True
+
+        for outcome in poll_until(check, pending, started + self.verify_timeout, self.verify_interval, self.max_workers, self.limiter):
+            outcome['status'] = 'UNVERIFIED'
+            outcome['elapsed'] = time.monotonic() - started
@@ -0,0 +1,341 @@
+#  AUTHOR: Roman Bergman <roman.bergman@protonmail.com>
+# RELEASE: 0.0.1
+# LICENSE: AGPL3.0
+
+import datetime
+import mmap
+import os
+import struct
+import threading
+import time
+
+from ..core.bulk import run_concurrent
+from ..core.columnar import numpy
+from ..core.paging import _check
+from ..core.ratelimit import RateLimiter
+
+
+MAGIC = b'LSWMETR\x00'
+VERSION = 2
+
+SERIES = ('bandwidth_up', 'bandwidth_down', 'datatraffic_up', 'datatraffic_down')
+# bandwidth is a rate (bits per second) and rolls up as a mean, datatraffic is a volume (bytes) and rolls up as a sum
+ROLLUP = {'bandwidth_up': 'mean', 'bandwidth_down': 'mean', 'datatraffic_up': 'sum', 'datatraffic_down': 'sum'}
+RESOLUTIONS = ('5MIN', 'HOUR', 'DAY')
+STEPS = {'5MIN': 300, 'HOUR': 3600, 'DAY': 86400}
+RETENTION = {'5MIN': 92, 'HOUR': 730, 'DAY': 3650}
+
+# magic, version, series, created, max_servers, id width, then step and capacity per resolution
+HEADER = struct.Struct('<8sHHdII' + 'II' * len(RESOLUTIONS))
+HEADER_SIZE = 64
+ID_WIDTH = 32
+# number of servers, then the newest bucket of every resolution (-1 while empty), then the oldest bucket of every resolution
+STATE_SIZE = 8 * (1 + 2 * len(RESOLUTIONS))
+
+
+def _epoch(value) -> int:
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, datetime.datetime):
+        return int(value.timestamp())
+    return int(datetime.datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp())
+
+
+def _iso(value) -> str:
+    if isinstance(value, str):
+        return value
+    return datetime.datetime.fromtimestamp(_epoch(value), datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class MetricStore():
+    """
+    Long-term bandwidth and datatraffic history in one memory-mapped file.
+
+    Every series of every resolution (5MIN, HOUR, DAY) is a fixed-width ring buffer of float32 values, one row per time bucket and one column per server; the oldest buckets are overwritten once `retention` days are full.
+    Writing 5-minute samples rolls them up into the HOUR and DAY rings right away: bandwidth as a mean, datatraffic as a sum. Rollups are kept after their 5-minute samples are overwritten.
+    read() returns numpy views on the mapping, without copying or parsing, unless the range wraps around the end of the ring. Missing samples are NaN.
+
+    A file is sized for `max_servers` servers when it is created: 4 bytes x 4 series x buckets of all resolutions, about 760 KB per server with the default retention.
+    The file is sparse: a bucket is only cleared when it enters the ring, so disk space grows with the time range written.
+    An existing file keeps the layout it was created with. One process writes; any number of processes can read with readonly=True.
+
+    Needs numpy: pip3 install leasewebrestapi[columnar]
+
+    :param path: Store file. Created when it does not exist.
+    :param max_servers: Number of server columns of a new file.
+    :param retention: Days kept per resolution of a new file, e.g. {'5MIN': 30}. Defaults to RETENTION.
+    :param readonly: Map the file read-only.
+    """
+    def __init__(self,
+                 path: str,
+                 max_servers: int = 1024,
+                 retention: dict = None,
+                 readonly: bool = False):
+        if numpy is None:
+            raise ImportError('MetricStore needs numpy: pip3 install leasewebrestapi[columnar]')
+        self.path = path
+        self.readonly = readonly
+        self._lock = threading.Lock()
+        if not os.path.exists(path):
+            if readonly:
+                raise FileNotFoundError(path)
+            self._create(path, max_servers, dict(RETENTION, **(retention or {})))
+        with open(path, 'rb' if readonly else 'r+b') as fp:
+            self._map = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ if readonly else mmap.ACCESS_WRITE)
+        magic, version, series, self.created, self.max_servers, width, *layout = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION or series != len(SERIES) or width != ID_WIDTH:
+            self._map.close()
+            raise ValueError('{} is not a version {} metric store'.format(path, VERSION))
+        self._state = numpy.frombuffer(self._map, dtype=numpy.int64, count=1 + 2 * len(RESOLUTIONS), offset=HEADER_SIZE)
+        offset = HEADER_SIZE + STATE_SIZE + self.max_servers * ID_WIDTH
+        self.steps, self.capacities, self._rings = {}, {}, {}
+        for number, resolution in enumerate(RESOLUTIONS):
+            step, capacity = layout[2 * number], layout[2 * number + 1]
+            self.steps[resolution] = step
+            self.capacities[resolution] = capacity
+            count = len(SERIES) * capacity * self.max_servers
+            self._rings[resolution] = numpy.frombuffer(self._map, dtype=numpy.float32, count=count, offset=offset).reshape(len(SERIES), capacity, self.max_servers)
+            offset += count * 4
+        self._columns = {}
+        self._load_ids()
+
+    @staticmethod
+    def _create(path, max_servers, retention):
+        layout = []
+        size = HEADER_SIZE + STATE_SIZE + max_servers * ID_WIDTH
+        for resolution in RESOLUTIONS:
+            capacity = int(retention[resolution] * 86400 // STEPS[resolution])
+            layout += [STEPS[resolution], capacity]
+            size += len(SERIES) * capacity * max_servers * 4
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as fp:
+            fp.write(HEADER.pack(MAGIC, VERSION, len(SERIES), time.time(), max_servers, ID_WIDTH, *layout).ljust(HEADER_SIZE, b'\x00'))
+            fp.write(struct.pack('<q', 0) + struct.pack('<q', -1) * 2 * len(RESOLUTIONS))
+            # the rings are never initialized as a whole, _put() clears buckets as they enter
+            fp.truncate(size)
+        os.replace(tmp, path)
+
+    def _load_ids(self):
+        start = HEADER_SIZE + STATE_SIZE
+        for column in range(len(self._columns), int(self._state[0])):
+            raw = self._map[start + column * ID_WIDTH:start + (column + 1) * ID_WIDTH]
+            self._columns[raw.rstrip(b'\x00').decode('utf-8')] = column
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """
+        Unmap the file. Arrays returned by read() keep the mapping alive until they are released.
+        """
+        self._state = None
+        self._rings = {}
+        try:
+            self._map.close()
+        except BufferError:
+            pass
+
+    def flush(self):
+        """
+        Write changed pages to disk.
+        """
+        if not self.readonly:
+            self._map.flush()
+
+    @property
+    def servers(self) -> list:
+        """
+        Server IDs in column order.
+        """
+        self._load_ids()
+        return list(self._columns)
+
+    def column(self,
+               serverId: str) -> int:
+        """
+        Column of a server in the arrays returned by read(), or None.
+        """
+        self._load_ids()
+        return self._columns.get(str(serverId))
+
+    def add(self,
+            serverId: str,
+            series: str,
+            samples) -> int:
+        """
+        Write 5-minute samples of one server and update its HOUR and DAY rollups.
+
+        :param serverId: The ID of a server.
+        :param series: One of SERIES.
+        :param samples: (timestamp, value) pairs. Timestamps are epoch seconds, datetimes or ISO-8601 strings.
+        :return: Number of 5-minute samples stored. Samples older than the 5MIN retention are not stored at 5MIN, but still fill HOUR and DAY buckets that are empty.
+        """
+        if series not in SERIES:
+            raise ValueError('Unknown series {}. Use one of: {}'.format(series, ', '.join(SERIES)))
+        samples = list(samples)
+        if not samples:
+            return 0
+        number = SERIES.index(series)
+        buckets = numpy.array([_epoch(timestamp) for timestamp, _ in samples], dtype=numpy.int64) // self.steps['5MIN']
+        values = numpy.array([numpy.nan if value is None else value for _, value in samples], dtype=numpy.float64)
+        with self._lock:
+            column = self._server(str(serverId))
+            stored = self._put('5MIN', number, column, buckets, values)
+            for finer, resolution in zip(RESOLUTIONS, RESOLUTIONS[1:]):
+                buckets, values = self._rollup(finer, resolution, number, column, buckets, values)
+                if not len(buckets):
+                    break
+        return stored
+
+    def collect(self,
+                api,
+                serverIds: list,
+                date_from,
+                date_to,
+                max_workers: int = 10,
+                rate: float = 10) -> dict:
+        """
+        Fetch show_bandwidth_metrics() and show_datatraffic_metrics() at 5MIN granularity and store them.
+
+        :param api: leasewebrestapi.API instance.
+        :param serverIds: Server IDs.
+        :param date_from: Start of the interval: ISO-8601 string, datetime or epoch seconds.
+        :param date_to: End of the interval, not included.
+        :param max_workers: Maximum number of API calls in flight.
+        :param rate: Maximum API calls per second.
+        :return: Dict of samples stored, failed server count and errors (serverId: error).
+        """
+        servers = api.DedicatedServers
+        limiter = RateLimiter(rate)
+        date_from, date_to = _iso(date_from), _iso(date_to)
+
+        def fetch(serverId):
+            # two calls per server, one token each
+            limiter.acquire()
+            bandwidth = _check(servers.show_bandwidth_metrics(serverId, date_from, date_to, 'AVG', '5MIN'))
+            limiter.acquire()
+            datatraffic = _check(servers.show_datatraffic_metrics(serverId, date_from, date_to, 'SUM', '5MIN'))
+            return ('bandwidth', bandwidth), ('datatraffic', datatraffic)
+
+        stored = 0
+        errors = {}
+        for serverId, (result, err) in zip(serverIds, run_concurrent(fetch, serverIds, max_workers)):
+            if err is not None:
+                errors[serverId] = err
+                continue
+            for kind, out in result:
+                for name, metric in (out.get('metrics') or {}).items():
+                    series = '{}_{}'.format(kind, 'up' if name.upper().startswith('UP') else 'down')
+                    stored += self.add(serverId, series, ((item['timestamp'], item.get('value')) for item in metric.get('values') or []))
+        self.flush()
+        return {'samples': stored, 'failed': len(errors), 'errors': errors}
+
+    def read(self,
+             series: str,
+             start,
+             stop,
+             resolution: str = '5MIN') -> tuple:
+        """
+        Values of all servers over a time range.
+
+        :param series: One of SERIES.
+        :param start: Start of the range: epoch seconds, datetime or ISO-8601 string.
+        :param stop: End of the range, not included.
+        :param resolution: One of RESOLUTIONS.
+        :return: (times, values): bucket start times in epoch seconds, and a float32 array of one row per bucket and one column per server (see column()), NaN where nothing was stored. The range is clipped to what the ring still holds.
+        """
+        if resolution not in RESOLUTIONS:
+            raise ValueError('Unknown resolution {}. Use one of: {}'.format(resolution, ', '.join(RESOLUTIONS)))
+        step, capacity = self.steps[resolution], self.capacities[resolution]
+        servers = len(self.servers)
+        head, oldest = self._window(resolution)
+        first = max(_epoch(start) // step, oldest)
+        last = min(-(-_epoch(stop) // step) - 1, head)
+        ring = self._rings[resolution][SERIES.index(series)]
+        if head < 0 or last < first:
+            return numpy.empty(0, dtype=numpy.int64), numpy.empty((0, servers), dtype=numpy.float32)
+        times = numpy.arange(first, last + 1, dtype=numpy.int64) * step
+        low, high = first % capacity, last % capacity
+        if low <= high:
+            return times, ring[low:high + 1, :servers]
+        return times, numpy.concatenate((ring[low:, :servers], ring[:high + 1, :servers]))
+
+    def _server(self, serverId):
+        column = self._columns.get(serverId)
+        if column is None:
+            column = int(self._state[0])
+            if column >= self.max_servers:
+                raise ValueError('{} is full: it was created for {} servers'.format(self.path, self.max_servers))
+            start = HEADER_SIZE + STATE_SIZE + column * ID_WIDTH
+            self._map[start:start + ID_WIDTH] = serverId.encode('utf-8')[:ID_WIDTH].ljust(ID_WIDTH, b'\x00')
+            self._state[0] = column + 1
+            self._columns[serverId] = column
+        return column
+
+    def _window(self, resolution):
+        """
+        Newest and oldest bucket held by a ring, (-1, -1) while it is empty.
+        """
+        number = RESOLUTIONS.index(resolution)
+        return int(self._state[1 + number]), int(self._state[1 + len(RESOLUTIONS) + number])
+
+    def _put(self, resolution, number, column, buckets, values):
+        capacity = self.capacities[resolution]
+        head, oldest = self._window(resolution)
+        top, bottom = int(buckets.max()), int(buckets.min())
+        new_head = max(head, top)
+        if head < new_head - capacity + 1:
+            # nothing of the old window is left, start over from what is written now
+            head = -1
+        new_oldest = max(bottom if head < 0 else min(oldest, bottom), new_head - capacity + 1)
+        # buckets entering the window start empty for every server; the rest of the ring is left untouched
+        if head < 0:
+            entering = numpy.arange(new_oldest, new_head + 1)
+        else:
+            entering = numpy.concatenate((numpy.arange(new_oldest, min(oldest, new_head + 1)),
+                                          numpy.arange(max(head + 1, new_oldest), new_head + 1)))
+        if len(entering):
+            self._rings[resolution][:, entering % capacity, :] = numpy.nan
+        position = RESOLUTIONS.index(resolution)
+        self._state[1 + position] = new_head
+        self._state[1 + len(RESOLUTIONS) + position] = new_oldest
+        keep = buckets >= new_oldest
+        self._rings[resolution][number, buckets[keep] % capacity, column] = values[keep]
+        return int(keep.sum())
+
+    def _get(self, resolution, number, column, buckets):
+        capacity = self.capacities[resolution]
+        head, oldest = self._window(resolution)
+        valid = (buckets <= head) & (buckets >= oldest)
+        out = numpy.full(buckets.shape, numpy.nan, dtype=numpy.float64)
+        out[valid] = self._rings[resolution][number, buckets[valid] % capacity, column]
+        return out
+
+    def _rollup(self, finer, resolution, number, column, buckets, values):
+        """
+        Roll finer buckets up into `resolution`.
+
+        A coarse bucket whose finer buckets are all still in the finer ring is computed again from the ring.
+        Any other coarse bucket is only filled while it is empty, from what the finer ring still holds plus the given values, so a rollup is never replaced by one of fewer samples.
+
+        :return: (buckets, values) written at `resolution`, to roll up further.
+        """
+        ratio = self.steps[resolution] // self.steps[finer]
+        coarse = numpy.unique(buckets // ratio)
+        data = self._get(finer, number, column, coarse[:, None] * ratio + numpy.arange(ratio))
+        # values that fell out of the finer ring, or never entered it, still count for their coarse bucket
+        data[numpy.searchsorted(coarse, buckets // ratio), buckets % ratio] = values
+        count = numpy.count_nonzero(~numpy.isnan(data), axis=1)
+        total = numpy.nansum(data, axis=1)
+        out = total if ROLLUP[SERIES[number]] == 'sum' else total / numpy.maximum(count, 1)
+        out[count == 0] = numpy.nan
+        _, oldest = self._window(finer)
+        complete = coarse * ratio >= oldest
+        empty = numpy.isnan(self._get(resolution, number, column, coarse))
+        write = complete | (empty & (count > 0))
+        if write.any():
+            self._put(resolution, number, column, coarse[write], out[write])
+        return coarse[write], out[write]
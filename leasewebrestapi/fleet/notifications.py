@@ -0,0 +1,165 @@
+#  AUTHOR: Roman Bergman <roman.bergman@protonmail.com>
+# RELEASE: 0.0.1
+# LICENSE: AGPL3.0
+
+import functools
+
+from ..core.bulk import run_concurrent
+from ..core.paging import _check, iter_pages
+from ..core.ratelimit import RateLimiter
+
+
+KINDS = {
+    'bandwidth': 'bandwidthNotificationSettings',
+    'datatraffic': 'datatrafficNotificationSettings'
+}
+FIELDS = ('frequency', 'threshold', 'unit')
+
+
+def _value(setting, field):
+    value = setting.get(field)
+    if field == 'threshold':
+        # the API returns thresholds as strings
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return value
+    return value
+
+
+def _key(setting):
+    return tuple(_value(setting, field) for field in FIELDS)
+
+
+def _diff(serverId, kind, desired, current, delete_extra):
+    actions = []
+    current = list(current)
+    missing = []
+    for setting in desired:
+        match = next((item for item in current if _key(item) == _key(setting)), None)
+        if match is None:
+            missing.append(setting)
+        else:
+            current.remove(match)
+    for setting in missing:
+        # turning an unwanted setting into a wanted one is one call instead of two
+        same = [item for item in current if item.get('frequency') == setting.get('frequency')]
+        reuse = (same or current or [None])[0]
+        if reuse is None:
+            actions.append({'serverId': serverId, 'kind': kind, 'action': 'create', 'id': None, 'values': setting})
+        else:
+            current.remove(reuse)
+            actions.append({'serverId': serverId, 'kind': kind, 'action': 'update', 'id': reuse['id'], 'values': setting})
+    if delete_extra:
+        for item in current:
+            actions.append({'serverId': serverId, 'kind': kind, 'action': 'delete', 'id': item['id'], 'values': None})
+    return actions
+
+
+class NotificationReconciler():
+    """
+    Enforce bandwidth, datatraffic and DDoS notification settings on many servers with the fewest API calls.
+
+    The current settings of every server are read, compared with the wanted ones and only the missing changes are applied:
+    matching settings are left alone, a wrong setting is updated in place rather than deleted and created, and unwanted settings are deleted.
+
+    :param api: leasewebrestapi.API instance.
+    :param bandwidth: Wanted bandwidth settings: list of dicts with frequency, threshold and unit. None leaves them alone.
+    :param datatraffic: Wanted datatraffic settings, like bandwidth.
+    :param ddos: Wanted DDoS settings: dict with nulling and/or scrubbing ("ENABLED" or "DISABLED"). None leaves them alone.
+    :param delete_extra: Delete settings that are not wanted.
+    :param max_workers: Maximum number of API calls in flight.
+    :param rate: Maximum API calls per second.
+    """
+    def __init__(self,
+                 api,
+                 bandwidth: list = None,
+                 datatraffic: list = None,
+                 ddos: dict = None,
+                 delete_extra: bool = True,
+                 max_workers: int = 20,
+                 rate: float = 10):
+        self.servers = api.DedicatedServers
+        self.desired = {'bandwidth': bandwidth, 'datatraffic': datatraffic}
+        self.ddos = ddos
+        self.delete_extra = delete_extra
+        self.max_workers = max_workers
+        self.limiter = RateLimiter(rate)
+
+    def plan(self,
+             serverIds: list) -> dict:
+        """
+        Compute the changes needed, without applying them.
+
+        :param serverIds: Server IDs.
+        :return: Dict of actions (list of dicts with serverId, kind, action, id and values) and errors (serverId: error of reading the current state).
+        """
+        serverIds = list(dict.fromkeys(serverIds))
+        actions = []
+        errors = {}
+        for serverId, (result, err) in zip(serverIds, run_concurrent(self._plan, serverIds, self.max_workers)):
+            if err is not None:
+                errors[serverId] = err
+            else:
+                actions.extend(result)
+        return {'actions': actions, 'errors': errors}
+
+    def apply(self,
+              actions: list) -> list:
+        """
+        Apply planned actions concurrently. Updates and deletes run before creates, so a server never holds more settings than it ends up with.
+
+        :param actions: Actions from plan().
+        :return: The actions, each with an `error` key (None on success).
+        """
+        for phase in (('update', 'delete'), ('create',)):
+            todo = [action for action in actions if action['action'] in phase]
+            for action, (_, err) in zip(todo, run_concurrent(self._apply, todo, self.max_workers, self.limiter)):
+                action['error'] = err
+        return actions
+
+    def reconcile(self,
+                  serverIds: list,
+                  dry_run: bool = False) -> dict:
+        """
+        Plan and apply in one go.
+
+        :param serverIds: Server IDs.
+        :param dry_run: Only plan.
+        :return: Dict of actions, errors, and counts of servers, changed servers and failed actions.
+        """
+        plan = self.plan(serverIds)
+        if not dry_run:
+            self.apply(plan['actions'])
+        plan['servers'] = len(set(serverIds))
+        plan['changed'] = len({action['serverId'] for action in plan['actions']})
+        plan['failed'] = sum(1 for action in plan['actions'] if action.get('error') is not None)
+        return plan
+
+    def _plan(self, serverId):
+        actions = []
+        for kind, key in KINDS.items():
+            if self.desired[kind] is not None:
+                fetch = functools.partial(getattr(self.servers, 'list_{}_notification_settings'.format(kind)), serverId)
+                actions.extend(_diff(serverId, kind, self.desired[kind], iter_pages(fetch, key, limiter=self.limiter), self.delete_extra))
+        if self.ddos is not None:
+            self.limiter.acquire()
+            current = _check(self.servers.inspect_ddos_notification_settings(serverId))
+            changes = {field: value for field, value in self.ddos.items() if current.get(field) != value}
+            if changes:
+                actions.append({'serverId': serverId, 'kind': 'ddos', 'action': 'update', 'id': None, 'values': changes})
+        return actions
+
+    def _apply(self, action):
+        serverId, kind, values = action['serverId'], action['kind'], action['values']
+        if kind == 'ddos':
+            out = self.servers.update_ddos_notification_settings(serverId, values.get('nulling'), values.get('scrubbing'))
+        elif action['action'] == 'create':
+            out = getattr(self.servers, 'create_{}_notification_settings'.format(kind))(serverId, *(values.get(field) for field in FIELDS))
+        elif action['action'] == 'update':
+            out = getattr(self.servers, 'update_{}_notification_setting'.format(kind))(serverId, action['id'], *(values.get(field) for field in FIELDS))
+        else:
+            out = getattr(self.servers, 'delete_{}_notification_setting'.format(kind))(serverId, action['id'])
+        if out is False:
+            raise RuntimeError('{} {} notification setting failed.'.format(action['action'], kind))
+        return _check(out)
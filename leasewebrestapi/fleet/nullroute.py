@@ -0,0 +1,130 @@
+#  AUTHOR: Roman Bergman <roman.bergman@protonmail.com>
+# RELEASE: 0.0.1
+# LICENSE: AGPL3.0
+
+import time
+
+from ..core.bulk import poll_until, run_concurrent
+from ..core.paging import _check
+from ..core.ratelimit import RateLimiter
+
+
+class NullRouter():
+    """
+    Null route or un-null many IP addresses at once.
+
+    :param api: leasewebrestapi.API instance.
+    :param max_workers: Maximum number of API calls in flight.
+    :param rate: Maximum API calls per second.
+    :param verify_timeout: Seconds to wait for the change to show up in show_ip(). 0 checks once.
+    :param verify_interval: Seconds between verification rounds.
+    """
+    def __init__(self,
+                 api,
+                 max_workers: int = 20,
+                 rate: float = 10,
+                 verify_timeout: float = 300,
+                 verify_interval: float = 10):
+        self.servers = api.DedicatedServers
+        self.fresh = self.servers.uncached()
+        self.max_workers = max_workers
+        self.limiter = RateLimiter(rate)
+        self.verify_timeout = verify_timeout
+        self.verify_interval = verify_interval
+
+    def null_route(self,
+                   targets) -> list:
+        """
+        Null the given IP addresses.
+
+        :param targets: IP addresses or (serverId, ip) pairs. Owning servers of bare IPs are looked up with list_servers().
+        :return: List of per-IP outcomes.
+        """
+        return self._apply(targets, self.servers.null_route_ip, True)
+
+    def remove_null_route(self,
+                          targets) -> list:
+        """
+        Remove null routes for the given IP addresses.
+
+        :param targets: IP addresses or (serverId, ip) pairs. Owning servers of bare IPs are looked up with list_servers().
+        :return: List of per-IP outcomes.
+        """
+        return self._apply(targets, self.servers.remove_null_route_ip, False)
+
+    def resolve(self,
+                ips) -> dict:
+        """
+        Find the server that owns every IP address.
+
+        :param ips: IP addresses.
+        :return: Dict of ip: serverId. IPs without an owning server map to None. The first failed lookup is raised.
+        """
+        owners = self._lookup(ips)
+        for _, err in owners.values():
+            if err is not None:
+                raise err
+        return {ip: serverId for ip, (serverId, _) in owners.items()}
+
+    def _lookup(self, ips):
+        ips = list(dict.fromkeys(ips))
+
+        def lookup(ip):
+            servers = _check(self.servers.list_servers(ip=ip, limit=1)).get('servers') or []
+            return servers[0]['id'] if servers else None
+
+        return dict(zip(ips, run_concurrent(lookup, ips, self.max_workers, self.limiter)))
+
+    def _apply(self, targets, action, nullRouted):
+        outcomes = []
+        unresolved = []
+        for target in targets:
+            if isinstance(target, str):
+                unresolved.append(target)
+                target = (None, target)
+            serverId, ip = target
+            outcomes.append({'serverId': serverId, 'ip': ip, 'status': None, 'error': None, 'elapsed': None})
+
+        if unresolved:
+            owners = self._lookup(unresolved)
+            for outcome in outcomes:
+                if outcome['serverId'] is None:
+                    outcome['serverId'], err = owners.get(outcome['ip'], (None, None))
+                    if err is not None:
+                        outcome['status'] = 'FAILED'
+                        outcome['error'] = 'Looking up the server failed: {}'.format(err)
+                    elif outcome['serverId'] is None:
+                        outcome['status'] = 'UNRESOLVED'
+                        outcome['error'] = 'No server found for this IP address.'
+
+        started = time.monotonic()
+        pending = [outcome for outcome in outcomes if outcome['status'] is None]
+
+        def call(outcome):
+            try:
+                out = action(outcome['serverId'], outcome['ip'])
+                if isinstance(out, dict) and 'errorCode' in out:
+                    raise RuntimeError(out.get('errorMessage') or out['errorCode'])
+            except Exception:
+                outcome['elapsed'] = time.monotonic() - started
+                raise
+            return out
+
+        for outcome, (_, err) in zip(pending, run_concurrent(call, pending, self.max_workers, self.limiter)):
+            if err is not None:
+                outcome['status'] = 'FAILED'
+                outcome['error'] = str(err)
+        self._verify([outcome for outcome in pending if outcome['status'] is None], nullRouted, started)
+        return outcomes
+
+    def _verify(self, pending, nullRouted, started):
+        def check(outcome):
+            if self.fresh.show_ip(outcome['serverId'], outcome['ip']).get('nullRouted') is not nullRouted:
+                return False
+            outcome['status'] = 'OK'
+            outcome['elapsed'] = time.monotonic() - started
+            return True
+
+        for outcome in poll_until(check, pending, started + self.verify_timeout, self.verify_interval, self.max_workers, self.limiter):
+            outcome['status'] = 'UNVERIFIED'
+            outcome['elapsed'] = time.monotonic() - started
@@ -0,0 +1,182 @@
+#  AUTHOR: Roman Bergman <roman.bergman@protonmail.com>
+# RELEASE: 0.0.1
+# LICENSE: AGPL3.0
+
+import time
+
+from ..core.bulk import poll_until, run_concurrent
+from ..core.paging import _check
+from ..core.ratelimit import RateLimiter
+
+
+# DHCP option codes of the lease options
+BOOTFILE = '67'
+HOSTNAME = '12'
+
+
+def _lease(out):
+    leases = out.get('leases') or []
+    if not leases:
+        return None
+    options = {str(option.get('name')): option.get('value') for option in leases[0].get('options') or []}
+    return {'bootfile': options.get(BOOTFILE), 'hostname': options.get(HOSTNAME)}
+
+
+class PrivateNetworkReconciler():
+    """
+    Bring private network membership and DHCP reservations of many servers to the wanted state.
+
+    The wanted state is a dict of serverId: spec. A spec may hold:
+        privateNetworkId - the private network the server must be in, None for none. Other memberships are removed.
+        linkSpeed - the port speed in Mbps for the membership (default 1000).
+        dhcp - dict with bootfile and hostname of the reservation, None for no reservation.
+    Keys left out are not touched.
+
+    The current state is read with get_server() and list_dhcp_reservation(); only the differences are applied, concurrently.
+    Private network changes are asynchronous on the Leaseweb side, so they are followed with get_server() until CONFIGURED (or gone) or `verify_timeout`.
+
+    :param api: leasewebrestapi.API instance.
+    :param max_workers: Maximum number of API calls in flight.
+    :param rate: Maximum API calls per second.
+    :param verify_timeout: Seconds to wait for private network changes to become final. 0 checks once.
+    :param verify_interval: Seconds between verification rounds.
+    """
+    def __init__(self,
+                 api,
+                 max_workers: int = 20,
+                 rate: float = 10,
+                 verify_timeout: float = 900,
+                 verify_interval: float = 15):
+        self.servers = api.DedicatedServers
+        self.fresh = self.servers.uncached()
+        self.max_workers = max_workers
+        self.limiter = RateLimiter(rate)
+        self.verify_timeout = verify_timeout
+        self.verify_interval = verify_interval
+
+    def plan(self,
+             desired: dict) -> dict:
+        """
+        Compute the changes needed, without applying them.
+
+        :param desired: Dict of serverId: spec.
+        :return: Dict of actions (list of dicts with serverId, kind, action, id and values) and errors (serverId: error of reading the current state).
+        """
+        serverIds = list(desired)
+        actions = []
+        errors = {}
+        results = run_concurrent(lambda serverId: self._plan(serverId, desired[serverId]), serverIds, self.max_workers, self.limiter)
+        for serverId, (result, err) in zip(serverIds, results):
+            if err is not None:
+                errors[serverId] = err
+            else:
+                actions.extend(result)
+        return {'actions': actions, 'errors': errors}
+
+    def apply(self,
+              actions: list) -> list:
+        """
+        Apply planned actions concurrently, removals before additions, and follow private network changes until they are final.
+
+        :param actions: Actions from plan().
+        :return: The actions, each with an `error` key (None on success) and, for private network actions, a `status`: CONFIGURED, REMOVED, UNVERIFIED or FAILED.
+        """
+        for phase in (('remove', 'delete'), ('add', 'create')):
+            todo = [action for action in actions if action['action'] in phase]
+            for action, (_, err) in zip(todo, run_concurrent(self._apply, todo, self.max_workers, self.limiter)):
+                action['error'] = err
+                if action['kind'] == 'privateNetwork':
+                    action['status'] = 'FAILED' if err is not None else None
+        self._verify([action for action in actions if action['kind'] == 'privateNetwork' and action['status'] is None])
+        return actions
+
+    def reconcile(self,
+                  desired: dict,
+                  dry_run: bool = False) -> dict:
+        """
+        Plan and apply in one go.
+
+        :param desired: Dict of serverId: spec.
+        :param dry_run: Only plan.
+        :return: Dict of actions, errors, elapsed seconds, and counts of servers, changed servers, failed and unverified actions.
+        """
+        started = time.monotonic()
+        plan = self.plan(desired)
+        if not dry_run:
+            self.apply(plan['actions'])
+        plan['servers'] = len(desired)
+        plan['changed'] = len({action['serverId'] for action in plan['actions']})
+        plan['failed'] = sum(1 for action in plan['actions'] if action.get('error') is not None)
+        plan['unverified'] = sum(1 for action in plan['actions'] if action.get('status') == 'UNVERIFIED')
+        plan['elapsed'] = time.monotonic() - started
+        return plan
+
+    def _plan(self, serverId, spec):
+        actions = []
+        if 'privateNetworkId' in spec:
+            wanted = spec['privateNetworkId']
+            linkSpeed = spec.get('linkSpeed', 1000)
+            current = _check(self.servers.get_server(serverId)).get('privateNetworks') or []
+            member = False
+            for network in current:
+                if wanted is not None and str(network.get('id')) == str(wanted) and network.get('status') != 'REMOVING':
+                    member = str(network.get('linkSpeed')) == str(linkSpeed)
+                elif network.get('status') != 'REMOVING':
+                    actions.append({'serverId': serverId, 'kind': 'privateNetwork', 'action': 'remove', 'id': network.get('id'), 'values': None})
+            if wanted is not None and not member:
+                # adding is a PUT, it also changes the link speed of an existing membership
+                actions.append({'serverId': serverId, 'kind': 'privateNetwork', 'action': 'add', 'id': wanted, 'values': {'linkSpeed': linkSpeed}})
+        if 'dhcp' in spec:
+            wanted = spec['dhcp']
+            self.limiter.acquire()
+            current = _lease(_check(self.servers.list_dhcp_reservation(serverId)))
+            if wanted is not None:
+                wanted = {'bootfile': wanted.get('bootfile'), 'hostname': wanted.get('hostname')}
+            if current != wanted:
+                if current is not None:
+                    actions.append({'serverId': serverId, 'kind': 'dhcp', 'action': 'delete', 'id': None, 'values': None})
+                if wanted is not None:
+                    actions.append({'serverId': serverId, 'kind': 'dhcp', 'action': 'create', 'id': None, 'values': wanted})
+        return actions
+
+    def _apply(self, action):
+        serverId = action['serverId']
+        if action['kind'] == 'dhcp':
+            if action['action'] == 'create':
+                out = self.servers.create_dhcp_reservation(serverId, action['values']['bootfile'], action['values']['hostname'])
+            else:
+                out = self.servers.delete_dhcp_reservation(serverId)
+        elif action['action'] == 'add':
+            out = self.servers.add_server_to_private_network(serverId, action['id'], action['values']['linkSpeed'])
+        else:
+            out = self.servers.delete_server_from_private_network(serverId, action['id'])
+        if out is False:
+            raise RuntimeError('{} {} failed.'.format(action['action'], action['kind']))
+        return _check(out)
+
+    def _verify(self, pending):
+        started = time.monotonic()
+        actions = {}
+        for action in pending:
+            actions.setdefault(action['serverId'], []).append(action)
+
+        def check(serverId):
+            current = _check(self.fresh.get_server(serverId)).get('privateNetworks') or []
+            done = True
+            for action in actions[serverId]:
+                if action['status'] is not None:
+                    continue
+                network = next((item for item in current if str(item.get('id')) == str(action['id'])), None)
+                if action['action'] == 'remove' and network is None:
+                    action['status'] = 'REMOVED'
+                elif (action['action'] == 'add' and network is not None and network.get('status') == 'CONFIGURED'
+                      and str(network.get('linkSpeed')) == str(action['values']['linkSpeed'])):
+                    action['status'] = 'CONFIGURED'
+                else:
+                    done = False
+            return done
+
+        poll_until(check, actions, started + self.verify_timeout, self.verify_interval, self.max_workers, self.limiter)
+        for action in pending:
+            if action['status'] is None:
+                action['status'] = 'UNVERIFIED'
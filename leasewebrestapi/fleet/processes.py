@@ -0,0 +1,70 @@
+#  AUTHOR: Roman Bergman <roman.bergman@protonmail.com>
+# RELEASE: 0.0.1
+# LICENSE: AGPL3.0
+
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+from ..core.bulk import run_concurrent
+from ..core.ratelimit import ClientLimiter
+
+
+_client = None
+
+
+def _init(payload, processes):
+    global _client
+    _client = pickle.loads(payload)
+    limiter = _client.config.get('LIMITER')
+    if limiter is not None:
+        # the client budget is shared by all worker processes, every other setting is kept as is
+        _client.config['LIMITER'] = ClientLimiter(limiter.rate and limiter.rate / processes,
+                                                  limiter.concurrency and max(1, limiter.concurrency // processes),
+                                                  limiter.adaptive,
+                                                  limiter.aging)
+
+
+def _run(func, serverIds, threads):
+    out = []
+    for result, err in run_concurrent(lambda serverId: func(_client, serverId), serverIds, threads):
+        if err is not None:
+            try:
+                pickle.dumps(err)
+            except Exception:
+                err = RuntimeError(repr(err))
+        out.append((result, err))
+    return out
+
+
+def map_servers(api,
+                func,
+                serverIds: list,
+                processes: int = None,
+                threads: int = 8,
+                chunk_size: int = 50,
+                mp_context=None) -> dict:
+    """
+    Run func(api, serverId) for many servers across a ProcessPoolExecutor.
+
+    Every worker process unpickles its own copy of the client, with its own connection pool, and runs its chunk of servers on `threads` threads.
+    The rate and concurrency budget of the client is split between the processes. Use it when post-processing (hardware info, metrics) needs more than one core.
+
+    :param api: leasewebrestapi.API instance.
+    :param func: Module-level function taking (api, serverId). It must be picklable.
+    :param serverIds: Server IDs.
+    :param processes: Number of worker processes. Defaults to the number of CPUs.
+    :param threads: API calls in flight per process.
+    :param chunk_size: Servers per task.
+    :param mp_context: Optional multiprocessing context, e.g. multiprocessing.get_context('spawn').
+    :return: Dict of serverId: (result, error).
+    """
+    serverIds = list(dict.fromkeys(serverIds))
+    processes = processes or os.cpu_count() or 1
+    chunks = [serverIds[i:i + chunk_size] for i in range(0, len(serverIds), chunk_size)]
+    out = {}
+    with ProcessPoolExecutor(max_workers=processes, mp_context=mp_context, initializer=_init, initargs=(pickle.dumps(api), processes)) as pool:
+        futures = [pool.submit(_run, func, chunk, threads) for chunk in chunks]
+        for chunk, future in zip(chunks, futures):
+            out.update(zip(chunk, future.result()))
+    return out
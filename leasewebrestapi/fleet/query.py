@@ -0,0 +1,325 @@
+#  AUTHOR: Roman Bergman <roman.bergman@protonmail.com>
+# RELEASE: 0.0.1
+# LICENSE: AGPL3.0
+
+import json
+import operator
+import os
+
+from ..core.bulk import run_concurrent
+from ..core.columnar import Table, numpy
+from ..core.paging import _check, fetch_all
+from ..core.ratelimit import RateLimiter
+from .hardware import HardwareInventory
+from .snapshot import _specs
+
+
+# Column name: type. Missing numbers are NaN when numpy is installed, None otherwise.
+COLUMNS = {
+    'id': 'str',
+    'reference': 'str',
+    'contract_status': 'str',
+    'site': 'str',
+    'suite': 'str',
+    'rack': 'str',
+    'unit': 'str',
+    'public_ip': 'str',
+    'remote_ip': 'str',
+    'private_network': 'bool',
+    'private_network_id': 'str',
+    'private_link_speed': 'num',
+    'cpu_model': 'str',
+    'cpu_count': 'num',
+    'cpu_cores': 'num',
+    'cpu_threads': 'num',
+    'memory_bytes': 'num',
+    'disk_count': 'num',
+    'disk_bytes': 'num',
+    'nic_speed_mbit': 'num'
+}
+HARDWARE_FIELDS = ('cpu_model', 'cpu_count', 'cpu_cores', 'cpu_threads', 'memory_bytes', 'disk_count', 'disk_bytes', 'nic_speed_mbit')
+INDEXES = ('id', 'site', 'rack', 'reference', 'private_network', 'private_network_id', 'memory_bytes')
+
+OPERATORS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    'in': lambda value, operand: value in operand,
+    'not in': lambda value, operand: value not in operand,
+    'contains': lambda value, operand: operand in value
+}
+
+
+def _row(server, summary=None):
+    """
+    Flatten a server object, and optionally its HardwareInventory summary, into one row of COLUMNS.
+    """
+    location = server.get('location') or {}
+    contract = server.get('contract') or {}
+    interfaces = server.get('networkInterfaces') or {}
+    networks = [network for network in server.get('privateNetworks') or [] if network.get('status', 'CONFIGURED') == 'CONFIGURED']
+    specs = dict(_specs(server), cpu_cores=None, cpu_threads=None, nic_speed_mbit=None)
+    # a hardware scan describes what is in the chassis, the specs what was ordered
+    specs.update((key, value) for key, value in (summary or {}).items() if key in HARDWARE_FIELDS and value is not None)
+    row = {
+        'id': str(server['id']),
+        'reference': contract.get('reference'),
+        'contract_status': contract.get('status'),
+        'site': location.get('site'),
+        'suite': location.get('suite'),
+        'rack': location.get('rack'),
+        'unit': location.get('unit'),
+        'public_ip': (interfaces.get('public') or {}).get('ip'),
+        'remote_ip': (interfaces.get('remoteManagement') or {}).get('ip'),
+        'private_network': bool(networks),
+        'private_network_id': networks[0].get('id') if networks else None,
+        'private_link_speed': networks[0].get('linkSpeed') if networks else None
+    }
+    row.update((key, specs[key]) for key in HARDWARE_FIELDS)
+    return row
+
+
+def _typed(kind, values):
+    if numpy is None:
+        return values
+    if kind == 'num':
+        return numpy.array([numpy.nan if value is None else float(value) for value in values], dtype=float)
+    if kind == 'bool':
+        return numpy.array([bool(value) for value in values], dtype=bool)
+    column = numpy.empty(len(values), dtype=object)
+    column[:] = values
+    return column
+
+
+def _test(function, op, value, operand):
+    if value is None and op not in ('==', '!=', 'in', 'not in'):
+        return False
+    return function(value, operand)
+
+
+def _compare(column, op, operand):
+    """
+    Evaluate one condition over a whole column: boolean mask (numpy) or list.
+    """
+    function = OPERATORS[op]
+    if numpy is None:
+        return [_test(function, op, value, operand) for value in column]
+    if column.dtype != object and op != 'contains':
+        if op in ('in', 'not in'):
+            return numpy.isin(column, list(operand), invert=op == 'not in')
+        return function(column, operand)
+    return numpy.frompyfunc(lambda value: _test(function, op, value, operand), 1, 1)(column).astype(bool)
+
+
+class FleetQuery():
+    """
+    Local columnar copy of the fleet, answering questions without API calls.
+
+    build() fetches list_servers(), get_server() and the HardwareInventory summaries once and flattens them into one row per server with the typed COLUMNS.
+    where() evaluates all conditions over whole columns at once (vectorized with numpy when installed) and returns a Table for projections and group-bys.
+    Indexed columns answer their conditions from a secondary index, a hash index for == and in, or a sorted index for ranges over numeric columns; the other conditions are then only checked on the candidate rows.
+
+    :param rows: Server rows, as made by build().
+    :param indexes: Columns to index.
+    """
+    def __init__(self,
+                 rows: list,
+                 indexes: tuple = INDEXES):
+        self.rows = rows
+        self.size = len(rows)
+        self.columns = {name: _typed(kind, [row.get(name) for row in rows]) for name, kind in COLUMNS.items()}
+        self.indexes = {}
+        for name in indexes:
+            self.index(name)
+
+    @classmethod
+    def build(cls,
+              api,
+              details: bool = True,
+              hardware=None,
+              indexes: tuple = INDEXES,
+              max_workers: int = 20,
+              rate: float = 10,
+              **filters) -> 'FleetQuery':
+        """
+        Fetch the fleet from the live API.
+
+        :param api: leasewebrestapi.API instance.
+        :param details: Also call get_server() for every server and merge its fields (private networks) into the server object.
+        :param hardware: Optional HardwareInventory whose summaries override the ordered specs, or True to fetch show_hardware_information() of every server now.
+        :param indexes: Columns to index.
+        :param max_workers: Maximum number of API calls in flight.
+        :param rate: Maximum API calls per second.
+        :param filters: Extra list_servers() filters, e.g. site='AMS-01'.
+        :return: FleetQuery.
+        """
+        servers = api.DedicatedServers
+        limiter = RateLimiter(rate)
+        fleet = fetch_all(servers.list_servers, 'servers', max_workers=max_workers, limiter=limiter, **filters)
+        if details:
+            results = run_concurrent(lambda server: _check(servers.get_server(server['id'])), fleet, max_workers, limiter)
+            for server, (result, err) in zip(fleet, results):
+                if err is not None:
+                    raise err
+                server.update(result)
+        summaries = {}
+        if hardware is not None:
+            if hardware is True:
+                hardware = HardwareInventory(api, max_workers=max_workers, rate=rate)
+                # servers without a hardware scan keep their ordered specs
+                hardware.refresh([server['id'] for server in fleet])
+            summaries = {serverId: entry['summary'] for serverId, entry in hardware.cache.items()}
+        return cls([_row(server, summaries.get(str(server['id']))) for server in fleet], indexes)
+
+    @classmethod
+    def load(cls,
+             path: str,
+             indexes: tuple = INDEXES) -> 'FleetQuery':
+        """
+        Read rows written by save().
+
+        :param path: JSON file.
+        :param indexes: Columns to index.
+        :return: FleetQuery.
+        """
+        with open(path) as fp:
+            return cls(json.load(fp), indexes)
+
+    def save(self,
+             path: str):
+        """
+        Write the rows to a JSON file.
+
+        :param path: Output file. It is replaced atomically.
+        """
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as fp:
+            json.dump(self.rows, fp, separators=(',', ':'))
+        os.replace(tmp, path)
+
+    def __len__(self):
+        return self.size
+
+    def index(self,
+              name: str):
+        """
+        Add a secondary index on a column: sorted for numeric columns, hash otherwise.
+
+        :param name: Column name.
+        """
+        column = self.columns[name]
+        if numpy is not None and column.dtype == float:
+            order = numpy.argsort(column, kind='stable')
+            # NaN sorts last: ranges only look at the first `valid` values
+            self.indexes[name] = ('sorted', order, column[order], int(numpy.count_nonzero(~numpy.isnan(column))))
+            return
+        positions = {}
+        for position, value in enumerate(column):
+            positions.setdefault(value.item() if hasattr(value, 'item') else value, []).append(position)
+        if numpy is not None:
+            positions = {value: numpy.asarray(found, dtype=numpy.intp) for value, found in positions.items()}
+        self.indexes[name] = ('hash', positions)
+
+    def get(self,
+            serverId: str) -> dict:
+        """
+        Row of one server.
+
+        :param serverId: The ID of a server.
+        :return: Row dict, or None.
+        """
+        found = self.positions([('id', '==', str(serverId))])
+        return self.rows[found[0]] if len(found) else None
+
+    def where(self,
+              *conditions,
+              columns: list = None,
+              **equals) -> Table:
+        """
+        Rows matching all conditions.
+
+        :param conditions: (column, operator, value) tuples. Operator Enum: "==" "!=" "<" "<=" ">" ">=" "in" "not in" "contains"
+        :param columns: Columns to return. Defaults to all COLUMNS.
+        :param equals: Equality conditions, e.g. site='AMS-01'.
+        :return: Table, in row order.
+        """
+        positions = self.positions(list(conditions) + [(name, '==', value) for name, value in equals.items()])
+        if numpy is not None:
+            return Table({name: self.columns[name][positions] for name in columns or self.columns})
+        return Table({name: [self.columns[name][position] for position in positions] for name in columns or self.columns})
+
+    def count(self,
+              *conditions,
+              **equals) -> int:
+        """
+        Number of rows matching all conditions, like where().
+        """
+        return len(self.positions(list(conditions) + [(name, '==', value) for name, value in equals.items()]))
+
+    def positions(self,
+                  conditions: list):
+        """
+        Row positions matching all conditions, in row order.
+
+        :param conditions: List of (column, operator, value) tuples.
+        :return: numpy array of positions, or list without numpy.
+        """
+        for name, op, _ in conditions:
+            if name not in self.columns:
+                raise ValueError('Unknown column {}. Use one of: {}'.format(name, ', '.join(self.columns)))
+            if op not in OPERATORS:
+                raise ValueError('Unknown operator {}. Use one of: {}'.format(op, ', '.join(OPERATORS)))
+        candidates = None
+        rest = []
+        for condition in conditions:
+            found = self._lookup(*condition)
+            if found is None:
+                rest.append(condition)
+            elif candidates is None:
+                candidates = found
+            elif numpy is not None:
+                candidates = numpy.intersect1d(candidates, found, assume_unique=True)
+            else:
+                candidates = sorted(set(candidates) & set(found))
+        for name, op, operand in rest:
+            column = self.columns[name]
+            if candidates is None:
+                mask = _compare(column, op, operand)
+                candidates = numpy.flatnonzero(mask) if numpy is not None else [position for position, keep in enumerate(mask) if keep]
+            elif numpy is not None:
+                candidates = candidates[_compare(column[candidates], op, operand)]
+            else:
+                mask = _compare([column[position] for position in candidates], op, operand)
+                candidates = [position for position, keep in zip(candidates, mask) if keep]
+        if candidates is None:
+            return numpy.arange(self.size) if numpy is not None else list(range(self.size))
+        return candidates
+
+    def _lookup(self, name, op, operand):
+        """
+        Positions answering one condition from an index, or None when no index can.
+        """
+        index = self.indexes.get(name)
+        if index is None:
+            return None
+        if index[0] == 'hash':
+            positions = index[1]
+            empty = numpy.empty(0, dtype=numpy.intp) if numpy is not None else []
+            if op == '==':
+                return positions.get(operand, empty)
+            if op == 'in':
+                found = [positions.get(value, empty) for value in set(operand)]
+                if numpy is not None:
+                    return numpy.sort(numpy.concatenate(found)) if found else empty
+                return sorted(position for part in found for position in part)
+            return None
+        _, order, values, valid = index
+        if op not in ('==', '<', '<=', '>', '>=') or operand is None:
+            return None
+        left = int(numpy.searchsorted(values[:valid], operand, 'left'))
+        right = int(numpy.searchsorted(values[:valid], operand, 'right'))
+        start, stop = {'==': (left, right), '<': (0, left), '<=': (0, right), '>': (right, valid), '>=': (left, valid)}[op]
+        return numpy.sort(order[start:stop])
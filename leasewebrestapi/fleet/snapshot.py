@@ -0,0 +1,332 @@
+#  AUTHOR: Roman Bergman <roman.bergman@protonmail.com>
+# RELEASE: 0.0.1
+# LICENSE: AGPL3.0
+
+import bisect
+import ipaddress
+import mmap
+import os
+import struct
+import time
+
+from ..core.bulk import run_concurrent
+from ..core.paging import fetch_all
+from ..core.ratelimit import RateLimiter
+
+
+MAGIC = b'LSWSNAP\x00'
+VERSION = 1
+UNITS = {'MB': 10 ** 6, 'GB': 10 ** 9, 'TB': 10 ** 12}
+
+# Every string is a (offset, length) reference into the string heap at the end of the file.
+HEADER = struct.Struct('<8sHHdIIIIQQQQQ')
+SERVER = struct.Struct('<IIIIIIIIII' 'HHdd' 'IIII')
+IP = struct.Struct('<16sBBBxIII')
+INTERFACE = struct.Struct('<IIIIIIIII')
+INDEX = struct.Struct('<I')
+
+SERVER_FIELDS = ('id', 'reference', 'site', 'rack', 'cpu_model')
+INTERFACE_FIELDS = ('type', 'ip', 'mac', 'gateway')
+
+
+class _Heap():
+    def __init__(self):
+        self.data = bytearray()
+        self.seen = {}
+
+    def add(self, value):
+        if value is None:
+            return 0, 0xFFFFFFFF
+        value = str(value)
+        ref = self.seen.get(value)
+        if ref is None:
+            raw = value.encode('utf-8')
+            ref = self.seen[value] = (len(self.data), len(raw))
+            self.data += raw
+        return ref
+
+
+def _specs(server):
+    specs = server.get('specs') or {}
+    cpu = specs.get('cpu') or {}
+    ram = specs.get('ram') or {}
+    disks = specs.get('hdd') or []
+    return {
+        'cpu_model': cpu.get('type'),
+        'cpu_count': cpu.get('quantity') or 0,
+        'memory_bytes': (ram.get('size') or 0) * UNITS.get(ram.get('unit'), 1),
+        'disk_count': sum(disk.get('amount') or 1 for disk in disks),
+        'disk_bytes': sum((disk.get('amount') or 1) * (disk.get('size') or 0) * UNITS.get(disk.get('unit'), 1) for disk in disks)
+    }
+
+
+def _pack(address):
+    # IPv4 is stored IPv4-mapped, so both versions share one sorted index
+    if address.version == 4:
+        return b'\x00' * 10 + b'\xff\xff' + address.packed
+    return address.packed
+
+
+def _ip(value):
+    address = ipaddress.ip_interface(value)
+    return _pack(address.ip), address.network.prefixlen, address.version
+
+
+def write_snapshot(path: str,
+                   servers: list,
+                   ips: dict = None,
+                   hardware: dict = None) -> str:
+    """
+    Write a fleet snapshot file.
+
+    :param path: Output file. It is replaced atomically.
+    :param servers: Server objects as returned by list_servers().
+    :param ips: Optional dict of serverId: list_ips() items. Defaults to the interface IPs of the server objects.
+    :param hardware: Optional dict of serverId: HardwareInventory summary row, preferred over the server specs.
+    :return: path.
+    """
+    heap = _Heap()
+    servers = sorted(servers, key=lambda server: str(server['id']).encode('utf-8'))
+    server_records, ip_records, interface_records = [], [], []
+    for number, server in enumerate(servers):
+        serverId = str(server['id'])
+        location = server.get('location') or {}
+        specs = _specs(server)
+        specs.update((key, value) for key, value in ((hardware or {}).get(serverId) or {}).items() if key in specs and value is not None)
+
+        interfaces = server.get('networkInterfaces') or {}
+        iface_start = len(interface_records)
+        for kind, interface in interfaces.items():
+            if isinstance(interface, dict):
+                refs = [heap.add(kind)] + [heap.add(interface.get(field)) for field in INTERFACE_FIELDS[1:]]
+                interface_records.append(INTERFACE.pack(number, *(value for ref in refs for value in ref)))
+
+        ip_start = len(ip_records)
+        if ips is not None:
+            items = ips.get(serverId) or []
+        else:
+            items = [{'ip': interface['ip'], 'networkType': kind.upper()} for kind, interface in interfaces.items()
+                     if isinstance(interface, dict) and interface.get('ip')]
+        for item in items:
+            packed, prefix, version = _ip(item['ip'])
+            ip_records.append((packed, IP.pack(packed, prefix, version, bool(item.get('nullRouted')), number,
+                                               *heap.add(item.get('networkType') or item.get('type')))))
+
+        refs = [heap.add(serverId), heap.add((server.get('contract') or {}).get('reference')),
+                heap.add(location.get('site')), heap.add(location.get('rack')), heap.add(specs['cpu_model'])]
+        server_records.append(SERVER.pack(*(value for ref in refs for value in ref),
+                                          int(specs['cpu_count']), int(specs['disk_count']),
+                                          float(specs['memory_bytes']), float(specs['disk_bytes']),
+                                          ip_start, len(ip_records) - ip_start, iface_start, len(interface_records) - iface_start))
+
+    order = sorted(range(len(ip_records)), key=lambda position: ip_records[position][0])
+    offsets = [HEADER.size]
+    for size in (len(server_records) * SERVER.size, len(ip_records) * IP.size, len(interface_records) * INTERFACE.size, len(order) * INDEX.size):
+        offsets.append(offsets[-1] + size)
+
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as fp:
+        fp.write(HEADER.pack(MAGIC, VERSION, 0, time.time(), len(server_records), len(ip_records), len(interface_records), 0, *offsets))
+        fp.write(b''.join(server_records))
+        fp.write(b''.join(record for _, record in ip_records))
+        fp.write(b''.join(interface_records))
+        fp.write(b''.join(INDEX.pack(position) for position in order))
+        fp.write(heap.data)
+    os.replace(tmp, path)
+    return path
+
+
+def capture_snapshot(api,
+                     path: str,
+                     ips: bool = False,
+                     hardware=None,
+                     max_workers: int = 20,
+                     rate: float = 10,
+                     **filters) -> str:
+    """
+    Fetch the fleet from the live API and write it as a snapshot.
+
+    :param api: leasewebrestapi.API instance.
+    :param path: Output file.
+    :param ips: Also fetch list_ips() of every server (one extra call per server). Otherwise only the interface IPs are kept.
+    :param hardware: Optional HardwareInventory whose summaries go into the snapshot.
+    :param max_workers: Maximum number of API calls in flight.
+    :param rate: Maximum API calls per second.
+    :param filters: Extra list_servers() filters, e.g. site='AMS-01'.
+    :return: path.
+    """
+    servers = api.DedicatedServers
+    limiter = RateLimiter(rate)
+    fleet = fetch_all(servers.list_servers, 'servers', max_workers=max_workers, limiter=limiter, **filters)
+    by_server = None
+    if ips:
+        serverIds = [server['id'] for server in fleet]
+        results = run_concurrent(lambda serverId: fetch_all(servers.list_ips, 'ips', max_workers=1, limiter=limiter, serverId=serverId), serverIds, max_workers)
+        by_server = {}
+        for serverId, (result, err) in zip(serverIds, results):
+            if err is not None:
+                raise err
+            by_server[serverId] = result
+    summaries = {serverId: entry['summary'] for serverId, entry in hardware.cache.items()} if hardware is not None else None
+    return write_snapshot(path, fleet, by_server, summaries)
+
+
+class FleetSnapshot():
+    """
+    Read-only, memory-mapped fleet snapshot.
+
+    Opening maps the file and reads the fixed-size header only; records are unpacked straight from the mapping when they are used, and strings are decoded one at a time from the string heap.
+    Servers are stored sorted by ID and IPs have a sorted index, so get() and lookup_ip() are binary searches over the mapping.
+
+    :param path: Snapshot file written by write_snapshot() or capture_snapshot().
+    """
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as fp:
+            self._map = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER.size:
+            self.close()
+            raise ValueError('{} is not a fleet snapshot.'.format(path))
+        (magic, version, _, self.created, self._servers, self._ips, self._interfaces, _,
+         self._server_offset, self._ip_offset, self._interface_offset, self._index_offset, self._heap_offset) = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError('{} is not a version {} fleet snapshot.'.format(path, VERSION))
+
+    def __len__(self):
+        return self._servers
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._map.close()
+
+    @property
+    def age(self) -> float:
+        """
+        Seconds since the snapshot was written.
+        """
+        return time.time() - self.created
+
+    def get(self,
+            serverId: str) -> dict:
+        """
+        Server by ID.
+
+        :param serverId: The ID of a server.
+        :return: Dict of id, reference, site, rack, cpu_model, cpu_count, disk_count, memory_bytes, disk_bytes, ips and interfaces, or None.
+        """
+        key = str(serverId).encode('utf-8')
+        low, high = 0, self._servers
+        while low < high:
+            middle = (low + high) // 2
+            offset, length = struct.unpack_from('<II', self._map, self._server_offset + middle * SERVER.size)
+            if self._raw(offset, length) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._servers and self._raw(*struct.unpack_from('<II', self._map, self._server_offset + low * SERVER.size)) == key:
+            return self._server(low)
+        return None
+
+    def servers(self):
+        """
+        Iterate over all servers, in ID order.
+        """
+        for number in range(self._servers):
+            yield self._server(number)
+
+    def ids(self) -> list:
+        """
+        All server IDs, in ID order.
+        """
+        return [self._string(*struct.unpack_from('<II', self._map, self._server_offset + number * SERVER.size)) for number in range(self._servers)]
+
+    def lookup_ip(self,
+                  ip: str) -> str:
+        """
+        Server owning an IP address.
+
+        :param ip: IP address.
+        :return: Server ID, or None.
+        """
+        key = _pack(ipaddress.ip_address(ip))
+        position = bisect.bisect_left(_Keys(self), key)
+        if position < self._ips:
+            record = self._ip_record(position)
+            if record[0] == key:
+                return self._string(*struct.unpack_from('<II', self._map, self._server_offset + record[4] * SERVER.size))
+        return None
+
+    def _raw(self, offset, length):
+        if length == 0xFFFFFFFF:
+            return None
+        start = self._heap_offset + offset
+        return self._map[start:start + length]
+
+    def _string(self, offset, length):
+        raw = self._raw(offset, length)
+        return None if raw is None else raw.decode('utf-8')
+
+    def _ip_record(self, position):
+        number = INDEX.unpack_from(self._map, self._index_offset + position * INDEX.size)[0]
+        return IP.unpack_from(self._map, self._ip_offset + number * IP.size)
+
+    def _server(self, number):
+        values = SERVER.unpack_from(self._map, self._server_offset + number * SERVER.size)
+        server = {field: self._string(values[2 * i], values[2 * i + 1]) for i, field in enumerate(SERVER_FIELDS)}
+        cpu_count, disk_count, memory_bytes, disk_bytes, ip_start, ip_count, iface_start, iface_count = values[10:]
+        server.update(cpu_count=cpu_count, disk_count=disk_count, memory_bytes=memory_bytes, disk_bytes=disk_bytes)
+        server['ips'] = []
+        for position in range(ip_start, ip_start + ip_count):
+            packed, prefix, version, nullRouted, _, offset, length = IP.unpack_from(self._map, self._ip_offset + position * IP.size)
+            address = ipaddress.ip_address(packed[-4:] if version == 4 else packed)
+            server['ips'].append({'ip': '{}/{}'.format(address, prefix), 'version': version, 'nullRouted': bool(nullRouted), 'networkType': self._string(offset, length)})
+        server['interfaces'] = []
+        for position in range(iface_start, iface_start + iface_count):
+            values = INTERFACE.unpack_from(self._map, self._interface_offset + position * INTERFACE.size)
+            server['interfaces'].append({field: self._string(values[1 + 2 * i], values[2 + 2 * i]) for i, field in enumerate(INTERFACE_FIELDS)})
+        return server
+
+
+class _Keys():
+    """Sequence view of the sorted IP index for bisect."""
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+
+    def __len__(self):
+        return self.snapshot._ips
+
+    def __getitem__(self, position):
+        return self.snapshot._ip_record(position)[0]
+
+
+def open_snapshot(path: str,
+                  api=None,
+                  max_age: float = 300,
+                  **capture) -> FleetSnapshot:
+    """
+    Open a snapshot, refreshing it from the live API when it is missing, unreadable or older than max_age.
+
+    :param path: Snapshot file.
+    :param api: leasewebrestapi.API instance used to refresh. Without it a stale snapshot is returned as is.
+    :param max_age: Maximum age in seconds.
+    :param capture: Extra capture_snapshot() arguments.
+    :return: FleetSnapshot.
+    """
+    try:
+        snapshot = FleetSnapshot(path)
+    except (OSError, ValueError):
+        if api is None:
+            raise
+        snapshot = None
+    if snapshot is not None and (snapshot.age <= max_age or api is None):
+        return snapshot
+    if snapshot is not None:
+        snapshot.close()
+    capture_snapshot(api, path, **capture)
+    return FleetSnapshot(path)
@@ -0,0 +1,161 @@
+#  AUTHOR: Roman Bergman <roman.bergman@protonmail.com>
+# RELEASE: 0.0.1
+# LICENSE: AGPL3.0
+
+import asyncio
+import heapq
+import random
+import threading
+import time
+
+from ..core.bulk import run_concurrent
+from ..core.paging import _check
+
+
+ACTIVE_JOB_STATUSES = ('ACTIVE', 'PENDING')
+
+
+def _power(out):
+    return (out.get('pdu') or {}).get('status'), (out.get('ipmi') or {}).get('status')
+
+
+def _jobs(out):
+    return {job.get('uuid') or job.get('id'): (job.get('type'), job.get('status')) for job in out.get('jobs') or []}
+
+
+def _interfaces(out):
+    return {item.get('type'): item.get('status') for item in out.get('networkInterfaces') or []}
+
+
+class FleetWatcher():
+    """
+    Watch power status, jobs and network interfaces of many servers and emit only changes.
+
+    Servers with an active job are polled every `fast` seconds, idle servers every `slow` seconds. A server that just changed is also polled fast once more.
+    The first poll of a server records its state without emitting events.
+
+    Events are dicts with serverId, type ("power", "job" or "interface"), key (job uuid or interface type, None for power), old, new and time.
+    A failed poll is an event of type "error" with the error as new and the number of failures in a row as key. A failing server is polled again after `fast` seconds, doubling up to `slow` with every further failure.
+
+    :param api: leasewebrestapi.API instance.
+    :param serverIds: Server IDs to watch.
+    :param fast: Poll interval in seconds for busy servers.
+    :param slow: Poll interval in seconds for idle servers.
+    :param max_workers: Maximum number of API calls in flight.
+    """
+    def __init__(self,
+                 api,
+                 serverIds: list,
+                 fast: float = 15,
+                 slow: float = 300,
+                 max_workers: int = 10):
+        # polls look for changes, a cached answer would hide them
+        self.servers = api.DedicatedServers.uncached()
+        self.fast = fast
+        self.slow = slow
+        self.max_workers = max_workers
+        self.state = {}
+        self._failures = {}
+        self._due = [(0.0, serverId) for serverId in dict.fromkeys(serverIds)]
+        self._stop = threading.Event()
+
+    def stop(self):
+        """
+        Make watch() return after the current poll.
+        """
+        self._stop.set()
+
+    def poll_once(self) -> list:
+        """
+        Poll every server that is due now.
+
+        :return: List of change events.
+        """
+        due = self._pop_due(time.monotonic())
+        results = run_concurrent(self._fetch, due, self.max_workers)
+        events = []
+        for serverId, (result, err) in zip(due, results):
+            events.extend(self._update(serverId, result, err))
+        return events
+
+    def watch(self):
+        """
+        Poll forever (until stop()) and yield change events as they are found.
+
+        :return: Generator of events.
+        """
+        self._stop.clear()
+        while not self._stop.is_set():
+            yield from self.poll_once()
+            self._stop.wait(self._sleep())
+
+    async def watch_async(self):
+        """
+        Async iterator version of watch(), using the `aio` variants of the API calls.
+
+        :return: Async generator of events.
+        """
+        self._stop.clear()
+        limit = asyncio.Semaphore(self.max_workers)
+
+        async def fetch(serverId):
+            async with limit:
+                try:
+                    return await self._fetch_async(serverId), None
+                except Exception as err:
+                    return None, err
+
+        while not self._stop.is_set():
+            due = self._pop_due(time.monotonic())
+            for serverId, (result, err) in zip(due, await asyncio.gather(*(fetch(serverId) for serverId in due))):
+                for event in self._update(serverId, result, err):
+                    yield event
+            await asyncio.sleep(self._sleep())
+
+    def _pop_due(self, now):
+        due = []
+        while self._due and self._due[0][0] <= now:
+            due.append(heapq.heappop(self._due)[1])
+        return due
+
+    def _sleep(self):
+        return max(0.0, self._due[0][0] - time.monotonic()) if self._due else self.slow
+
+    def _fetch(self, serverId):
+        return (_check(self.servers.show_power_status(serverId)),
+                _check(self.servers.list_jobs(serverId)),
+                _check(self.servers.list_network_interfaces(serverId)))
+
+    async def _fetch_async(self, serverId):
+        aio = self.servers.aio
+        return tuple(_check(out) for out in await asyncio.gather(aio.show_power_status(serverId),
+                                                                 aio.list_jobs(serverId),
+                                                                 aio.list_network_interfaces(serverId)))
+
+    def _update(self, serverId, result, err):
+        events = []
+        now = time.time()
+        if err is None:
+            power, jobs, interfaces = _power(result[0]), _jobs(result[1]), _interfaces(result[2])
+            old = self.state.get(serverId)
+            if old is not None:
+                if old['power'] != power:
+                    events.append({'serverId': serverId, 'type': 'power', 'key': None, 'old': old['power'], 'new': power, 'time': now})
+                for key, job in jobs.items():
+                    if old['jobs'].get(key) != job:
+                        events.append({'serverId': serverId, 'type': 'job', 'key': key, 'old': old['jobs'].get(key), 'new': job, 'time': now})
+                for key, status in interfaces.items():
+                    if old['interfaces'].get(key) != status:
+                        events.append({'serverId': serverId, 'type': 'interface', 'key': key, 'old': old['interfaces'].get(key), 'new': status, 'time': now})
+            self.state[serverId] = {'power': power, 'jobs': jobs, 'interfaces': interfaces}
+            self._failures.pop(serverId, None)
+            busy = events or any(status in ACTIVE_JOB_STATUSES for _, status in jobs.values())
+            interval = self.fast if busy else self.slow
+        else:
+            failures = self._failures[serverId] = self._failures.get(serverId, 0) + 1
+            events.append({'serverId': serverId, 'type': 'error', 'key': failures, 'old': None, 'new': str(err), 'time': now})
+            # back off exponentially, so a server that keeps failing ends up at the idle pace
+            interval = min(self.fast * 2 ** min(failures - 1, 32), max(self.fast, self.slow))
+        # jitter spreads servers that started together over the interval
+        heapq.heappush(self._due, (time.monotonic() + interval * random.uniform(0.9, 1.0), serverId))
+        return events
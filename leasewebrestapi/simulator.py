@@ -0,0 +1,852 @@
+#  AUTHOR: Roman Bergman <roman.bergman@protonmail.com>
+# RELEASE: 0.0.1
+# LICENSE: AGPL3.0
+
+"""
+Local stand-in for the /bareMetals/v2 and /invoices/v1 endpoints, for load tests of fleet tools without touching real servers.
+
+    python -m leasewebrestapi.simulator --servers 5000 --rate 20 --failure-rate 0.01
+
+Then point a client at it:
+
+    api = leasewebrestapi.API(API_KEY='anything')
+    api.config['API_URL'] = 'http://127.0.0.1:8080'
+"""
+
+import argparse
+import datetime
+import hashlib
+import ipaddress
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from .DedicatedServers import ENDPOINTS as SERVER_ENDPOINTS
+from .Invoice import ENDPOINTS as INVOICE_ENDPOINTS
+from .core.ratelimit import RateLimiter
+
+
+SITES = ('AMS-01', 'AMS-10', 'FRA-10', 'WDC-02', 'SIN-01')
+CPUS = (('Intel Xeon E-2274G', 4, 8), ('Intel Xeon Silver 4214', 12, 24), ('AMD EPYC 7402P', 24, 48))
+RAM = (32, 64, 128, 256, 512)
+OPERATING_SYSTEMS = (('UBUNTU_22_04_64BIT', 'Ubuntu 22.04 LTS (x86_64)'), ('DEBIAN_12_64BIT', 'Debian 12 (x86_64)'),
+                     ('ROCKY_9_64BIT', 'Rocky Linux 9 (x86_64)'), ('WINDOWS_SERVER_2022_STANDARD_64BIT', 'Windows Server 2022 Standard (x86_64)'))
+CONTROL_PANELS = (('PLESK_18', 'Plesk Onyx 18'), ('CPANEL_PREMIER_100', 'cPanel Premier 100'))
+JOB_TYPES = {'launch_installation': 'install', 'launch_hardware_scan': 'hardwareScan', 'launch_ipmi_reset': 'ipmiReset', 'launch_resque_mode': 'rescueMode'}
+STEPS = {'5MIN': 300, 'HOUR': 3600, 'DAY': 86400, 'WEEK': 604800, 'MONTH': 2592000, 'YEAR': 31536000}
+
+
+def _iso(timestamp: float) -> str:
+    return datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%S+00:00')
+
+
+def _epoch(value: str) -> float:
+    return datetime.datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+
+
+def _error(status, message):
+    return status, {'errorCode': str(status), 'errorMessage': message, 'correlationId': str(uuid.uuid4())}
+
+
+def _page(items, key, query, default=20):
+    limit = int(query.get('limit') or default)
+    offset = int(query.get('offset') or 0)
+    return 200, {key: items[offset:offset + limit], '_metadata': {'limit': limit, 'offset': offset, 'totalCount': len(items)}}
+
+
+class _Delayed():
+    """A value that takes some seconds to change, like a power state or a null route."""
+    def __init__(self, value):
+        self.old = self.new = value
+        self.at = 0.0
+
+    def set(self, value, delay, old=None):
+        self.old = self.get() if old is None else old
+        self.new = value
+        self.at = time.monotonic() + delay
+
+    def get(self):
+        return self.new if time.monotonic() >= self.at else self.old
+
+
+class Simulator():
+    """
+    In-memory Leaseweb API for a synthetic fleet.
+
+    Every endpoint of DedicatedServers and Invoice is answered from state generated from `seed`.
+    State changes take time like on the real platform: jobs run for `job_seconds` and then finish or fail, power and interface changes take effect after `power_seconds` and `network_seconds`, null routes after `nullroute_seconds`, and private network membership goes through CONFIGURING and REMOVING.
+    Requests are rate limited per API key (429 beyond `rate` per second), can be slowed down by `latency` seconds and fail with a 5xx at `failure_rate`.
+
+    :param servers: Number of servers in the fleet.
+    :param seed: Seed of the synthetic fleet.
+    :param rate: Requests per second per API key. None for no limit.
+    :param burst: Requests allowed at once per API key. Defaults to rate.
+    :param failure_rate: Share of requests answered with a 500, 502 or 503.
+    :param latency: Mean seconds added to every answer.
+    :param job_seconds: Seconds a job runs.
+    :param job_failure_rate: Share of jobs that end FAILED.
+    :param power_seconds: Seconds until a power change shows in the power status.
+    :param network_seconds: Seconds until interface and private network changes take effect.
+    :param nullroute_seconds: Seconds until a null route or its removal takes effect.
+    :param invoices: Number of monthly invoices.
+    """
+    def __init__(self,
+                 servers: int = 100,
+                 seed: int = 0,
+                 rate: float = None,
+                 burst: int = None,
+                 failure_rate: float = 0.0,
+                 latency: float = 0.0,
+                 job_seconds: float = 60,
+                 job_failure_rate: float = 0.0,
+                 power_seconds: float = 5,
+                 network_seconds: float = 5,
+                 nullroute_seconds: float = 30,
+                 invoices: int = 12):
+        self.rate = rate
+        self.burst = burst
+        self.failure_rate = failure_rate
+        self.latency = latency
+        self.job_seconds = job_seconds
+        self.job_failure_rate = job_failure_rate
+        self.power_seconds = power_seconds
+        self.network_seconds = network_seconds
+        self.nullroute_seconds = nullroute_seconds
+        self.random = random.Random(seed)
+        self.stats = {'requests': 0, 'statuses': {}, 'endpoints': {}}
+        self._lock = threading.Lock()
+        self._limiters = {}
+        self._vlans = {}
+        self.servers = {}
+        for number in range(servers):
+            server = self._server(number)
+            self.servers[server['json']['id']] = server
+        self.ids = list(self.servers)
+        self.invoices = self._invoices(invoices)
+        self.line_items = self._line_items()
+        self.routes = []
+        for name, endpoint in sorted(dict(SERVER_ENDPOINTS, **INVOICE_ENDPOINTS).items(), key=lambda item: len(item[1].placeholders)):
+            pattern = re.compile('^' + re.sub(r'\\{(\w+)\\}', r'(?P<\1>[^/]+)', re.escape(endpoint.path)) + '$')
+            self.routes.append((endpoint.method, pattern, name, endpoint))
+
+    # fleet
+
+    def _server(self, number):
+        rng = self.random
+        serverId = str(100000 + number)
+        site = rng.choice(SITES)
+        cpu = rng.choice(CPUS)
+        quantity = rng.choice((1, 1, 2))
+        ram = rng.choice(RAM)
+        disks = rng.choice(((2, 480, 'GB', 'SSD'), (4, 960, 'GB', 'SSD'), (2, 4, 'TB', 'SATA')))
+        public = ipaddress.ip_address('100.64.0.0') + number
+        remote = ipaddress.ip_address('10.128.0.0') + number
+        mac = ':'.join('{:02X}'.format(octet) for octet in (0x00, 0x25, 0x90, (number >> 16) & 0xFF, (number >> 8) & 0xFF, number & 0xFF))
+        rack = 'R{:03d}'.format(number // 40)
+        privateNetworkCapable = rng.random() < 0.8
+        server = {
+            'json': {
+                'id': serverId,
+                'assetId': str(900000 + number),
+                'serialNumber': 'SIM{:07d}'.format(number),
+                'contract': {'id': str(50000000 + number), 'customerId': '10000000', 'deliveryStatus': 'ACTIVE', 'reference': 'sim-{}'.format(number),
+                             'salesOrgId': '2000', 'status': 'ACTIVE', 'startsAt': _iso(time.time() - 86400 * rng.randint(30, 1500))},
+                'featureAvailability': {'automation': True, 'ipmiReboot': True, 'powerCycle': True, 'privateNetwork': privateNetworkCapable, 'remoteManagement': True},
+                'location': {'site': site, 'suite': 'HALL{}'.format(number % 3 + 1), 'rack': rack, 'unit': str(number % 40 + 1)},
+                'networkInterfaces': {
+                    'public': {'mac': mac, 'ip': '{}/32'.format(public), 'gateway': str(public + 1), 'ports': [], 'locationId': ''},
+                    'internal': {'mac': mac, 'ip': None, 'gateway': None, 'ports': [], 'locationId': ''},
+                    'remoteManagement': {'mac': mac, 'ip': '{}/27'.format(remote), 'gateway': str(remote + 1), 'ports': [], 'locationId': ''}
+                },
+                'rack': {'type': 'SHARED' if number % 5 else 'PRIVATE', 'id': rack, 'capacity': '40U'},
+                'specs': {
+                    'chassis': 'Dell PowerEdge R640',
+                    'hardwareRaidCapable': True,
+                    'cpu': {'quantity': quantity, 'type': cpu[0]},
+                    'ram': {'size': ram, 'unit': 'GB'},
+                    'hdd': [{'id': disks[3], 'amount': disks[0], 'size': disks[1], 'unit': disks[2], 'type': disks[3], 'performanceType': None}],
+                    'pciCards': []
+                }
+            },
+            'cpu': cpu,
+            'power': _Delayed('on'),
+            'interfaces': {kind: _Delayed('OPEN') for kind in ('public', 'internal', 'remoteManagement')},
+            'ips': {},
+            'privateNetworks': {},
+            'jobs': [],
+            'leases': [],
+            'credentials': {},
+            'notifications': {'bandwidth': {}, 'datatraffic': {}},
+            'ddos': {'nulling': 'ENABLED', 'scrubbing': 'DISABLED'},
+            'nullRouteHistory': [],
+            'scannedAt': _iso(time.time() - 86400 * rng.randint(1, 300))
+        }
+        for address, networkType, prefix in ((public, 'PUBLIC', 32), (remote, 'REMOTE_MANAGEMENT', 27),
+                                             (ipaddress.ip_address('2001:db8::') + (number << 64), 'PUBLIC', 64)):
+            ip = '{}/{}'.format(address, prefix)
+            server['ips'][str(address)] = {
+                'json': {'ip': ip, 'gateway': None, 'mainIp': networkType == 'PUBLIC' and address.version == 4, 'networkType': networkType,
+                         'prefixLength': prefix, 'primary': address.version == 4, 'reverseLookup': '', 'version': address.version,
+                         'ddos': {'detectionProfile': 'ADVANCED_LOW_UDP', 'protectionType': 'ADVANCED'}, 'floatingIp': False},
+                'nullRouted': _Delayed(False)
+            }
+        if privateNetworkCapable and rng.random() < 0.5:
+            server['privateNetworks']['sim-{}'.format(site)] = {'linkSpeed': rng.choice((100, 1000, 10000)), 'status': _Delayed('CONFIGURED')}
+        return server
+
+    def _invoices(self, count):
+        now = datetime.datetime.now(datetime.timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        invoices = []
+        for months in range(count):
+            date = (now - datetime.timedelta(days=31 * months)).replace(day=1)
+            total = round(sum(60 + int(serverId) % 7 * 25 for serverId in self.ids) * 1.21, 2)
+            invoices.append({'id': str(90000000 + count - months), 'currency': 'EUR', 'date': date.strftime('%Y-%m-%d'),
+                             'dueDate': (date + datetime.timedelta(days=14)).strftime('%Y-%m-%d'), 'isPartialPaymentAllowed': False,
+                             'openAmount': 0 if months else total, 'status': 'OPEN' if not months else 'PAID',
+                             'taxAmount': round(total / 1.21 * 0.21, 2), 'total': total})
+        return invoices
+
+    def _line_items(self):
+        items = []
+        for serverId in self.ids:
+            server = self.servers[serverId]['json']
+            price = 60 + int(serverId) % 7 * 25
+            items.append({'contractId': server['contract']['id'], 'equipmentId': serverId, 'product': 'Dedicated Server',
+                          'reference': server['contract']['reference'], 'location': server['location']['site'], 'quantity': 1,
+                          'unitAmount': price, 'totalAmount': price, 'currency': 'EUR', 'startDate': None, 'endDate': None})
+        return items
+
+    # views
+
+    def _job(self, job):
+        now = time.monotonic()
+        if job['ended'] is not None:
+            status = job['ended']
+        elif now - job['started'] < 1:
+            status = 'PENDING'
+        elif now - job['started'] < job['duration']:
+            status = 'ACTIVE'
+        else:
+            status = job['outcome']
+        done = status in ('FINISHED', 'FAILED', 'CANCELED', 'EXPIRED')
+        percentage = 100 if done else int(min(99, 100 * (now - job['started']) / job['duration']))
+        return {'uuid': job['uuid'], 'serverId': job['serverId'], 'type': job['type'], 'status': status, 'isRunning': not done,
+                'createdAt': job['createdAt'], 'updatedAt': _iso(time.time()) if not done else job['createdAt'], 'payload': job['payload'],
+                'progress': {'canceled': int(status == 'CANCELED'), 'expired': int(status == 'EXPIRED'), 'failed': int(status == 'FAILED'),
+                             'finished': int(status == 'FINISHED'), 'inprogress': int(not done), 'pending': int(status == 'PENDING'),
+                             'percentage': percentage, 'total': 1, 'waiting': 0},
+                'tasks': []}
+
+    def _active_job(self, server):
+        for job in server['jobs']:
+            if self._job(job)['isRunning']:
+                return job
+        return None
+
+    def _ip(self, entry):
+        return dict(entry['json'], nullRouted=entry['nullRouted'].get())
+
+    def _private_networks(self, server):
+        out = []
+        for privateNetworkId, network in server['privateNetworks'].items():
+            status = network['status'].get()
+            if status is not None:
+                vlan = self._vlans.setdefault(privateNetworkId, 100 + len(self._vlans))
+                out.append({'id': privateNetworkId, 'linkSpeed': network['linkSpeed'], 'status': status, 'dhcp': 'ENABLED',
+                            'subnet': '10.{}.{}.0/24'.format(vlan // 256, vlan % 256), 'vlanId': str(vlan)})
+        return out
+
+    def _server_json(self, server):
+        return dict(server['json'], privateNetworks=self._private_networks(server))
+
+    def _interfaces(self, server):
+        out = []
+        for kind, status in server['interfaces'].items():
+            interface = server['json']['networkInterfaces'][kind]
+            out.append({'linkSpeed': '1Gbps', 'operStatus': 'UP' if status.get() == 'OPEN' else 'DOWN', 'status': status.get(),
+                        'switchInterface': 'Gi0/{}'.format(int(server['json']['id']) % 48), 'switchName': 'sw-{}'.format(server['json']['rack']['id']),
+                        'type': kind.upper() if kind != 'remoteManagement' else 'REMOTE_MANAGEMENT', 'mac': interface['mac']})
+        return out
+
+    def _metric(self, serverId, timestamp, kind, direction):
+        # deterministic traffic with a daily curve, so repeated reads of a range agree
+        noise = int(hashlib.md5('{}:{}:{}'.format(serverId, int(timestamp // 300), direction).encode()).hexdigest()[:8], 16) / 0xFFFFFFFF
+        base = (int(serverId) % 50 + 1) * 2 * 10 ** 6 * (3 if direction == 'DOWN' else 1)
+        bps = base * (1 + 0.5 * math.sin(2 * math.pi * (timestamp % 86400) / 86400)) * (0.8 + 0.4 * noise)
+        return bps if kind == 'bandwidth' else bps * 300 / 8
+
+    # requests
+
+    def handle(self, method: str, url: str, headers: dict = None, body=None) -> tuple:
+        """
+        Answer one request.
+
+        :param method: HTTP method.
+        :param url: Path and query string.
+        :param headers: Request headers.
+        :param body: Decoded JSON body.
+        :return: (status, JSON body or None).
+        """
+        headers = {key.lower(): value for key, value in (headers or {}).items()}
+        parts = urlsplit(url)
+        path = parts.path.rstrip('/') or '/'
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        with self._lock:
+            self.stats['requests'] += 1
+        if self.latency:
+            time.sleep(self.random.uniform(0.5, 1.5) * self.latency)
+        if path == '/_simulator/stats':
+            with self._lock:
+                return 200, json.loads(json.dumps(self.stats))
+        status, out, name = self._dispatch(method.upper(), path, query, headers, body or {})
+        with self._lock:
+            self.stats['statuses'][str(status)] = self.stats['statuses'].get(str(status), 0) + 1
+            if name:
+                self.stats['endpoints'][name] = self.stats['endpoints'].get(name, 0) + 1
+        return status, out
+
+    def _dispatch(self, method, path, query, headers, body):
+        apiKey = headers.get('x-lsw-auth')
+        if not apiKey:
+            return _error(401, 'You are not authorized to view this resource.') + (None,)
+        if self.rate:
+            with self._lock:
+                limiter = self._limiters.get(apiKey)
+                if limiter is None:
+                    limiter = self._limiters[apiKey] = RateLimiter(self.rate, self.burst)
+            if limiter.try_acquire():
+                return _error(429, 'Too many requests, please slow down.') + (None,)
+        if self.failure_rate and self.random.random() < self.failure_rate:
+            status = self.random.choice((500, 502, 503))
+            return _error(status, 'Injected failure.') + (None,)
+        for route_method, pattern, name, endpoint in self.routes:
+            match = pattern.match(path)
+            if match and route_method == method:
+                params = match.groupdict()
+                query = {param: query[endpoint.names.get(param, param)] for param in endpoint.query if endpoint.names.get(param, param) in query}
+                body = {param: body[endpoint.names.get(param, param)] for param in endpoint.body if endpoint.names.get(param, param) in body}
+                server = None
+                if 'serverId' in params:
+                    server = self.servers.get(params['serverId'])
+                    if server is None:
+                        return _error(404, 'Resource {} was not found'.format(params['serverId'])) + (name,)
+                try:
+                    with self._lock:
+                        status, out = getattr(self, '_' + name)(server, params, query, body)
+                except ValueError as err:
+                    # malformed numbers and dates in the query or body
+                    return _error(400, 'Invalid parameter: {}'.format(err)) + (name,)
+                return status, out, name
+        return _error(404, 'Resource not found: {} {}'.format(method, path)) + (None,)
+
+    # servers
+
+    def _list_servers(self, server, params, query, body):
+        servers = [self.servers[serverId] for serverId in self.ids]
+        if query.get('site'):
+            servers = [item for item in servers if item['json']['location']['site'] == query['site']]
+        if query.get('privateRackId'):
+            servers = [item for item in servers if item['json']['rack']['id'] == query['privateRackId']]
+        if query.get('ip'):
+            servers = [item for item in servers if query['ip'].split('/')[0] in item['ips']]
+        if query.get('macAddress'):
+            servers = [item for item in servers if item['json']['networkInterfaces']['public']['mac'].lower() == query['macAddress'].lower()]
+        if query.get('privateNetworkCapable') is not None:
+            servers = [item for item in servers if item['json']['featureAvailability']['privateNetwork'] == (query['privateNetworkCapable'] == 'true')]
+        if query.get('privateNetworkEnabled') is not None:
+            servers = [item for item in servers if bool(self._private_networks(item)) == (query['privateNetworkEnabled'] == 'true')]
+        status, out = _page(servers, 'servers', query)
+        out['servers'] = [self._server_json(item) for item in out['servers']]
+        return status, out
+
+    def _get_server(self, server, params, query, body):
+        return 200, self._server_json(server)
+
+    def _update_server(self, server, params, query, body):
+        if 'reference' in body:
+            server['json']['contract']['reference'] = body['reference']
+        return 204, None
+
+    def _show_hardware_information(self, server, params, query, body):
+        cpu, quantity = server['cpu'], server['json']['specs']['cpu']['quantity']
+        ram, disks = server['json']['specs']['ram']['size'], server['json']['specs']['hdd'][0]
+        modules = max(2, ram // 32)
+        scans = [self._job(job) for job in server['jobs'] if job['type'] == 'hardwareScan']
+        finished = [job for job in scans if job['status'] == 'FINISHED']
+        result = {
+            'chassis': {'description': server['json']['specs']['chassis'], 'vendor': 'Dell Inc.', 'product': 'PowerEdge R640', 'serial': server['json']['serialNumber']},
+            'cpu': [{'slot': 'CPU{}'.format(slot + 1), 'vendor': cpu[0].split()[0], 'product': cpu[0], 'serial_number': None,
+                     'settings': {'cores': str(cpu[1]), 'threads': str(cpu[2]), 'enabledcores': str(cpu[1])}} for slot in range(quantity)],
+            'memory': [{'id': 'bank:{}'.format(slot), 'size_bytes': ram * 2 ** 30 // modules, 'clock_hz': 2666000000, 'vendor': 'Samsung',
+                        'serial_number': 'M{}{:04d}'.format(server['json']['id'], slot)} for slot in range(modules)],
+            'disks': [{'id': 'disk:{}'.format(slot), 'description': disks['type'], 'vendor': 'Samsung', 'product': 'PM883',
+                       'size': '{}{}'.format(disks['size'], disks['unit']), 'serial_number': 'D{}{:02d}'.format(server['json']['id'], slot)} for slot in range(disks['amount'])],
+            'network': [{'logical_name': 'eth{}'.format(port), 'vendor': 'Intel Corporation', 'product': 'Ethernet Controller X710',
+                         'mac_address': server['json']['networkInterfaces']['public']['mac'].lower(), 'settings': {'speed': '1Gbit/s', 'link': 'yes'}} for port in range(2)]
+        }
+        return 200, {'id': finished[-1]['uuid'] if finished else str(uuid.UUID(int=int(server['json']['id']))), 'parserVersion': '3.6',
+                     'scannedAt': finished[-1]['updatedAt'] if finished else server['scannedAt'], 'serverId': server['json']['id'], 'result': result}
+
+    def _list_ips(self, server, params, query, body):
+        ips = [self._ip(entry) for entry in server['ips'].values()]
+        if query.get('networkType'):
+            ips = [ip for ip in ips if ip['networkType'] == query['networkType']]
+        if query.get('version'):
+            ips = [ip for ip in ips if str(ip['version']) == query['version']]
+        if query.get('nullRouted') is not None:
+            ips = [ip for ip in ips if ip['nullRouted'] == (query['nullRouted'] == 'true')]
+        if query.get('ips'):
+            wanted = set(query['ips'].split(','))
+            ips = [ip for ip in ips if ip['ip'].split('/')[0] in wanted]
+        return _page(ips, 'ips', query)
+
+    def _find_ip(self, server, params):
+        return server['ips'].get(params['ip'].split('/')[0])
+
+    def _show_ip(self, server, params, query, body):
+        entry = self._find_ip(server, params)
+        if entry is None:
+            return _error(404, 'IP {} was not found'.format(params['ip']))
+        return 200, self._ip(entry)
+
+    def _update_ip(self, server, params, query, body):
+        entry = self._find_ip(server, params)
+        if entry is None:
+            return _error(404, 'IP {} was not found'.format(params['ip']))
+        if 'reverseLookup' in body:
+            entry['json']['reverseLookup'] = body['reverseLookup']
+        if 'detectionProfile' in body:
+            entry['json']['ddos'] = dict(entry['json']['ddos'], detectionProfile=body['detectionProfile'])
+        return 200, self._ip(entry)
+
+    def _null_route(self, server, params, nullRouted):
+        entry = self._find_ip(server, params)
+        if entry is None:
+            return _error(404, 'IP {} was not found'.format(params['ip']))
+        if entry['nullRouted'].new != nullRouted:
+            entry['nullRouted'].set(nullRouted, self.nullroute_seconds)
+            if nullRouted:
+                server['nullRouteHistory'].insert(0, {'id': len(server['nullRouteHistory']) + 1, 'ip': entry['json']['ip'], 'nullLevel': 1,
+                                                      'nulledAt': _iso(time.time()), 'nulledBy': 'customer', 'unnulledAt': None, 'unnulledBy': None,
+                                                      'automatedUnnullingAt': None, 'comment': None, 'ticketId': None})
+            elif server['nullRouteHistory']:
+                server['nullRouteHistory'][0].update(unnulledAt=_iso(time.time()), unnulledBy='customer')
+        return 202, self._ip(entry)
+
+    def _null_route_ip(self, server, params, query, body):
+        return self._null_route(server, params, True)
+
+    def _remove_null_route_ip(self, server, params, query, body):
+        return self._null_route(server, params, False)
+
+    def _show_null_route_history(self, server, params, query, body):
+        return _page(server['nullRouteHistory'], 'nullRoutes', query)
+
+    def _list_network_interfaces(self, server, params, query, body):
+        interfaces = self._interfaces(server)
+        return 200, {'networkInterfaces': interfaces, '_metadata': {'limit': len(interfaces), 'offset': 0, 'totalCount': len(interfaces)}}
+
+    def _interface_types(self, params):
+        if 'networkType' not in params:
+            return ['public', 'internal', 'remoteManagement']
+        kind = {'public': 'public', 'internal': 'internal', 'remotemanagement': 'remoteManagement', 'remote_management': 'remoteManagement'}.get(params['networkType'].lower())
+        return [kind] if kind else []
+
+    def _switch(self, server, params, status):
+        kinds = self._interface_types(params)
+        if not kinds:
+            return _error(404, 'Network interface {} was not found'.format(params['networkType']))
+        for kind in kinds:
+            if server['interfaces'][kind].new != status:
+                server['interfaces'][kind].set(status, self.network_seconds)
+        return 204, None
+
+    def _close_all_network_interfaces(self, server, params, query, body):
+        return self._switch(server, params, 'CLOSED')
+
+    def _open_all_network_interfaces(self, server, params, query, body):
+        return self._switch(server, params, 'OPEN')
+
+    def _close_network_interface_by_type(self, server, params, query, body):
+        return self._switch(server, params, 'CLOSED')
+
+    def _open_network_interface_by_type(self, server, params, query, body):
+        return self._switch(server, params, 'OPEN')
+
+    def _show_network_interface_by_type(self, server, params, query, body):
+        kinds = self._interface_types(params)
+        interfaces = [item for item in self._interfaces(server) if kinds and item['type'].replace('_', '').lower() == kinds[0].lower()]
+        if not interfaces:
+            return _error(404, 'Network interface {} was not found'.format(params['networkType']))
+        return 200, interfaces[0]
+
+    def _add_server_to_private_network(self, server, params, query, body):
+        if not server['json']['featureAvailability']['privateNetwork']:
+            return _error(403, 'This server does not support private networking.')
+        # a PUT on an existing membership changes its link speed, which configures the port again
+        status = _Delayed(None)
+        status.set('CONFIGURED', self.network_seconds, old='CONFIGURING')
+        server['privateNetworks'][params['privateNetworkId']] = {'linkSpeed': int(body.get('linkSpeed') or 1000), 'status': status}
+        return 204, None
+
+    def _delete_server_from_private_network(self, server, params, query, body):
+        network = server['privateNetworks'].get(params['privateNetworkId'])
+        if network is None or network['status'].get() is None:
+            return _error(404, 'The server is not in private network {}.'.format(params['privateNetworkId']))
+        network['status'].set(None, self.network_seconds, old='REMOVING')
+        return 204, None
+
+    def _list_dhcp_reservation(self, server, params, query, body):
+        return 200, {'leases': server['leases'], '_metadata': {'limit': 1, 'offset': 0, 'totalCount': len(server['leases'])}}
+
+    def _create_dhcp_reservation(self, server, params, query, body):
+        options = [{'name': '67', 'value': body.get('bootfile')}]
+        if body.get('hostname'):
+            options.append({'name': '12', 'value': body['hostname']})
+        server['leases'] = [{'ip': server['json']['networkInterfaces']['public']['ip'].split('/')[0], 'mac': server['json']['networkInterfaces']['public']['mac'],
+                             'netmask': '255.255.255.255', 'gateway': server['json']['networkInterfaces']['public']['gateway'], 'site': server['json']['location']['site'],
+                             'lastClientRequest': {}, 'options': options}]
+        return 204, None
+
+    def _delete_dhcp_reservation(self, server, params, query, body):
+        server['leases'] = []
+        return 204, None
+
+    # jobs
+
+    def _launch(self, server, name, body):
+        if self._active_job(server) is not None:
+            return _error(409, 'The server has an active job. Cancel or expire it first.')
+        job = {'uuid': str(uuid.uuid4()), 'serverId': server['json']['id'], 'type': JOB_TYPES[name], 'payload': dict(body),
+               'createdAt': _iso(time.time()), 'started': time.monotonic(), 'duration': self.job_seconds * self.random.uniform(0.8, 1.2),
+               'outcome': 'FAILED' if self.random.random() < self.job_failure_rate else 'FINISHED', 'ended': None}
+        server['jobs'].insert(0, job)
+        if body.get('powerCycle', True) is not False:
+            server['power'].set('on', self.power_seconds, old='off')
+        return 200, self._job(job)
+
+    def _launch_installation(self, server, params, query, body):
+        if not body.get('operatingSystemId'):
+            return _error(400, 'operatingSystemId is required.')
+        return self._launch(server, 'launch_installation', body)
+
+    def _launch_hardware_scan(self, server, params, query, body):
+        return self._launch(server, 'launch_hardware_scan', body)
+
+    def _launch_ipmi_reset(self, server, params, query, body):
+        return self._launch(server, 'launch_ipmi_reset', body)
+
+    def _launch_resque_mode(self, server, params, query, body):
+        return self._launch(server, 'launch_resque_mode', body)
+
+    def _end_job(self, server, status):
+        job = self._active_job(server)
+        if job is None:
+            return _error(404, 'The server has no active job.')
+        job['ended'] = status
+        return 200, self._job(job)
+
+    def _cancel_active_job(self, server, params, query, body):
+        return self._end_job(server, 'CANCELED')
+
+    def _expire_active_job(self, server, params, query, body):
+        return self._end_job(server, 'EXPIRED')
+
+    def _list_jobs(self, server, params, query, body):
+        jobs = [self._job(job) for job in server['jobs']]
+        return 200, {'jobs': jobs, '_metadata': {'limit': len(jobs), 'offset': 0, 'totalCount': len(jobs)}}
+
+    def _show_job(self, server, params, query, body):
+        for job in server['jobs']:
+            if job['uuid'] == params['jobId']:
+                return 200, self._job(job)
+        return _error(404, 'Job {} was not found'.format(params['jobId']))
+
+    # credentials
+
+    def _list_credentials(self, server, params, query, body):
+        credentials = [{'type': kind, 'username': username} for kind, username in server['credentials']]
+        return _page(credentials, 'credentials', query)
+
+    def _list_credentials_by_type(self, server, params, query, body):
+        credentials = [{'type': kind, 'username': username} for kind, username in server['credentials'] if kind == params['type']]
+        return _page(credentials, 'credentials', query)
+
+    def _create_credentials(self, server, params, query, body):
+        key = (body.get('type'), body.get('username'))
+        if None in key or not body.get('password'):
+            return _error(400, 'type, username and password are required.')
+        server['credentials'][key] = body['password']
+        return 200, {'type': key[0], 'username': key[1], 'password': body['password']}
+
+    def _show_user_credentials(self, server, params, query, body):
+        password = server['credentials'].get((params['type'], params['username']))
+        if password is None:
+            return _error(404, 'Credentials were not found')
+        return 200, {'type': params['type'], 'username': params['username'], 'password': password}
+
+    def _update_user_credentials(self, server, params, query, body):
+        if (params['type'], params['username']) not in server['credentials']:
+            return _error(404, 'Credentials were not found')
+        server['credentials'][(params['type'], params['username'])] = body.get('password')
+        return 200, {'type': params['type'], 'username': params['username'], 'password': body.get('password')}
+
+    def _delete_user_credentials(self, server, params, query, body):
+        if server['credentials'].pop((params['type'], params['username']), None) is None:
+            return _error(404, 'Credentials were not found')
+        return 204, None
+
+    # metrics
+
+    def _metrics(self, server, query, kind):
+        if not query.get('date_from') or not query.get('date_to'):
+            return _error(400, 'from and to are required.')
+        start, stop = _epoch(query['date_from']), _epoch(query['date_to'])
+        aggregation = query.get('aggregation') or ('AVG' if kind == 'bandwidth' else 'SUM')
+        granularity = query.get('granularity')
+        step = STEPS.get(granularity, stop - start) if aggregation != '95TH' else stop - start
+        if step <= 0:
+            return _error(400, 'from must be before to.')
+        metrics = {}
+        for direction in ('UP', 'DOWN'):
+            values = []
+            bucket = start
+            while bucket < stop:
+                samples = [self._metric(server['json']['id'], t, kind, direction) for t in range(int(bucket - bucket % 300), int(min(bucket + step, stop)), 300)] or [0.0]
+                if aggregation == '95TH':
+                    value = sorted(samples)[max(0, int(math.ceil(len(samples) * 0.95)) - 1)]
+                elif aggregation == 'SUM' or kind == 'datatraffic':
+                    value = sum(samples)
+                else:
+                    value = sum(samples) / len(samples)
+                values.append({'timestamp': _iso(bucket), 'value': int(value)})
+                bucket += step
+            metrics[direction + '_PUBLIC'] = {'unit': 'bps' if kind == 'bandwidth' else 'B', 'values': values}
+        return 200, {'_metadata': {'aggregation': aggregation, 'from': query['date_from'], 'to': query['date_to'], 'granularity': granularity}, 'metrics': metrics}
+
+    def _show_bandwidth_metrics(self, server, params, query, body):
+        return self._metrics(server, query, 'bandwidth')
+
+    def _show_datatraffic_metrics(self, server, params, query, body):
+        return self._metrics(server, query, 'datatraffic')
+
+    # notification settings
+
+    def _settings(self, server, kind):
+        return server['notifications'][kind]
+
+    def _create_setting(self, server, kind, body):
+        if not body.get('frequency') or not body.get('threshold') or not body.get('unit'):
+            return _error(400, 'frequency, threshold and unit are required.')
+        setting = {'id': str(uuid.uuid4()), 'actions': [{'type': 'EMAIL', 'lastTriggeredAt': None}], 'frequency': body['frequency'],
+                   'lastCheckedAt': None, 'threshold': str(body['threshold']), 'thresholdExceededAt': None, 'unit': body['unit']}
+        self._settings(server, kind)[setting['id']] = setting
+        return 201, setting
+
+    def _get_setting(self, server, kind, params):
+        setting = self._settings(server, kind).get(params['notificationSettingId'])
+        if setting is None:
+            return None, _error(404, 'Notification setting {} was not found'.format(params['notificationSettingId']))
+        return setting, None
+
+    def _list_bandwidth_notification_settings(self, server, params, query, body):
+        return _page(list(self._settings(server, 'bandwidth').values()), 'bandwidthNotificationSettings', query)
+
+    def _create_bandwidth_notification_settings(self, server, params, query, body):
+        return self._create_setting(server, 'bandwidth', body)
+
+    def _show_bandwidth_notification_setting(self, server, params, query, body):
+        setting, error = self._get_setting(server, 'bandwidth', params)
+        return error or (200, setting)
+
+    def _update_bandwidth_notification_setting(self, server, params, query, body):
+        setting, error = self._get_setting(server, 'bandwidth', params)
+        if error:
+            return error
+        setting.update((key, str(value) if key == 'threshold' else value) for key, value in body.items())
+        return 200, setting
+
+    def _delete_bandwidth_notification_setting(self, server, params, query, body):
+        setting, error = self._get_setting(server, 'bandwidth', params)
+        if error:
+            return error
+        del self._settings(server, 'bandwidth')[setting['id']]
+        return 204, None
+
+    def _list_datatraffic_notification_settings(self, server, params, query, body):
+        return _page(list(self._settings(server, 'datatraffic').values()), 'datatrafficNotificationSettings', query)
+
+    def _create_datatraffic_notification_settings(self, server, params, query, body):
+        return self._create_setting(server, 'datatraffic', body)
+
+    def _show_datatraffic_notification_setting(self, server, params, query, body):
+        setting, error = self._get_setting(server, 'datatraffic', params)
+        return error or (200, setting)
+
+    def _update_datatraffic_notification_setting(self, server, params, query, body):
+        setting, error = self._get_setting(server, 'datatraffic', params)
+        if error:
+            return error
+        setting.update((key, str(value) if key == 'threshold' else value) for key, value in body.items())
+        return 200, setting
+
+    def _delete_datatraffic_notification_setting(self, server, params, query, body):
+        setting, error = self._get_setting(server, 'datatraffic', params)
+        if error:
+            return error
+        del self._settings(server, 'datatraffic')[setting['id']]
+        return 204, None
+
+    def _inspect_ddos_notification_settings(self, server, params, query, body):
+        return 200, dict(server['ddos'])
+
+    def _update_ddos_notification_settings(self, server, params, query, body):
+        server['ddos'].update(body)
+        return 204, None
+
+    # power
+
+    def _power_cycle_server(self, server, params, query, body):
+        server['power'].set('on', self.power_seconds, old='off')
+        return 204, None
+
+    def _power_off_server(self, server, params, query, body):
+        server['power'].set('off', self.power_seconds)
+        return 204, None
+
+    def _power_on_server(self, server, params, query, body):
+        server['power'].set('on', self.power_seconds)
+        return 204, None
+
+    def _show_power_status(self, server, params, query, body):
+        status = server['power'].get()
+        return 200, {'ipmi': {'status': status}, 'pdu': {'status': status}}
+
+    # catalogue
+
+    def _list_operating_system(self, server, params, query, body):
+        return _page([{'id': osId, 'name': name} for osId, name in OPERATING_SYSTEMS], 'operatingSystems', query)
+
+    def _show_operating_system(self, server, params, query, body):
+        for osId, name in OPERATING_SYSTEMS:
+            if osId == params['operatingSystemId']:
+                return 200, {'id': osId, 'name': name, 'architecture': '64bit', 'family': name.split()[0].lower(), 'type': 'linux' if 'WINDOWS' not in osId else 'windows',
+                             'version': name.split()[1], 'configurable': True, 'features': ['PARTITIONING', 'SW_RAID', 'TIMEZONE', 'HOSTNAME', 'SSH_KEYS', 'POST_INSTALL_SCRIPTS'],
+                             'supportsSshKeys': 'WINDOWS' not in osId, 'defaults': {'device': 'SATA_SAS', 'partitions': []}}
+        return _error(404, 'Operating system {} was not found'.format(params['operatingSystemId']))
+
+    def _list_control_panels_by_os(self, server, params, query, body):
+        return _page([{'id': panelId, 'name': name} for panelId, name in CONTROL_PANELS], 'controlPanels', query)
+
+    def _list_control_panels(self, server, params, query, body):
+        return _page([{'id': panelId, 'name': name} for panelId, name in CONTROL_PANELS], 'controlPanels', query)
+
+    def _rescue_images(self, server, params, query, body):
+        return _page([{'id': 'GRML', 'name': 'GRML Linux Rescue Image (amd64)'}, {'id': 'FREEBSD', 'name': 'FreeBSD Rescue Image (amd64)'}], 'rescueImages', query)
+
+    # invoices
+
+    def _list_invoices(self, server, params, query, body):
+        return _page(self.invoices, 'invoices', query)
+
+    def _pro_forma(self, server, params, query, body):
+        status, out = _page(self.line_items, 'lineItems', query)
+        total = sum(item['totalAmount'] for item in out['lineItems'])
+        out.update(currency='EUR', probableInvoicingDate=_iso(time.time() + 86400 * 14)[:10], subTotal=total, vatAmount=round(total * 0.21, 2), total=round(total * 1.21, 2))
+        return status, out
+
+    def _inspect_invoice(self, server, params, query, body):
+        for invoice in self.invoices:
+            if invoice['id'] == params['invoiceId']:
+                return 200, dict(invoice, lineItems=self.line_items)
+        return _error(404, 'Invoice {} was not found'.format(params['invoiceId']))
+
+    # server
+
+    def serve(self,
+              host: str = '127.0.0.1',
+              port: int = 8080,
+              verbose: bool = False) -> ThreadingHTTPServer:
+        """
+        Start an HTTP server in a background thread.
+
+        :param host: Address to listen on.
+        :param port: Port to listen on. 0 picks a free port.
+        :param verbose: Log every request to stderr.
+        :return: The server. Its base URL is 'http://{}:{}'.format(*server.server_address); stop it with shutdown().
+        """
+        simulator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _answer(self):
+                length = int(self.headers.get('content-length') or 0)
+                raw = self.rfile.read(length) if length else b''
+                try:
+                    body = json.loads(raw) if raw else None
+                except ValueError:
+                    status, out = _error(400, 'The request body is not valid JSON.')
+                else:
+                    status, out = simulator.handle(self.command, self.path, dict(self.headers), body)
+                content = json.dumps(out).encode('utf-8') if out is not None else b''
+                self.send_response(status)
+                if content:
+                    self.send_header('content-type', 'application/json')
+                if status == 429:
+                    self.send_header('retry-after', '1')
+                self.send_header('content-length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _answer
+
+            def log_message(self, format, *args):
+                if verbose:
+                    BaseHTTPRequestHandler.log_message(self, format, *args)
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(prog='python -m leasewebrestapi.simulator', description='Local stand-in for the Leaseweb /bareMetals/v2 and /invoices/v1 API.')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on.')
+    parser.add_argument('--port', type=int, default=8080, help='Port to listen on.')
+    parser.add_argument('--servers', type=int, default=100, help='Number of servers in the fleet.')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic fleet.')
+    parser.add_argument('--rate', type=float, default=None, help='Requests per second per API key; more get a 429.')
+    parser.add_argument('--burst', type=int, default=None, help='Requests allowed at once per API key.')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Share of requests failing with a 5xx.')
+    parser.add_argument('--latency', type=float, default=0.0, help='Mean seconds added to every answer.')
+    parser.add_argument('--job-seconds', type=float, default=60, help='Seconds a job runs.')
+    parser.add_argument('--job-failure-rate', type=float, default=0.0, help='Share of jobs ending FAILED.')
+    parser.add_argument('--power-seconds', type=float, default=5, help='Seconds until a power change shows.')
+    parser.add_argument('--network-seconds', type=float, default=5, help='Seconds until interface and private network changes show.')
+    parser.add_argument('--nullroute-seconds', type=float, default=30, help='Seconds until a null route or its removal shows.')
+    parser.add_argument('--invoices', type=int, default=12, help='Number of monthly invoices.')
+    parser.add_argument('--verbose', action='store_true', help='Log every request.')
+    args = parser.parse_args(argv)
+    simulator = Simulator(servers=args.servers, seed=args.seed, rate=args.rate, burst=args.burst, failure_rate=args.failure_rate,
+                          latency=args.latency, job_seconds=args.job_seconds, job_failure_rate=args.job_failure_rate,
+                          power_seconds=args.power_seconds, network_seconds=args.network_seconds,
+                          nullroute_seconds=args.nullroute_seconds, invoices=args.invoices)
+    server = simulator.serve(args.host, args.port, args.verbose)
+    print('Simulating {} servers on http://{}:{}'.format(args.servers, *server.server_address[:2]))
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()